@@ -11,7 +11,9 @@ from app.core.config import settings
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # --- Импортируем настройки и Base ---
+from app.core.bootstrap import remap_legacy_revisions
 from app.core.db import Base
+from app.models.refresh_token import RefreshToken  # noqa: F401
 from app.models.support import SupportMessage, SupportTicket  # noqa: F401
 from app.models.user import CartItem, Favorite, Product, User  # noqa: F401
 from app.models.vehicle import Vehicle  # noqa: F401
@@ -45,18 +47,30 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def do_run_migrations(connection) -> None:
+    # Базы, помеченные удалёнными пустыми ревизиями, переводим на baseline
+    remap_legacy_revisions(connection)
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
+    # app.core.bootstrap передаёт своё соединение (одна транзакция на весь прогон)
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
 
-    with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-        with context.begin_transaction():
-            context.run_migrations()
+    with connectable.begin() as connection:
+        do_run_migrations(connection)
 
 
 if context.is_offline_mode():
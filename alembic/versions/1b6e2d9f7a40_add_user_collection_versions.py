@@ -0,0 +1,33 @@
+"""add user collection versions
+
+Revision ID: 1b6e2d9f7a40
+Revises: e83f6a0c94d2
+Create Date: 2026-10-19 14:52:18.330472
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b6e2d9f7a40'
+down_revision: Union[str, Sequence[str], None] = 'e83f6a0c94d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Константный DEFAULT: в PostgreSQL 11+ таблица не переписывается
+    op.add_column('users', sa.Column('cart_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('favorites_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('vehicles_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'vehicles_version')
+    op.drop_column('users', 'favorites_version')
+    op.drop_column('users', 'cart_version')
@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: 1ef216633f2b
-Revises: 8fc9d217f8dc
-Create Date: 2025-11-26 14:09:45.530928
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '1ef216633f2b'
-down_revision: Union[str, Sequence[str], None] = '8fc9d217f8dc'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -0,0 +1,47 @@
+"""add document jobs
+
+Revision ID: 3a9d4c7b2e15
+Revises: 7f2c5a8e1d93
+Create Date: 2026-10-19 17:05:44.218930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a9d4c7b2e15'
+down_revision: Union[str, Sequence[str], None] = '7f2c5a8e1d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('document_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('file_path', sa.String(length=512), nullable=False),
+    sa.Column('search_code', sa.String(length=128), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.String(length=512), nullable=True),
+    sa.Column('vehicle_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_document_jobs_user_id'), 'document_jobs', ['user_id'], unique=False)
+    op.create_index('ix_document_jobs_status_created', 'document_jobs', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_jobs_status_created', table_name='document_jobs')
+    op.drop_index(op.f('ix_document_jobs_user_id'), table_name='document_jobs')
+    op.drop_table('document_jobs')
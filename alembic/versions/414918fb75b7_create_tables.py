@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: 414918fb75b7
-Revises: a7ce537c92aa
-Create Date: 2025-11-25 22:54:54.945623
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '414918fb75b7'
-down_revision: Union[str, Sequence[str], None] = 'a7ce537c92aa'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: 4b7e9b912791
-Revises: 736fd473a2e5
-Create Date: 2025-11-25 20:56:27.602613
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '4b7e9b912791'
-down_revision: Union[str, Sequence[str], None] = '736fd473a2e5'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
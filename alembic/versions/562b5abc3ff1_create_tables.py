@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: 562b5abc3ff1
-Revises: d2ec71eb5034
-Create Date: 2025-11-26 15:29:25.985046
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '562b5abc3ff1'
-down_revision: Union[str, Sequence[str], None] = 'd2ec71eb5034'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: 5a42f8115bcc
-Revises: 4b7e9b912791
-Create Date: 2025-11-25 21:00:33.071059
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '5a42f8115bcc'
-down_revision: Union[str, Sequence[str], None] = '4b7e9b912791'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
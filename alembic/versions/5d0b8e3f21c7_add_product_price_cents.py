@@ -0,0 +1,34 @@
+"""add product price cents
+
+Revision ID: 5d0b8e3f21c7
+Revises: c4d47d7f6f23
+Create Date: 2026-10-19 12:41:07.553921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0b8e3f21c7'
+down_revision: Union[str, Sequence[str], None] = 'c4d47d7f6f23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Только nullable-колонки без DEFAULT: ALTER не переписывает таблицу.
+    # Существующие строки заполняет python -m app.services.price_backfill
+    op.add_column('products', sa.Column('price_cents', sa.Integer(), nullable=True))
+    op.add_column('products', sa.Column('currency', sa.String(length=3), nullable=True))
+    op.create_index(op.f('ix_products_price_cents'), 'products', ['price_cents'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_products_price_cents'), table_name='products')
+    op.drop_column('products', 'currency')
+    op.drop_column('products', 'price_cents')
@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: 6c7e884f185c
-Revises: a0918de22813
-Create Date: 2025-11-26 10:46:37.878665
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '6c7e884f185c'
-down_revision: Union[str, Sequence[str], None] = 'a0918de22813'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: 736fd473a2e5
-Revises: 9cc65b6fa3fa
-Create Date: 2025-11-25 19:49:44.800658
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '736fd473a2e5'
-down_revision: Union[str, Sequence[str], None] = '9cc65b6fa3fa'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
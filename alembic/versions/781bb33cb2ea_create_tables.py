@@ -1,5 +1,10 @@
 """create tables
 
+Squashed baseline: the 24 empty autogenerated "create tables" revisions
+that followed it (up to b31656c18e0b) were folded into this one.
+Databases stamped with any of them are re-stamped to this revision by
+app.core.bootstrap.remap_legacy_revisions (also called from env.py).
+
 Revision ID: 781bb33cb2ea
 Revises: 
 Create Date: 2025-11-25 18:24:02.753352
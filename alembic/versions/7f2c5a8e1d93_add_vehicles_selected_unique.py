@@ -0,0 +1,42 @@
+"""add vehicles selected unique
+
+Revision ID: 7f2c5a8e1d93
+Revises: 1b6e2d9f7a40
+Create Date: 2026-10-19 15:38:02.774519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f2c5a8e1d93'
+down_revision: Union[str, Sequence[str], None] = '1b6e2d9f7a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Из-за гонок у пользователя могло оказаться несколько выбранных машин — оставляем последнюю
+    op.execute("""
+        UPDATE vehicles SET is_selected = false
+        WHERE is_selected AND id NOT IN (
+            SELECT max(id) FROM vehicles WHERE is_selected GROUP BY user_id
+        )
+    """)
+    op.create_index(
+        'ux_vehicles_user_selected',
+        'vehicles',
+        ['user_id'],
+        unique=True,
+        postgresql_where=sa.text('is_selected'),
+        sqlite_where=sa.text('is_selected'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_vehicles_user_selected', table_name='vehicles')
@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: 88ccb6881f85
-Revises: b13998d001f8
-Create Date: 2025-11-26 15:39:55.945499
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '88ccb6881f85'
-down_revision: Union[str, Sequence[str], None] = 'b13998d001f8'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
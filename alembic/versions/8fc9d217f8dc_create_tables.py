@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: 8fc9d217f8dc
-Revises: d15013a6f9cb
-Create Date: 2025-11-26 11:12:23.268175
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '8fc9d217f8dc'
-down_revision: Union[str, Sequence[str], None] = 'd15013a6f9cb'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
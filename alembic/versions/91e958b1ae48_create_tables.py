@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: 91e958b1ae48
-Revises: 48f46c9b5b15
-Create Date: 2025-11-26 14:20:44.273726
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '91e958b1ae48'
-down_revision: Union[str, Sequence[str], None] = '48f46c9b5b15'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
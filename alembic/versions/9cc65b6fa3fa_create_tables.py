@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: 9cc65b6fa3fa
-Revises: 781bb33cb2ea
-Create Date: 2025-11-25 19:47:59.927343
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '9cc65b6fa3fa'
-down_revision: Union[str, Sequence[str], None] = '781bb33cb2ea'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: a2d4eb74756d
-Revises: 5a72e330b574
-Create Date: 2025-11-26 10:29:07.116063
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = 'a2d4eb74756d'
-down_revision: Union[str, Sequence[str], None] = '5a72e330b574'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
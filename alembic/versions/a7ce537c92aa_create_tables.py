@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: a7ce537c92aa
-Revises: 5a42f8115bcc
-Create Date: 2025-11-25 22:07:17.479260
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = 'a7ce537c92aa'
-down_revision: Union[str, Sequence[str], None] = '5a42f8115bcc'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
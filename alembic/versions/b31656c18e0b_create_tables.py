@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: b31656c18e0b
-Revises: 88ccb6881f85
-Create Date: 2025-11-26 15:41:35.668276
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = 'b31656c18e0b'
-down_revision: Union[str, Sequence[str], None] = '88ccb6881f85'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
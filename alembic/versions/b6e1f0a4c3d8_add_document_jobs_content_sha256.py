@@ -0,0 +1,28 @@
+"""add document jobs content sha256
+
+Revision ID: b6e1f0a4c3d8
+Revises: 3a9d4c7b2e15
+Create Date: 2026-10-19 18:21:09.537114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1f0a4c3d8'
+down_revision: Union[str, Sequence[str], None] = '3a9d4c7b2e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('document_jobs', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('document_jobs', 'content_sha256')
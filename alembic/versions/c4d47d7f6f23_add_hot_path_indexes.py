@@ -0,0 +1,83 @@
+"""add hot path indexes
+
+Revision ID: c4d47d7f6f23
+Revises: 9ed357a1b1a2
+Create Date: 2026-10-19 11:03:54.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d47d7f6f23'
+down_revision: Union[str, Sequence[str], None] = '9ed357a1b1a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # --- Перед уникальными индексами убираем дубликаты, накопившиеся из-за гонок ---
+    # products: ссылки переводим на самый старый товар с тем же URL, остальные удаляем
+    dup_products = """
+        SELECT id, min(id) OVER (PARTITION BY product_url) AS keep_id
+        FROM products WHERE product_url IS NOT NULL
+    """
+    op.execute(f"""
+        UPDATE cart_items SET product_id = d.keep_id
+        FROM ({dup_products}) d
+        WHERE cart_items.product_id = d.id AND d.id <> d.keep_id
+    """)
+    op.execute(f"""
+        UPDATE favorites SET product_id = d.keep_id
+        FROM ({dup_products}) d
+        WHERE favorites.product_id = d.id AND d.id <> d.keep_id
+    """)
+    op.execute(f"""
+        DELETE FROM products USING ({dup_products}) d
+        WHERE products.id = d.id AND d.id <> d.keep_id
+    """)
+
+    # cart_items: одна строка на (user, product), количества складываем
+    op.execute("""
+        UPDATE cart_items SET quantity = s.total
+        FROM (
+            SELECT min(id) AS keep_id, sum(coalesce(quantity, 1)) AS total
+            FROM cart_items GROUP BY user_id, product_id HAVING count(*) > 1
+        ) s
+        WHERE cart_items.id = s.keep_id
+    """)
+    op.execute("""
+        DELETE FROM cart_items USING cart_items older
+        WHERE cart_items.user_id = older.user_id
+          AND cart_items.product_id = older.product_id
+          AND cart_items.id > older.id
+    """)
+
+    # favorites: одна строка на (user, product)
+    op.execute("""
+        DELETE FROM favorites USING favorites older
+        WHERE favorites.user_id = older.user_id
+          AND favorites.product_id = older.product_id
+          AND favorites.id > older.id
+    """)
+
+    op.create_index(op.f('ix_products_product_url'), 'products', ['product_url'], unique=True)
+    op.create_index('ix_cart_items_user_id_product_id', 'cart_items', ['user_id', 'product_id'], unique=True)
+    op.create_index('ix_favorites_user_id_product_id', 'favorites', ['user_id', 'product_id'], unique=True)
+    op.create_index(op.f('ix_vehicles_user_id'), 'vehicles', ['user_id'], unique=False)
+    op.create_index(op.f('ix_support_tickets_user_id'), 'support_tickets', ['user_id'], unique=False)
+    op.create_index(op.f('ix_support_messages_ticket_id'), 'support_messages', ['ticket_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_support_messages_ticket_id'), table_name='support_messages')
+    op.drop_index(op.f('ix_support_tickets_user_id'), table_name='support_tickets')
+    op.drop_index(op.f('ix_vehicles_user_id'), table_name='vehicles')
+    op.drop_index('ix_favorites_user_id_product_id', table_name='favorites')
+    op.drop_index('ix_cart_items_user_id_product_id', table_name='cart_items')
+    op.drop_index(op.f('ix_products_product_url'), table_name='products')
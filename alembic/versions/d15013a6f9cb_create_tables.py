@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: d15013a6f9cb
-Revises: 2f1832814859
-Create Date: 2025-11-26 11:00:25.044920
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = 'd15013a6f9cb'
-down_revision: Union[str, Sequence[str], None] = '2f1832814859'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: d2ec71eb5034
-Revises: 91e958b1ae48
-Create Date: 2025-11-26 14:25:39.611409
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = 'd2ec71eb5034'
-down_revision: Union[str, Sequence[str], None] = '91e958b1ae48'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
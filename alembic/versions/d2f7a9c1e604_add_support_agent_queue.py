@@ -0,0 +1,46 @@
+"""add support agent queue
+
+Revision ID: d2f7a9c1e604
+Revises: b6e1f0a4c3d8
+Create Date: 2026-10-19 20:02:41.318560
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7a9c1e604'
+down_revision: Union[str, Sequence[str], None] = 'b6e1f0a4c3d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users', sa.Column('is_support_agent', sa.Boolean(), server_default=sa.text('false'), nullable=False)
+    )
+    op.add_column('support_tickets', sa.Column('assigned_agent_id', sa.Integer(), nullable=True))
+    op.add_column('support_tickets', sa.Column('assigned_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_foreign_key(
+        'fk_support_tickets_assigned_agent_id_users',
+        'support_tickets', 'users', ['assigned_agent_id'], ['id'],
+        ondelete='SET NULL',
+    )
+    # Тикеты без статуса не попали бы ни в одну очередь
+    op.execute("UPDATE support_tickets SET status = 'open' WHERE status IS NULL")
+    op.create_index(
+        'ix_support_tickets_status_created', 'support_tickets', ['status', 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_support_tickets_status_created', table_name='support_tickets')
+    op.drop_constraint('fk_support_tickets_assigned_agent_id_users', 'support_tickets', type_='foreignkey')
+    op.drop_column('support_tickets', 'assigned_at')
+    op.drop_column('support_tickets', 'assigned_agent_id')
+    op.drop_column('users', 'is_support_agent')
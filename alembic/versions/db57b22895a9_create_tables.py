@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: db57b22895a9
-Revises: 1ef216633f2b
-Create Date: 2025-11-26 14:12:08.843660
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = 'db57b22895a9'
-down_revision: Union[str, Sequence[str], None] = '1ef216633f2b'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -0,0 +1,64 @@
+"""add support message search
+
+Revision ID: e5a1c8d3f902
+Revises: d2f7a9c1e604
+Create Date: 2026-10-19 20:47:13.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1c8d3f902'
+down_revision: Union[str, Sequence[str], None] = 'd2f7a9c1e604'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Выражение должно совпадать с SEARCH_VECTOR_SQL в app/models/support.py
+POSTGRES_INDEX = """
+    CREATE INDEX IF NOT EXISTS ix_support_messages_search ON support_messages
+    USING gin (to_tsvector('german', coalesce(support_messages.message, '')))
+"""
+SQLITE_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS support_messages_fts USING fts5(
+        message, content='support_messages', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS support_messages_fts_insert AFTER INSERT ON support_messages BEGIN
+        INSERT INTO support_messages_fts(rowid, message) VALUES (new.id, new.message);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS support_messages_fts_delete AFTER DELETE ON support_messages BEGIN
+        INSERT INTO support_messages_fts(support_messages_fts, rowid, message) VALUES ('delete', old.id, old.message);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS support_messages_fts_update AFTER UPDATE OF message ON support_messages BEGIN
+        INSERT INTO support_messages_fts(support_messages_fts, rowid, message) VALUES ('delete', old.id, old.message);
+        INSERT INTO support_messages_fts(rowid, message) VALUES (new.id, new.message);
+    END""",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        # CONCURRENTLY не блокировал бы запись, но не работает внутри транзакции миграции;
+        # на больших таблицах индекс лучше создать вручную заранее — IF NOT EXISTS это учтёт
+        op.execute(POSTGRES_INDEX)
+    elif dialect == "sqlite":
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        # Уже существующие сообщения
+        op.execute("INSERT INTO support_messages_fts(support_messages_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_support_messages_search")
+    elif dialect == "sqlite":
+        for trigger in ("insert", "delete", "update"):
+            op.execute(f"DROP TRIGGER IF EXISTS support_messages_fts_{trigger}")
+        op.execute("DROP TABLE IF EXISTS support_messages_fts")
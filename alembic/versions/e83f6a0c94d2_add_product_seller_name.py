@@ -0,0 +1,28 @@
+"""add product seller name
+
+Revision ID: e83f6a0c94d2
+Revises: 5d0b8e3f21c7
+Create Date: 2026-10-19 13:27:45.901263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83f6a0c94d2'
+down_revision: Union[str, Sequence[str], None] = '5d0b8e3f21c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('seller_name', sa.String(length=256), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('products', 'seller_name')
@@ -1,32 +0,0 @@
-"""create tables
-
-Revision ID: ef98afd37afc
-Revises: a2d4eb74756d
-Create Date: 2025-11-26 10:29:58.377852
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = 'ef98afd37afc'
-down_revision: Union[str, Sequence[str], None] = 'a2d4eb74756d'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -0,0 +1,29 @@
+"""add support messages attachment_url index
+
+Revision ID: f3b8d1e6a274
+Revises: e5a1c8d3f902
+Create Date: 2026-10-19 23:12:40.671305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d1e6a274'
+down_revision: Union[str, Sequence[str], None] = 'e5a1c8d3f902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Проверка доступа к вложению ищет сообщение по точному attachment_url
+    op.create_index(op.f('ix_support_messages_attachment_url'), 'support_messages', ['attachment_url'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_support_messages_attachment_url'), table_name='support_messages')
@@ -1,12 +1,11 @@
 #!/bin/bash
-#set -e
+set -e
 
-#echo "Running Alembic migrations..."
-#alembic downgrade base
-#alembic upgrade head
-#alembic revision --autogenerate -m "create tables"
-#alembic upgrade head
-#echo "Migrations completed."
+# Пустая база: схема создаётся одним снимком и помечается head;
+# существующая: alembic upgrade head
+echo "Preparing database schema..."
+python -m app.core.bootstrap
+echo "Schema ready."
 
 # Запуск приложения
 exec uvicorn app.main:app --host 0.0.0.0 --port 8081
@@ -0,0 +1,39 @@
+# app/core/bloom.py
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Простой Bloom-фильтр поверх bytearray.
+
+    `item in bloom` == False означает, что элемент точно не добавлялся;
+    True — что элемент, вероятно, добавлялся (с вероятностью ошибки ~error_rate).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, item: str):
+        # Двойное хеширование: k позиций из одного 128-битного дайджеста
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self) -> int:
+        return self._count
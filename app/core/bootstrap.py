@@ -0,0 +1,88 @@
+# app/core/bootstrap.py
+"""
+Подготовка схемы БД при старте контейнера / в CI.
+
+- Пустая база: вся схема создаётся одним DDL-снимком из моделей
+  (Base.metadata.create_all) в одной транзакции и помечается `alembic stamp head`.
+- Существующая база: обычный `alembic upgrade head` по цепочке миграций.
+
+    python -m app.core.bootstrap [--url postgresql+psycopg2://...]
+"""
+import argparse
+import os
+import time
+
+from alembic import command
+from alembic.config import Config
+from loguru import logger
+from sqlalchemy import Connection, bindparam, create_engine, inspect, text
+
+import app.models  # noqa: F401  (регистрирует все модели в Base.metadata)
+from app.core.config import settings
+from app.core.db import Base
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+
+BASELINE_REVISION = "781bb33cb2ea"
+
+# Пустые автосгенерированные ревизии, схлопнутые в BASELINE_REVISION
+LEGACY_REVISIONS = (
+    "1ef216633f2b", "2f1832814859", "414918fb75b7", "48f46c9b5b15", "4b7e9b912791", "562b5abc3ff1",
+    "5a42f8115bcc", "5a72e330b574", "6c7e884f185c", "736fd473a2e5", "88ccb6881f85", "8fc9d217f8dc",
+    "91e958b1ae48", "9cc65b6fa3fa", "a0918de22813", "a2d4eb74756d", "a7ce537c92aa", "b13998d001f8",
+    "b31656c18e0b", "d15013a6f9cb", "d2ec71eb5034", "db57b22895a9", "e02e7921451f", "ef98afd37afc",
+)
+
+
+def remap_legacy_revisions(connection: Connection) -> int:
+    """Переносит базы, помеченные удалёнными пустыми ревизиями, на BASELINE_REVISION."""
+    if not inspect(connection).has_table("alembic_version"):
+        return 0
+    result = connection.execute(
+        text("UPDATE alembic_version SET version_num = :baseline WHERE version_num IN :legacy").bindparams(
+            bindparam("legacy", expanding=True)
+        ),
+        {"baseline": BASELINE_REVISION, "legacy": list(LEGACY_REVISIONS)},
+    )
+    return result.rowcount
+
+
+def alembic_config(connection: Connection) -> Config:
+    cfg = Config(ALEMBIC_INI)
+    # env.py возьмёт это соединение вместо создания своего движка
+    cfg.attributes["connection"] = connection
+    return cfg
+
+
+def bootstrap(url: str | None = None) -> str:
+    """Готовит схему и возвращает, что было сделано: 'created' или 'migrated'."""
+    engine = create_engine(url or settings.database_url)
+    try:
+        with engine.begin() as conn:
+            tables = set(inspect(conn).get_table_names())
+            cfg = alembic_config(conn)
+
+            if not tables:
+                Base.metadata.create_all(conn)
+                command.stamp(cfg, "head")
+                return "created"
+
+            if "alembic_version" not in tables:
+                raise RuntimeError(
+                    "Database has tables but no alembic_version; stamp it manually before bootstrapping"
+                )
+
+            command.upgrade(cfg, "head")
+            return "migrated"
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or migrate the database schema")
+    parser.add_argument("--url", default=None, help="SQLAlchemy sync URL (default: from settings)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    action = bootstrap(args.url)
+    logger.info(f"Schema {action} in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,35 @@
+# app/core/conditional.py
+"""
+Условные GET для коллекций пользователя (корзина, избранное, машины).
+
+ETag строится из версии коллекции в строке users, которая и так загружена
+при аутентификации, поэтому 304 отдаётся без чтения и сериализации самих строк.
+"""
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"  # клиент хранит ответ, но каждый раз перепроверяет
+
+
+def collection_etag(user, collection: str) -> str:
+    return f'W/"{collection}-{user.id}-{getattr(user, f"{collection}_version")}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Для If-None-Match сравнение слабое: W/ не учитывается
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def not_modified(request: Request, response: Response, user, collection: str) -> Response | None:
+    """Ставит ETag на ответ; если клиент прислал совпадающий If-None-Match — возвращает готовый 304."""
+    etag = collection_etag(user, collection)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
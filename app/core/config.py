@@ -3,6 +3,9 @@ from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
+    DEBUG: bool = False  # отладочные заголовки X-DB-* в ответах и /metrics без токена
+    METRICS_TOKEN: str | None = None  # Bearer-токен для /metrics; не задан и DEBUG выключен — /metrics отдаёт 404
+
     # --- Database ---
     DB_HOST: str = "localhost"
     DB_PORT: str = "5432"
@@ -10,17 +13,79 @@ class Settings(BaseSettings):
     DB_PASS: str = "postgres"
     DB_NAME: str = "autoteile_db"
 
+    # --- Пул соединений (на один воркер) ---
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # сколько ждать свободное соединение, сек
+    DB_POOL_RECYCLE: int = 1800  # пересоздавать соединения старше N секунд (-1 — никогда)
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100  # кэш prepared statements asyncpg (0 — выключен, нужно для pgbouncer)
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000  # statement_timeout на сервере (0 — без ограничения)
+
+    # --- Read-реплика (необязательно) ---
+    DB_REPLICA_HOST: str | None = None  # если не задан — все чтения идут в primary
+    DB_REPLICA_PORT: str | None = None  # по умолчанию DB_PORT
+    DB_READ_YOUR_WRITES_SECONDS: int = 5  # столько после своей записи пользователь читает из primary
+
     # --- JWT ---
     JWT_SECRET: str = "super_secret_key"  # лучше задать в .env
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24
 
+    # --- Refresh-токены (ротация и отзыв) ---
+    REFRESH_BLOOM_CAPACITY: int = 100_000
+    REFRESH_BLOOM_ERROR_RATE: float = 0.001
+    REFRESH_REVOKED_CACHE_SIZE: int = 50_000
+    REFRESH_PURGE_INTERVAL_SECONDS: int = 3600
+
+    # --- Корзина ---
+    CART_SUMMARY_CACHE_TTL_SECONDS: int = 300  # кэш /cart/summary на воркер; привязан к users.cart_version
+
+    # --- Избранное ---
+    FAVORITES_STATUS_CACHE_TTL_SECONDS: int = 300  # кэш множеств избранного/корзины на воркер (0 — выключен)
+
+    # --- Распознавание документов (СТС) ---
+    DOCUMENT_SPOOL_DIR: str = "/tmp/autoteile_documents"  # куда сохраняются загрузки до обработки
+    DOCUMENT_MAX_BYTES: int = 10 * 1024 * 1024
+    DOCUMENT_WORKERS: int = 2  # размер пула процессов распознавания на воркер API
+    DOCUMENT_QUEUE_SIZE: int = 1000  # при переполнении очереди — 503
+    DOCUMENT_RECOGNIZER: str = "app.services.recognition:StubRecognizer"
+    # Задание в статусе running дольше этого срока считается брошенным (воркер упал) и возвращается в очередь
+    DOCUMENT_JOB_LEASE_SECONDS: int = 15 * 60
+    RECOGNITION_CACHE_SIZE: int = 1024  # результатов распознавания в памяти воркера
+    RECOGNITION_CACHE_DIR: str = "/tmp/autoteile_recognition_cache"
+    RECOGNITION_CACHE_DISK_ENTRIES: int = 10_000  # LRU на диске (0 — только память)
+
+    # --- Вложения поддержки ---
+    ATTACHMENT_STORAGE_DIR: str = "/tmp/autoteile_attachments"
+    ATTACHMENT_MAX_BYTES: int = 20 * 1024 * 1024
+    ATTACHMENT_BASE_URL: str = "/api/support/attachments"  # attachment_url = BASE_URL/<sha256>
+
+    # --- Pub/sub (сообщения поддержки в WebSocket) ---
+    PUBSUB_BACKEND: str = "local"  # local — один процесс; postgres — LISTEN/NOTIFY между воркерами
+    PUBSUB_PG_CHANNEL: str = "autoteile_events"
+    PUBSUB_QUEUE_SIZE: int = 100  # событий на подписчика; переполнение — отключение
+
     # --- Google OAuth ---
     GOOGLE_CLIENT_ID: str | None = None  # можно задать в .env
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v1/certs"
+    GOOGLE_CERTS_DEFAULT_MAX_AGE: int = 3600  # если Google не прислал Cache-Control
+    GOOGLE_CERTS_REFRESH_MARGIN: int = 300  # обновляем сертификаты в фоне за N секунд до истечения
 
     @property
     def database_url(self) -> str:
         return f"postgresql+psycopg2://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def async_database_url(self) -> str:
+        return self.database_url.replace("postgresql+psycopg2", "postgresql+asyncpg")
+
+    @property
+    def async_replica_database_url(self) -> str | None:
+        if not self.DB_REPLICA_HOST:
+            return None
+        port = self.DB_REPLICA_PORT or self.DB_PORT
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_REPLICA_HOST}:{port}/{self.DB_NAME}"
+
     # Настройки Pydantic v2
     model_config = ConfigDict(env_file=".env")
 
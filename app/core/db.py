@@ -1,18 +1,54 @@
 # --- Импорт всех моделей, чтобы Alembic их видел ---
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.core.config import settings
+from app.core.db_routing import requires_primary
+from app.core.metrics import InstrumentedAsyncPool, register_engine
 
 Base = declarative_base()
 
 
+def engine_options() -> dict:
+    """Параметры пула и asyncpg из Settings."""
+    server_settings = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+
+    return {
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    }
+
+
 # --- Асинхронный движок ---
 engine = create_async_engine(
-    settings.database_url.replace("postgresql+psycopg2", "postgresql+asyncpg"),
+    settings.async_database_url,
     echo=False,
     future=True,
+    **engine_options(),
 )
+register_engine("primary", engine)
+
+# --- Read-реплика (если настроена) ---
+read_engine = None
+if settings.async_replica_database_url:
+    read_engine = create_async_engine(
+        settings.async_replica_database_url,
+        echo=False,
+        future=True,
+        **engine_options(),
+    )
+    register_engine("replica", read_engine)
 
 # --- Асинхронная сессия ---
 AsyncSessionLocal = sessionmaker(
@@ -23,8 +59,27 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
+AsyncReadSessionLocal = None
+if read_engine is not None:
+    AsyncReadSessionLocal = sessionmaker(
+        bind=read_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+    )
+
 
 # --- Зависимость для FastAPI ---
 async def get_async_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """Сессия для read-only эндпоинтов: реплика, если она есть и не нужен read-your-writes."""
+    factory = AsyncSessionLocal
+    if AsyncReadSessionLocal is not None and not requires_primary(request):
+        factory = AsyncReadSessionLocal
+    async with factory() as session:
+        yield session
@@ -0,0 +1,61 @@
+# app/core/db_routing.py
+"""
+Маршрутизация чтений между primary и read-репликой.
+
+Read-only эндпоинты читают из реплики, кроме двух случаев:
+- пользователь сам что-то записал последние DB_READ_YOUR_WRITES_SECONDS секунд
+  (read-your-writes, учёт в памяти воркера);
+- клиент явно попросил `X-Consistency: strong`.
+"""
+from cachetools import TTLCache
+from fastapi import Request
+from jose import JWTError, jwt
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+
+CONSISTENCY_HEADER = "X-Consistency"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_recent_writers: TTLCache = TTLCache(maxsize=100_000, ttl=settings.DB_READ_YOUR_WRITES_SECONDS)
+
+
+def writer_key(request: Request) -> str | None:
+    """Ключ пользователя из Bearer-токена. Подпись не проверяем: ключ влияет только на выбор БД."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+
+
+def mark_write(request: Request) -> None:
+    key = writer_key(request)
+    if key:
+        _recent_writers[key] = True
+
+
+def requires_primary(request: Request) -> bool:
+    if request.headers.get(CONSISTENCY_HEADER, "").lower() == "strong":
+        return True
+    key = writer_key(request)
+    return key is not None and key in _recent_writers
+
+
+def read_only(request: Request) -> None:
+    """Зависимость для POST-эндпоинтов, которые ничего не пишут (батч-чтения): не считать их записью."""
+    request.state.read_only = True
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and not getattr(request.state, "read_only", False)
+        ):
+            mark_write(request)
+        return response
@@ -0,0 +1,176 @@
+# app/core/google_auth.py
+"""
+Асинхронная проверка Google ID-токенов.
+
+Сертификаты Google кэшируются в памяти на время из `Cache-Control: max-age`,
+обновляются в фоне незадолго до истечения, а сама проверка подписи
+выполняется локально в отдельном потоке, не блокируя event loop.
+"""
+import asyncio
+import re
+import time
+from typing import Any, Callable
+
+import httpx
+import jwt as pyjwt
+from google.auth import exceptions as google_exceptions
+from google.auth import jwt as google_jwt
+from loguru import logger
+
+from app.core.config import settings
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+# Не чаще одного принудительного обновления за это время (неизвестный kid)
+_FORCED_REFRESH_INTERVAL = 60
+
+
+def parse_max_age(headers: httpx.Headers, default: int) -> int:
+    """Время жизни ответа в секундах: max-age минус Age."""
+    match = _MAX_AGE_RE.search(headers.get("cache-control", ""))
+    if not match:
+        return default
+    age = int(headers.get("age", "0") or 0)
+    return max(int(match.group(1)) - age, 0)
+
+
+class GoogleTokenVerifier:
+    def __init__(
+        self,
+        certs_url: str,
+        audience: str | None = None,
+        default_max_age: int = 3600,
+        refresh_margin: int = 300,
+        transport: httpx.AsyncBaseTransport | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.certs_url = certs_url
+        self.audience = audience
+        self.default_max_age = default_max_age
+        self.refresh_margin = refresh_margin
+        self._transport = transport
+        self._clock = clock
+
+        self._keys: dict[str, Any] | None = None
+        self._jwks = False
+        self._expires_at = 0.0
+        self._last_forced_refresh = float("-inf")
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    # -----------------------
+    # Публичный API
+    # -----------------------
+    async def verify(self, token: str) -> dict:
+        """Проверяет токен и возвращает payload. Ошибки токена — ValueError."""
+        keys, jwks = await self._get_keys()
+
+        kid = self._token_kid(token)
+        if kid and kid not in keys and self._clock() - self._last_forced_refresh >= _FORCED_REFRESH_INTERVAL:
+            # Google мог уже сменить ключ, а наш кэш ещё не истёк
+            self._last_forced_refresh = self._clock()
+            keys, jwks = await self._refresh(force=True)
+
+        return await asyncio.to_thread(self._decode, token, keys, jwks)
+
+    async def close(self):
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+
+    # -----------------------
+    # Кэш сертификатов
+    # -----------------------
+    async def _get_keys(self):
+        now = self._clock()
+        if self._keys is None or now >= self._expires_at:
+            return await self._refresh()
+        if now >= self._expires_at - self.refresh_margin:
+            self._schedule_background_refresh()
+        return self._keys, self._jwks
+
+    def _schedule_background_refresh(self):
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self):
+        try:
+            await self._refresh(force=True)
+        except Exception as e:
+            logger.warning(f"Background refresh of Google certs failed: {e}")
+
+    async def _refresh(self, force: bool = False):
+        async with self._lock:
+            # Пока ждали lock, сертификаты мог обновить другой запрос
+            if not force and self._keys is not None and self._clock() < self._expires_at:
+                return self._keys, self._jwks
+            try:
+                keys, jwks, max_age = await self._fetch()
+            except (httpx.HTTPError, ValueError, KeyError, pyjwt.PyJWTError) as e:
+                if self._keys is None:
+                    raise google_exceptions.TransportError(f"Could not fetch Google certs: {e}") from e
+                # Старые ключи Google остаются валидными ещё некоторое время после ротации
+                logger.warning(f"Using stale Google certs, refresh failed: {e}")
+                return self._keys, self._jwks
+
+            self._keys, self._jwks = keys, jwks
+            self._expires_at = self._clock() + max_age
+            logger.debug(f"Fetched {len(keys)} Google certs, valid for {max_age}s")
+            return self._keys, self._jwks
+
+    async def _fetch(self):
+        async with httpx.AsyncClient(transport=self._transport, timeout=10) as client:
+            resp = await client.get(self.certs_url)
+            resp.raise_for_status()
+            data = resp.json()
+
+        max_age = parse_max_age(resp.headers, self.default_max_age)
+        if "keys" in data:
+            # Формат JWKS (oauth2/v3/certs)
+            keys = {k["kid"]: pyjwt.PyJWK(k) for k in data["keys"]}
+            return keys, True, max_age
+        # Формат {kid: PEM-сертификат} (oauth2/v1/certs)
+        return data, False, max_age
+
+    # -----------------------
+    # Проверка подписи (в потоке)
+    # -----------------------
+    @staticmethod
+    def _token_kid(token: str) -> str | None:
+        try:
+            return google_jwt.decode_header(token).get("kid")
+        except Exception:
+            return None
+
+    def _decode(self, token: str, keys: dict, jwks: bool) -> dict:
+        if jwks:
+            kid = self._token_kid(token)
+            if kid not in keys:
+                raise ValueError(f"Certificate for key id {kid} not found.")
+            key = keys[kid]
+            try:
+                payload = pyjwt.decode(
+                    token,
+                    key.key,
+                    algorithms=[key.algorithm_name],
+                    audience=self.audience,
+                    options={"verify_aud": self.audience is not None},
+                )
+            except pyjwt.PyJWTError as e:
+                raise ValueError(str(e)) from e
+        else:
+            payload = google_jwt.decode(token, certs=keys, audience=self.audience)
+
+        if payload.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {payload.get('iss')}")
+        return payload
+
+
+google_token_verifier = GoogleTokenVerifier(
+    certs_url=settings.GOOGLE_CERTS_URL,
+    audience=settings.GOOGLE_CLIENT_ID,
+    default_max_age=settings.GOOGLE_CERTS_DEFAULT_MAX_AGE,
+    refresh_margin=settings.GOOGLE_CERTS_REFRESH_MARGIN,
+)
@@ -0,0 +1,106 @@
+# app/core/metrics.py
+"""
+Простые in-process метрики: гистограммы и состояние пулов соединений.
+Отдаются в JSON через /metrics (см. app/routers/metrics_router.py).
+"""
+import bisect
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+# Границы бакетов в миллисекундах
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # последний бакет — +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> dict:
+        cumulative, buckets = 0, {}
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            buckets[f"le_{bound}"] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "avg": round(self.sum / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "buckets": buckets,
+        }
+
+
+# -----------------------
+# Пул соединений
+# -----------------------
+class PoolStats:
+    def __init__(self):
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_ms = Histogram()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, который меряет время ожидания каждого checkout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.acquisitions += 1
+            self.stats.wait_ms.observe((time.perf_counter() - started) * 1000)
+
+    def recreate(self):
+        # engine.dispose() пересоздаёт пул — статистику сохраняем
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+
+_engines: dict = {}
+
+
+def register_engine(name: str, engine) -> None:
+    """Регистрирует AsyncEngine; пул читаем при каждом снимке (он меняется после dispose)."""
+    _engines[name] = engine
+
+
+def pool_snapshot(pool: Pool) -> dict:
+    data = {"status": pool.status()}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        data.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        data.update(acquisitions=stats.acquisitions, timeouts=stats.timeouts, wait_ms=stats.wait_ms.snapshot())
+    return data
+
+
+def pools_snapshot() -> dict:
+    return {name: pool_snapshot(engine.sync_engine.pool) for name, engine in _engines.items()}
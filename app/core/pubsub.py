@@ -0,0 +1,182 @@
+# app/core/pubsub.py
+"""
+Pub/sub для доставки событий в WebSocket-соединения.
+
+Hub — внутри процесса: у каждого подписчика своя ограниченная очередь.
+Медленный подписчик, у которого очередь переполнилась, отключается
+(SlowConsumer), а не тормозит остальных и не копит память.
+
+Между воркерами события разносит broadcast-бэкенд (settings.PUBSUB_BACKEND):
+- local    — только текущий процесс (один воркер, тесты);
+- postgres — LISTEN/NOTIFY: публикация уходит в PostgreSQL, и каждый воркер,
+             включая отправителя, получает её и раздаёт своим подписчикам.
+"""
+import asyncio
+import json
+from collections import defaultdict
+
+from loguru import logger
+
+from app.core.config import settings
+
+_DROPPED = object()
+
+# Лимит payload у NOTIFY — 8000 байт
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+
+class SlowConsumer(Exception):
+    pass
+
+
+class Subscription:
+    def __init__(self, hub: "Hub", channels: tuple[str, ...], maxsize: int):
+        self.hub = hub
+        self.channels = channels
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize + 1)  # +1 место под отметку отключения
+        self.maxsize = maxsize
+        self.dropped = False
+
+    def _offer(self, message) -> bool:
+        if self.queue.qsize() >= self.maxsize:
+            return False
+        self.queue.put_nowait(message)
+        return True
+
+    def _drop(self) -> None:
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_DROPPED)
+
+    async def get(self):
+        message = await self.queue.get()
+        if message is _DROPPED:
+            raise SlowConsumer
+        return message
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.hub.unsubscribe(self)
+
+
+class Hub:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._channels: dict[str, set[Subscription]] = defaultdict(set)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, *channels: str) -> Subscription:
+        subscription = Subscription(self, channels, self.queue_size)
+        for channel in channels:
+            self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for channel in subscription.channels:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[channel]
+
+    def dispatch(self, channel: str, message) -> int:
+        """Раздаёт сообщение подписчикам этого процесса; возвращает число доставленных."""
+        self.published += 1
+        delivered = 0
+        for subscription in list(self._channels.get(channel, ())):
+            if subscription._offer(message):
+                delivered += 1
+            else:
+                logger.warning(f"Dropping slow subscriber of {channel}")
+                self.unsubscribe(subscription)
+                subscription._drop()
+                self.dropped += 1
+        self.delivered += delivered
+        return delivered
+
+    def snapshot(self) -> dict:
+        return {
+            "channels": len(self._channels),
+            "subscriptions": len({s for subs in self._channels.values() for s in subs}),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_subscribers": self.dropped,
+        }
+
+
+# -----------------------
+# Broadcast между воркерами
+# -----------------------
+class LocalBroadcast:
+    def __init__(self, hub: Hub):
+        self.hub = hub
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, channel: str, message: dict) -> None:
+        self.hub.dispatch(channel, message)
+
+
+class PostgresBroadcast:
+    """LISTEN/NOTIFY на отдельных соединениях asyncpg (вне пула SQLAlchemy)."""
+
+    def __init__(self, hub: Hub, dsn: str, pg_channel: str):
+        self.hub = hub
+        self.dsn = dsn
+        self.pg_channel = pg_channel
+        self._listener = None
+        self._sender = None
+        self._lock = asyncio.Lock()  # одно соединение asyncpg не выполняет запросы параллельно
+
+    async def start(self) -> None:
+        import asyncpg
+
+        self._listener = await asyncpg.connect(self.dsn)
+        await self._listener.add_listener(self.pg_channel, self._on_notify)
+        self._sender = await asyncpg.connect(self.dsn)
+
+    async def stop(self) -> None:
+        for conn in (self._listener, self._sender):
+            if conn is not None:
+                await conn.close()
+        self._listener = self._sender = None
+
+    def _on_notify(self, connection, pid, pg_channel, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+            self.hub.dispatch(event["channel"], event["message"])
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Malformed pub/sub notification: {e}")
+
+    async def publish(self, channel: str, message: dict) -> None:
+        if self._sender is None:
+            # Бэкенд не запущен (скрипты, тесты без lifespan) — доставляем хотя бы локально
+            self.hub.dispatch(channel, message)
+            return
+        payload = json.dumps({"channel": channel, "message": message}, default=str)
+        if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT:
+            # Слишком большое событие: отправляем заголовок, клиент догружает полное через REST
+            stub = {k: v for k, v in message.items() if k != "message"} | {"truncated": True}
+            payload = json.dumps({"channel": channel, "message": stub}, default=str)
+        async with self._lock:
+            await self._sender.execute("SELECT pg_notify($1, $2)", self.pg_channel, payload)
+
+
+def create_broadcast(hub: Hub):
+    if settings.PUBSUB_BACKEND == "postgres":
+        dsn = settings.database_url.replace("postgresql+psycopg2", "postgresql")
+        return PostgresBroadcast(hub, dsn, settings.PUBSUB_PG_CHANNEL)
+    return LocalBroadcast(hub)
+
+
+hub = Hub(queue_size=settings.PUBSUB_QUEUE_SIZE)
+broadcast = create_broadcast(hub)
@@ -0,0 +1,163 @@
+# app/core/query_stats.py
+"""
+Учёт SQL-запросов на один HTTP-запрос: число выражений, суммарное время в БД,
+число возвращённых строк и самое медленное выражение.
+
+Хуки висят на всех Engine (включая тестовые), но считают только внутри
+collect_queries(). Сборщики вложенные: middleware и тестовая фикстура видят
+одни и те же запросы. ContextVar доходит до кода в greenlet'ах AsyncSession —
+SQLAlchemy переносит контекст вызывающей задачи.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+STATEMENT_PREVIEW_CHARS = 200
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.rows = 0
+        self.slowest_ms = 0.0
+        self.slowest_statement: str | None = None
+        self.statements: list[str] = []
+
+    def record(self, statement: str, elapsed_ms: float, rows: int) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.rows += rows
+        self.statements.append(statement)
+        if elapsed_ms >= self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "X-DB-Query-Count": str(self.count),
+            "X-DB-Time-Ms": f"{self.total_ms:.2f}",
+            "X-DB-Rows": str(self.rows),
+            "X-DB-Slowest-Ms": f"{self.slowest_ms:.2f}",
+        }
+        if self.slowest_statement:
+            headers["X-DB-Slowest-Statement"] = preview(self.slowest_statement)
+        return headers
+
+
+def preview(statement: str) -> str:
+    """Однострочное начало выражения, пригодное для заголовка (latin-1)."""
+    text = " ".join(statement.split())[:STATEMENT_PREVIEW_CHARS]
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+_collectors: ContextVar[tuple[QueryStats, ...]] = ContextVar("query_stats_collectors", default=())
+
+
+@contextmanager
+def collect_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _collectors.set((*_collectors.get(), stats))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+# -----------------------
+# Хуки SQLAlchemy
+# -----------------------
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _collectors.get():
+        conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_stats_started")
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+
+    # Async-адаптеры (asyncpg, aiosqlite) выбирают результат целиком при execute и держат его в _rows
+    rows = getattr(cursor, "_rows", None)
+    if rows is not None:
+        returned = len(rows)
+    else:
+        returned = max(cursor.rowcount, 0) if cursor.description else 0
+
+    for stats in _collectors.get():
+        stats.record(statement, elapsed_ms, returned)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_stats_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+# -----------------------
+# Гистограммы по маршрутам
+# -----------------------
+class RouteQueryStats:
+    def __init__(self):
+        self.queries = Histogram(COUNT_BUCKETS)
+        self.db_ms = Histogram()
+        self.rows = Histogram(ROW_BUCKETS)
+        self.slowest_ms = 0.0
+        self.slowest_statement: str | None = None
+
+    def observe(self, stats: QueryStats) -> None:
+        self.queries.observe(stats.count)
+        self.db_ms.observe(stats.total_ms)
+        self.rows.observe(stats.rows)
+        if stats.slowest_statement and stats.slowest_ms >= self.slowest_ms:
+            self.slowest_ms = stats.slowest_ms
+            self.slowest_statement = preview(stats.slowest_statement)
+
+    def snapshot(self) -> dict:
+        return {
+            "queries": self.queries.snapshot(),
+            "db_ms": self.db_ms.snapshot(),
+            "rows": self.rows.snapshot(),
+            "slowest_ms": round(self.slowest_ms, 3),
+            "slowest_statement": self.slowest_statement,
+        }
+
+
+_routes: dict[str, RouteQueryStats] = {}
+
+
+def route_key(request: Request) -> str:
+    route = request.scope.get("route")
+    return f"{request.method} {route.path}" if route is not None else "unmatched"
+
+
+def routes_snapshot() -> dict:
+    return {key: stats.snapshot() for key, stats in sorted(_routes.items())}
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        with collect_queries() as stats:
+            response = await call_next(request)
+
+        key = route_key(request)
+        _routes.setdefault(key, RouteQueryStats()).observe(stats)
+
+        if settings.DEBUG:
+            response.headers.update(stats.headers())
+        return response
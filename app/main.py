@@ -1,11 +1,63 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from loguru import logger
 
-from app.routers import cart_router, favorites_router, search_router, support_router, user_router, vehicle_router
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.core.db_routing import ReadYourWritesMiddleware
+from app.core.google_auth import google_token_verifier
+from app.core.pubsub import broadcast
+from app.core.query_stats import QueryStatsMiddleware
+from app.routers import (
+    cart_router,
+    favorites_router,
+    metrics_router,
+    search_router,
+    support_agent_router,
+    support_router,
+    user_router,
+    vehicle_router,
+)
+from app.services.document_jobs import job_manager
+from app.services.token_service import refresh_token_store, run_refresh_token_purge
 
 from fastapi.middleware.cors import CORSMiddleware
 
 
-app = FastAPI(title="Fix Autoteile API", root_path="/api")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # --- Прогрев фильтра отозванных refresh-токенов ---
+    try:
+        async with AsyncSessionLocal() as db:
+            loaded = await refresh_token_store.load(db)
+        logger.info(f"Loaded {loaded} revoked refresh tokens")
+    except Exception as e:
+        logger.warning(f"Could not warm up refresh token store: {e}")
+
+    purge_task = asyncio.create_task(
+        run_refresh_token_purge(AsyncSessionLocal, settings.REFRESH_PURGE_INTERVAL_SECONDS)
+    )
+
+    # --- Рассылка событий между воркерами (WebSocket поддержки) ---
+    await broadcast.start()
+
+    # --- Очередь распознавания документов (с заданиями, прерванными рестартом) ---
+    try:
+        requeued = await job_manager.start()
+        logger.info(f"Document jobs started, {requeued} unfinished jobs requeued")
+    except Exception as e:
+        logger.warning(f"Could not requeue document jobs: {e}")
+
+    yield
+    purge_task.cancel()
+    await job_manager.stop()
+    await broadcast.stop()
+    await google_token_verifier.close()
+
+
+app = FastAPI(title="Fix Autoteile API", root_path="/api", lifespan=lifespan)
 
 
 app.add_middleware(
@@ -15,6 +67,8 @@ app.add_middleware(
     allow_methods=["*"],  # Разрешает все методы
     allow_headers=["*"],  # Разрешает все заголовки
 )
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(QueryStatsMiddleware)
 
 
 app.include_router(search_router.router)
@@ -22,4 +76,6 @@ app.include_router(user_router.router)
 app.include_router(vehicle_router.router)
 app.include_router(favorites_router.router)
 app.include_router(cart_router.router)
+app.include_router(support_agent_router.router)
 app.include_router(support_router.router)
+app.include_router(metrics_router.router)
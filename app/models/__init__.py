@@ -1,6 +1,8 @@
+from .document_job import DocumentJob as DocumentJob
+from .refresh_token import RefreshToken as RefreshToken
 from .support import SupportMessage as SupportMessage
 from .support import SupportTicket as SupportTicket
 from .user import User as User
 from .vehicle import Vehicle as Vehicle
 
-__all__ = ["SupportMessage", "SupportTicket", "User", "Vehicle"]
+__all__ = ["DocumentJob", "RefreshToken", "SupportMessage", "SupportTicket", "User", "Vehicle"]
@@ -0,0 +1,25 @@
+# app/models/document_job.py
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String, func
+
+from app.core.db import Base
+
+
+class DocumentJob(Base):
+    __tablename__ = "document_jobs"
+    __table_args__ = (
+        # Незавершённые задания поднимаются при старте воркера по статусу
+        Index("ix_document_jobs_status_created", "status", "created_at"),
+    )
+
+    id = Column(String(36), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String(16), nullable=False, default="queued")  # queued / running / done / failed
+    file_path = Column(String(512), nullable=False)
+    content_sha256 = Column(String(64), nullable=True)  # ключ кэша результатов распознавания
+    search_code = Column(String(128), nullable=True)
+    result = Column(JSON, nullable=True)  # ответ распознавателя
+    error = Column(String(512), nullable=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
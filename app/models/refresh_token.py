@@ -0,0 +1,15 @@
+# app/models/refresh_token.py
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+
+from app.core.db import Base
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    used_at = Column(DateTime(timezone=True), nullable=True)  # токен уже обменян на новый
+    revoked_at = Column(DateTime(timezone=True), nullable=True)  # logout / компрометация
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
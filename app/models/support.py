@@ -1,5 +1,5 @@
 # models/support.py
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DDL, Column, DateTime, ForeignKey, Index, Integer, String, Text, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -8,29 +8,75 @@ from app.core.db import Base
 
 class SupportTicket(Base):
     __tablename__ = "support_tickets"
+    __table_args__ = (
+        # Очередь агентов: тикеты одного статуса от старых к новым (keyset по created_at, id)
+        Index("ix_support_tickets_status_created", "status", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
     subject = Column(String(255), nullable=False)
     status = Column(String(64), default="open")  # open / in_progress / resolved / closed
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Агент, взявший тикет в работу (POST /support/agent/claim)
+    assigned_agent_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    assigned_at = Column(DateTime(timezone=True), nullable=True)
 
-    user = relationship("User", back_populates="tickets", lazy="selectin")
+    user = relationship("User", back_populates="tickets", lazy="raise_on_sql", foreign_keys=[user_id])
     messages = relationship(
         "SupportMessage",
         back_populates="ticket",
-        lazy="selectin",  # ✅ async-safe
-        cascade="all, delete-orphan"
+        lazy="raise_on_sql",  # переписка грузится постранично: GET /support/{id}/messages
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 class SupportMessage(Base):
     __tablename__ = "support_messages"
 
     id = Column(Integer, primary_key=True)
-    ticket_id = Column(Integer, ForeignKey("support_tickets.id", ondelete="CASCADE"))
+    ticket_id = Column(Integer, ForeignKey("support_tickets.id", ondelete="CASCADE"), index=True)
     sender = Column(String(32), nullable=False)  # user / agent / operator
     message = Column(Text, nullable=True)
-    attachment_url = Column(String(512), nullable=True)
+    attachment_url = Column(String(512), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    ticket = relationship("SupportTicket", back_populates="messages", lazy="selectin")
\ No newline at end of file
+    ticket = relationship("SupportTicket", back_populates="messages", lazy="raise_on_sql")
+
+
+# --- Полнотекстовый поиск по сообщениям ---
+# PostgreSQL: GIN-индекс по выражению to_tsvector; запрос должен использовать то же
+# выражение (SEARCH_VECTOR_SQL), иначе планировщик индекс не возьмёт.
+# SQLite (тесты, локальная разработка): внешняя FTS5-таблица, которую ведут триггеры.
+SEARCH_CONFIG = "german"
+SEARCH_VECTOR_SQL = f"to_tsvector('{SEARCH_CONFIG}', coalesce(support_messages.message, ''))"
+SQLITE_FTS_TABLE = "support_messages_fts"
+
+POSTGRES_SEARCH_DDL = (
+    f"CREATE INDEX IF NOT EXISTS ix_support_messages_search ON support_messages USING gin ({SEARCH_VECTOR_SQL})",
+)
+SQLITE_SEARCH_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        message, content='support_messages', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS support_messages_fts_insert AFTER INSERT ON support_messages BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, message) VALUES (new.id, new.message);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS support_messages_fts_delete AFTER DELETE ON support_messages BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, message) VALUES ('delete', old.id, old.message);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS support_messages_fts_update AFTER UPDATE OF message ON support_messages BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, message) VALUES ('delete', old.id, old.message);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, message) VALUES (new.id, new.message);
+    END""",
+)
+
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(SupportMessage.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(SupportMessage.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    SupportMessage.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}").execute_if(dialect="sqlite"),
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
@@ -12,17 +12,34 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     phone = Column(String, nullable=True)
     is_phantom = Column(Boolean, default=False)
+    is_support_agent = Column(Boolean, nullable=False, default=False, server_default="false")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Версии коллекций пользователя для ETag: растут при каждом изменении
+    cart_version = Column(Integer, nullable=False, default=0, server_default="0")
+    favorites_version = Column(Integer, nullable=False, default=0, server_default="0")
+    vehicles_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Связи грузятся только явно (selectinload / contains_eager): ленивый SQL-запрос
+    # при обращении к атрибуту — ошибка, а не тихий N+1.
+    # Удаление каскадом делает БД (ondelete="CASCADE"), коллекции для этого не грузятся.
     vehicles = relationship(
-        "Vehicle",
+        "Vehicle", back_populates="user", lazy="raise_on_sql", cascade="all, delete-orphan", passive_deletes=True
+    )
+    favorites = relationship(
+        "Favorite", back_populates="user", lazy="raise_on_sql", cascade="all, delete-orphan", passive_deletes=True
+    )
+    cart_items = relationship(
+        "CartItem", back_populates="user", lazy="raise_on_sql", cascade="all, delete-orphan", passive_deletes=True
+    )
+    tickets = relationship(
+        "SupportTicket",
         back_populates="user",
-        lazy="selectin",  # ✅ async-safe загрузка
+        lazy="raise_on_sql",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+        foreign_keys="SupportTicket.user_id",
     )
-    favorites = relationship("Favorite", back_populates="user", lazy="selectin", cascade="all, delete-orphan")
-    cart_items = relationship("CartItem", back_populates="user", lazy="selectin", cascade="all, delete-orphan")
-    tickets = relationship("SupportTicket", back_populates="user", lazy="selectin", cascade="all, delete-orphan")
 
 
 class Product(Base):
@@ -31,31 +48,40 @@ class Product(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(512))
     brand = Column(String(128))
-    price = Column(String(64))
+    price = Column(String(64))  # исходная строка из магазина, например "45,99 €"
+    price_cents = Column(Integer, nullable=True, index=True)
+    currency = Column(String(3), nullable=True)
     image_url = Column(String(512))
-    product_url = Column(String(512))
+    product_url = Column(String(512), unique=True, index=True)
+    seller_name = Column(String(256), nullable=True)
     delivery_time = Column(String(128))
     description = Column(String)
 
-    favorites = relationship("Favorite", back_populates="product", lazy="selectin", cascade="all, delete-orphan")
-    cart_items = relationship("CartItem", back_populates="product", lazy="selectin", cascade="all, delete-orphan")
+    favorites = relationship(
+        "Favorite", back_populates="product", lazy="raise_on_sql", cascade="all, delete-orphan", passive_deletes=True
+    )
+    cart_items = relationship(
+        "CartItem", back_populates="product", lazy="raise_on_sql", cascade="all, delete-orphan", passive_deletes=True
+    )
 
 
 class Favorite(Base):
     __tablename__ = "favorites"
+    __table_args__ = (Index("ix_favorites_user_id_product_id", "user_id", "product_id", unique=True),)
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"))
     vin = Column(String(64), nullable=True)  # Привязка к машине пользователя
 
-    product = relationship("Product", back_populates="favorites", lazy="selectin")
-    user = relationship("User", back_populates="favorites", lazy="selectin")
+    product = relationship("Product", back_populates="favorites", lazy="raise_on_sql")
+    user = relationship("User", back_populates="favorites", lazy="raise_on_sql")
 
 
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    __table_args__ = (Index("ix_cart_items_user_id_product_id", "user_id", "product_id", unique=True),)
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
@@ -63,5 +89,5 @@ class CartItem(Base):
     vin = Column(String(64), nullable=True)  # Привязка к машине пользователя
     quantity = Column(Integer, default=1)
 
-    product = relationship("Product", back_populates="cart_items", lazy="selectin")
-    user = relationship("User", back_populates="cart_items", lazy="selectin")
+    product = relationship("Product", back_populates="cart_items", lazy="raise_on_sql")
+    user = relationship("User", back_populates="cart_items", lazy="raise_on_sql")
@@ -1,5 +1,5 @@
 # app/models/user.py (Vehicle)
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
@@ -7,9 +7,19 @@ from app.core.db import Base
 
 class Vehicle(Base):
     __tablename__ = "vehicles"
+    __table_args__ = (
+        # Не больше одной выбранной машины на пользователя; заодно индекс для GET /vehicles/selected
+        Index(
+            "ux_vehicles_user_selected",
+            "user_id",
+            unique=True,
+            postgresql_where=text("is_selected"),
+            sqlite_where=text("is_selected"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
     vin = Column(String(64), index=True)
     brand = Column(String(128))
     model = Column(String(128))
@@ -18,4 +28,4 @@ class Vehicle(Base):
     search_code = Column(String(128), nullable=True)  # <- новое поле
     is_selected = Column(Boolean, default=False)
 
-    user = relationship("User", back_populates="vehicles")
+    user = relationship("User", back_populates="vehicles", lazy="raise_on_sql")
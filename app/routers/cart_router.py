@@ -1,43 +1,37 @@
-from fastapi import APIRouter, Depends, Form, HTTPException, Path
+from fastapi import APIRouter, Body, Depends, Form, HTTPException, Path, Request, Response
 from loguru import logger
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.db import get_async_db
-from app.models.user import CartItem, Product, User
-from app.routers.user_router import get_current_user
+from app.core.conditional import not_modified
+from app.core.db import get_async_db, get_read_db
+from app.models.user import CartItem, User
+from app.routers.user_router import get_current_reader, get_current_user
+from app.schemas.cart_schema import CartBulkItem, CartQuantityUpdate
+from app.services.cart_service import CartService
+from app.services.product_service import ProductService
+from app.services.user_service import UserService
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
 
 @router.get("/")
 async def get_cart(
-    user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_async_db),
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_reader),
+    session: AsyncSession = Depends(get_read_db),
 ):
+    if cached := not_modified(request, response, user, "cart"):
+        return cached
+
     try:
-        result = await session.execute(select(CartItem).where(CartItem.user_id == user.id))
-        items = result.scalars().all()
+        cart = await CartService.get_cart(session, user.id)
 
-        logger.info(f"User {user.email} fetched {len(items)} cart items")
+        logger.info(f"User {user.email} fetched {len(cart['items'])} cart items")
 
-        return [
-            {
-                "id": item.id,
-                "quantity": item.quantity,
-                "product": {
-                    "title": item.product.title,
-                    "product_url": item.product.product_url,
-                    "image_url": item.product.image_url,
-                    "price": item.product.price,
-                    "seller_name": getattr(item.product, "seller_name", "N/A"),
-                    "delivery_time": getattr(item.product, "delivery_time", None),
-                    "description": getattr(item.product, "description", ""),
-                },
-            }
-            for item in items
-        ]
+        return cart
 
     except SQLAlchemyError as e:
         logger.error(f"Database error while retrieving cart for user {user.email}: {e}")
@@ -48,6 +42,29 @@ async def get_cart(
         raise HTTPException(status_code=500, detail="Unexpected error occurred")
 
 
+@router.get("/summary")
+async def get_cart_summary(
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_reader),
+    session: AsyncSession = Depends(get_read_db),
+):
+    """Количество позиций и суммы по валютам и продавцам — для бейджа в шапке, без загрузки товаров."""
+    if cached := not_modified(request, response, user, "cart"):
+        return cached
+
+    try:
+        return await CartService.summary(session, user.id, user.cart_version)
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while computing cart summary for user {user.email}: {e}")
+        raise HTTPException(status_code=500, detail="Database error while retrieving cart summary")
+
+    except Exception as e:
+        logger.exception(f"Unexpected error in get_cart_summary for user {user.email}: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error occurred")
+
+
 @router.post("/add")
 async def add_to_cart(
     title: str = Form(...),
@@ -55,6 +72,7 @@ async def add_to_cart(
     price: str = Form(""),
     image_url: str = Form(""),
     product_url: str = Form(...),
+    seller_name: str = Form(""),
     delivery_time: str = Form(""),
     description: str = Form(""),
     vin: str | None = Form(None),
@@ -63,59 +81,30 @@ async def add_to_cart(
     session: AsyncSession = Depends(get_async_db),
 ):
     try:
-        # Проверяем — есть ли товар с таким URL
-        result = await session.execute(select(Product).where(Product.product_url == product_url))
-        product = result.scalar_one_or_none()
-
-        # Если нет — создаём новый товар
-        if not product:
-            product = Product(
-                title=title,
-                brand=brand,
-                price=price,
-                image_url=image_url,
-                product_url=product_url,
-                delivery_time=delivery_time,
-                description=description,
-            )
-            session.add(product)
-            await session.flush()  # чтобы получить ID
-
-        # Проверяем, есть ли уже этот товар в корзине
-        existing = await session.execute(
-            select(CartItem).where(CartItem.user_id == user.id, CartItem.product_id == product.id)
+        # Товар и строка корзины — два атомарных upsert'а, без гонок между SELECT и INSERT
+        product = await ProductService.upsert(
+            session,
+            {
+                "title": title,
+                "brand": brand,
+                "price": price,
+                "image_url": image_url,
+                "product_url": product_url,
+                "seller_name": seller_name,
+                "delivery_time": delivery_time,
+                "description": description,
+            },
         )
-        cart_item = existing.scalar_one_or_none()
-
-        if cart_item:
-            cart_item.quantity += quantity
-            logger.info(f"User {user.email} increased qty for product {product.id} to {cart_item.quantity}")
-        else:
-            cart_item = CartItem(
-                user_id=user.id,
-                product_id=product.id,
-                quantity=quantity,
-                vin=vin,
-            )
-            session.add(cart_item)
-            logger.info(f"User {user.email} added product {product.id} ({product.title}) to cart")
-
+        cart_item = await CartService.add_item(session, user.id, product["id"], quantity, vin)
+        await UserService.bump_version(session, user.id, "cart")
         await session.commit()
-        await session.refresh(cart_item)
+
+        logger.info(f"User {user.email} added product {product['id']} to cart (qty now {cart_item['quantity']})")
 
         return {
-            "id": cart_item.id,
-            "quantity": cart_item.quantity,
-            "product": {
-                "id": product.id,
-                "title": product.title,
-                "price": product.price,
-                "product_url": product.product_url,
-                "image_url": product.image_url,
-                "brand": product.brand,
-                "delivery_time": product.delivery_time,
-                "description": product.description,
-            },
+            "id": cart_item["id"],
+            "quantity": cart_item["quantity"],
+            "product": product,
         }
 
     except SQLAlchemyError as e:
@@ -129,6 +118,92 @@ async def add_to_cart(
         raise HTTPException(status_code=500, detail="Unexpected error occurred while adding to cart")
 
 
+# --- Массовые операции: постоянное число запросов и одна транзакция на весь список ---
+MAX_BULK_ITEMS = 100
+
+
+@router.post("/bulk")
+async def add_to_cart_bulk(
+    items: list[CartBulkItem] = Body(..., min_length=1, max_length=MAX_BULK_ITEMS),
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_db),
+):
+    """Добавляет список товаров (например, весь комплект для замены тормозов) и возвращает корзину."""
+    try:
+        await CartService.add_items(session, user.id, [item.model_dump() for item in items])
+        await UserService.bump_version(session, user.id, "cart")
+        await session.commit()
+
+        logger.info(f"User {user.email} bulk-added {len(items)} products to cart")
+
+        return await CartService.get_cart(session, user.id)
+
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logger.error(f"DB error during bulk add to cart for {user.email}: {e}")
+        raise HTTPException(status_code=500, detail="Database error while adding to cart")
+
+    except Exception as e:
+        await session.rollback()
+        logger.exception(f"Unexpected error in add_to_cart_bulk for {user.email}: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error occurred while adding to cart")
+
+
+@router.post("/bulk/remove")
+async def remove_from_cart_bulk(
+    ids: list[int] = Body(..., min_length=1, max_length=MAX_BULK_ITEMS),
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_db),
+):
+    """Удаляет строки корзины по id; чужие и несуществующие id игнорируются."""
+    try:
+        removed = await CartService.remove_items(session, user.id, ids)
+        await UserService.bump_version(session, user.id, "cart")
+        await session.commit()
+
+        logger.info(f"User {user.email} bulk-removed {len(removed)} cart items")
+
+        return await CartService.get_cart(session, user.id)
+
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logger.error(f"DB error during bulk remove from cart for {user.email}: {e}")
+        raise HTTPException(status_code=500, detail="Database error while removing cart items")
+
+    except Exception as e:
+        await session.rollback()
+        logger.exception(f"Unexpected error in remove_from_cart_bulk for {user.email}: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error occurred while removing cart items")
+
+
+@router.patch("/bulk")
+async def update_cart_bulk(
+    updates: list[CartQuantityUpdate] = Body(..., min_length=1, max_length=MAX_BULK_ITEMS),
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_db),
+):
+    """Устанавливает количества для нескольких строк корзины; quantity = 0 удаляет строку."""
+    try:
+        # При повторе id побеждает последнее значение
+        await CartService.set_quantities(session, user.id, {u.id: u.quantity for u in updates})
+        await UserService.bump_version(session, user.id, "cart")
+        await session.commit()
+
+        logger.info(f"User {user.email} bulk-updated {len(updates)} cart items")
+
+        return await CartService.get_cart(session, user.id)
+
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logger.error(f"DB error during bulk cart update for {user.email}: {e}")
+        raise HTTPException(status_code=500, detail="Database error while updating cart")
+
+    except Exception as e:
+        await session.rollback()
+        logger.exception(f"Unexpected error in update_cart_bulk for {user.email}: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error occurred while updating cart")
+
+
 @router.delete("/remove/{id}")
 async def remove_from_cart(
     id: int = Path(...),
@@ -142,6 +217,7 @@ async def remove_from_cart(
             raise HTTPException(status_code=404, detail="Cart item not found")
 
         await session.delete(item)
+        await UserService.bump_version(session, user.id, "cart")
         await session.commit()
 
         logger.info(f"User {user.email} removed cart item {id}")
@@ -189,6 +265,7 @@ async def decrease_cart_item_quantity(
         if cart_item.quantity > 1:
             cart_item.quantity -= 1
             logger.info(f"User {user.email} decreased quantity for cart item {cart_item_id} to {cart_item.quantity}")
+            await UserService.bump_version(session, user.id, "cart")
             await session.commit()
             await session.refresh(cart_item)
             
@@ -201,6 +278,7 @@ async def decrease_cart_item_quantity(
         else:
             # Если количество было 1, удаляем товар из корзины
             await session.delete(cart_item)
+            await UserService.bump_version(session, user.id, "cart")
             await session.commit()
             logger.info(f"User {user.email} removed cart item {cart_item_id} (quantity reached 0)")
             
@@ -253,6 +331,7 @@ async def update_cart_item_quantity(
         if quantity == 0:
             # Удаляем товар из корзины
             await session.delete(cart_item)
+            await UserService.bump_version(session, user.id, "cart")
             await session.commit()
             logger.info(f"User {user.email} removed cart item {cart_item_id} (quantity set to 0)")
             
@@ -265,6 +344,7 @@ async def update_cart_item_quantity(
         else:
             # Обновляем количество
             cart_item.quantity = quantity
+            await UserService.bump_version(session, user.id, "cart")
             await session.commit()
             await session.refresh(cart_item)
             
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, Form, HTTPException, Path
+from fastapi import APIRouter, Depends, Form, HTTPException, Path, Request, Response
 from loguru import logger
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-
-from app.core.db import get_async_db
-from app.models.user import Favorite, Product, User
-from app.routers.user_router import get_current_user
+from sqlalchemy.orm import contains_eager
+
+from app.core.conditional import not_modified
+from app.core.db import get_async_db, get_read_db
+from app.core.db_routing import read_only
+from app.models.user import Favorite, User
+from app.routers.user_router import get_current_reader, get_current_user
+from app.schemas.favorite_schema import ProductStatus, ProductStatusRequest
+from app.services.favorite_service import FavoriteService
+from app.services.product_service import ProductService, upsert_insert
+from app.services.user_service import UserService
 
 router = APIRouter(prefix="/favorites", tags=["favorites"])
 
@@ -18,6 +25,7 @@ async def add_favorite(
     price: str = Form(""),
     image_url: str = Form(""),
     product_url: str = Form(...),
+    seller_name: str = Form(""),
     delivery_time: str = Form(""),
     description: str = Form(""),
     vin: str | None = Form(None),
@@ -25,54 +33,46 @@ async def add_favorite(
     session: AsyncSession = Depends(get_async_db),
 ):
     try:
-        # Проверяем — есть ли уже такой товар в БД
-        result = await session.execute(select(Product).where(Product.product_url == product_url))
-        product = result.scalar_one_or_none()
-
-        # Если нет — создаём новый
-        if not product:
-            product = Product(
-                title=title,
-                brand=brand,
-                price=price,
-                image_url=image_url,
-                product_url=product_url,
-                delivery_time=delivery_time,
-                description=description,
-            )
-            session.add(product)
-            await session.flush()  # чтобы получить id до коммита
-
-        # Проверяем, не добавлен ли уже в избранное
-        existing = await session.execute(
-            select(Favorite).where(Favorite.user_id == user.id, Favorite.product_id == product.id)
+        product = await ProductService.upsert(
+            session,
+            {
+                "title": title,
+                "brand": brand,
+                "price": price,
+                "image_url": image_url,
+                "product_url": product_url,
+                "seller_name": seller_name,
+                "delivery_time": delivery_time,
+                "description": description,
+            },
         )
-        if existing.scalar_one_or_none():
+
+        # ON CONFLICT DO NOTHING: пустой RETURNING значит, что товар уже в избранном
+        stmt = (
+            upsert_insert(session, Favorite)
+            .values(user_id=user.id, product_id=product["id"], vin=vin)
+            .on_conflict_do_nothing(index_elements=[Favorite.user_id, Favorite.product_id])
+            .returning(Favorite.id, Favorite.vin)
+        )
+        fav = (await session.execute(stmt)).one_or_none()
+        if fav is None:
+            await session.rollback()
             raise HTTPException(status_code=400, detail="Already in favorites")
 
-        # Создаём избранное
-        fav = Favorite(user_id=user.id, product_id=product.id, vin=vin)
-        session.add(fav)
+        await UserService.bump_version(session, user.id, "favorites")
         await session.commit()
-        await session.refresh(fav)
 
-        logger.info(f"User {user.email} added product {product.id} ({product.title}) to favorites")
+        logger.info(f"User {user.email} added product {product['id']} ({product['title']}) to favorites")
 
         return {
             "id": fav.id,
             "vin": fav.vin,
-            "product": {
-                "id": product.id,
-                "title": product.title,
-                "price": product.price,
-                "product_url": product.product_url,
-                "image_url": product.image_url,
-                "brand": product.brand,
-                "delivery_time": product.delivery_time,
-                "description": product.description,
-            },
+            "product": product,
         }
 
+    except HTTPException:
+        raise
+
     except SQLAlchemyError as e:
         await session.rollback()
         logger.error(f"DB error while adding favorite for {user.email}: {e}")
@@ -86,11 +86,22 @@ async def add_favorite(
 
 @router.get("/")
 async def list_favorites(
-    user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_async_db),
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_reader),
+    session: AsyncSession = Depends(get_read_db),
 ):
+    if cached := not_modified(request, response, user, "favorites"):
+        return cached
+
     try:
-        result = await session.execute(select(Favorite).where(Favorite.user_id == user.id))
+        result = await session.execute(
+            select(Favorite)
+            .join(Favorite.product)
+            .options(contains_eager(Favorite.product))
+            .where(Favorite.user_id == user.id)
+            .order_by(Favorite.id)
+        )
         favorites = result.scalars().all()
 
         logger.info(f"User {user.email} fetched {len(favorites)} favorite items")
@@ -104,7 +115,7 @@ async def list_favorites(
                     "product_url": f.product.product_url,
                     "image_url": f.product.image_url,
                     "price": f.product.price,
-                    "seller_name": getattr(f.product, "seller_name", "N/A"),
+                    "seller_name": f.product.seller_name or "N/A",
                     "delivery_time": getattr(f.product, "delivery_time", None),
                     "description": getattr(f.product, "description", ""),
                 },
@@ -121,6 +132,28 @@ async def list_favorites(
         raise HTTPException(status_code=500, detail="Unexpected error occurred while retrieving favorites")
 
 
+@router.post("/status", response_model=list[ProductStatus], dependencies=[Depends(read_only)])
+async def favorites_status(
+    data: ProductStatusRequest,
+    user: User = Depends(get_current_reader),
+    session: AsyncSession = Depends(get_read_db),
+):
+    """
+    Для страницы результатов поиска: какие из product_url уже в избранном и в корзине.
+    Заменяет загрузку обоих списков целиком на клиент.
+    """
+    try:
+        return await FavoriteService.product_status(session, user, data.product_urls)
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while checking favorites status for {user.email}: {e}")
+        raise HTTPException(status_code=500, detail="Database error while checking favorites status")
+
+    except Exception as e:
+        logger.exception(f"Unexpected error in favorites_status for user {user.email}: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error occurred")
+
+
 @router.delete("/{id}")
 async def remove_favorite(
     id: int = Path(...),
@@ -134,6 +167,7 @@ async def remove_favorite(
             raise HTTPException(status_code=404, detail="Favorite not found")
 
         await session.delete(fav)
+        await UserService.bump_version(session, user.id, "favorites")
         await session.commit()
 
         logger.info(f"User {user.email} removed favorite {id}")
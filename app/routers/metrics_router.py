@@ -0,0 +1,51 @@
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.metrics import pools_snapshot
+from app.core.pubsub import hub
+from app.core.query_stats import routes_snapshot
+from app.services.document_jobs import job_manager
+
+
+# --- Доступ: состояние пулов, текст SQL и тайминги маршрутов наружу не отдаём ---
+def require_metrics_access(request: Request):
+    if settings.DEBUG:
+        return
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(require_metrics_access)])
+
+
+@router.get("/db")
+async def db_pool_metrics():
+    """Состояние пулов соединений текущего воркера и время ожидания соединения (мс)."""
+    return pools_snapshot()
+
+
+@router.get("/queries")
+async def query_metrics():
+    """SQL на запрос по маршрутам: число выражений, время в БД (мс), строки, самое медленное выражение."""
+    return routes_snapshot()
+
+
+@router.get("/jobs")
+async def job_metrics():
+    """Распознавание документов: глубина очереди, загрузка воркеров, время ожидания/обработки (мс)."""
+    return job_manager.snapshot()
+
+
+@router.get("/pubsub")
+async def pubsub_metrics():
+    """Подписки WebSocket этого воркера: каналы, доставленные события, отключённые медленные клиенты."""
+    return hub.snapshot()
@@ -4,6 +4,10 @@ from pydantic import BaseModel
 from typing import List, Optional
 import random
 
+from app.services.document_jobs import job_manager
+from app.services.uploads import DocumentTooLarge
+from app.utils.prices import parse_price
+
 router = APIRouter(prefix="/search", tags=["search"])
 
 
@@ -208,6 +212,19 @@ async def search_parts(
             detail="You must provide at least one of: search_code, document, query_text, or part_photo",
         )
 
+    # Распознавание загрузок: повторная загрузка того же файла берётся из кэша по SHA-256
+    search_parameters = MOCK_SEARCH_PARAMETERS.model_copy()
+    try:
+        if document:
+            recognized = await job_manager.recognize("document", document)
+            search_parameters.vin_recognized = recognized["vin"]
+            search_parameters.kba_recognized = recognized["kba_code"]
+        if part_photo:
+            identified = await job_manager.recognize("part_photo", part_photo)
+            search_parameters.identified_part_type = identified["part_type"]
+    except DocumentTooLarge:
+        raise HTTPException(status_code=413, detail="Uploaded file is too large")
+
     # Начинаем с полного списка продуктов
     filtered_products = MOCK_PRODUCTS.copy()
     
@@ -229,17 +246,17 @@ async def search_parts(
         position_german = "Vorderachse" if position == PartPosition.front else "Hinterachse"
         filtered_products = [p for p in filtered_products if p.position and position_german in p.position]
     
-    # Фильтрация по цене (простая реализация)
+    # Фильтрация по цене (в центах, как products.price_cents)
     if price_min is not None:
         filtered_products = [
-            p for p in filtered_products 
-            if float(p.price.split(' ')[0].replace(',', '.')) >= price_min
+            p for p in filtered_products
+            if (cents := parse_price(p.price)[0]) is not None and cents >= round(price_min * 100)
         ]
-    
+
     if price_max is not None:
         filtered_products = [
-            p for p in filtered_products 
-            if float(p.price.split(' ')[0].replace(',', '.')) <= price_max
+            p for p in filtered_products
+            if (cents := parse_price(p.price)[0]) is not None and cents <= round(price_max * 100)
         ]
 
     # Пагинация
@@ -252,6 +269,6 @@ async def search_parts(
         status="ok",
         data=SearchResponseData(
             products=paginated_products,
-            search_parameters_used=MOCK_SEARCH_PARAMETERS
+            search_parameters_used=search_parameters
         )
     )
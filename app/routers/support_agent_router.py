@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_async_db as get_db
+from app.core.db import get_read_db
+from app.routers.user_router import get_current_reader, get_current_user
+from app.schemas.support_schema import SupportAgentTicket, SupportQueuePage, SupportSearchPage
+from app.services.support_service import QUEUE_STATUSES, SupportService
+
+router = APIRouter(prefix="/support/agent", tags=["Support agent"])
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+# --- Доступ только для сотрудников поддержки ---
+def require_agent(user):
+    if not user.is_support_agent:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Support agents only")
+    return user
+
+
+async def get_current_agent(user=Depends(get_current_user)):
+    return require_agent(user)
+
+
+async def get_current_agent_reader(user=Depends(get_current_reader)):
+    return require_agent(user)
+
+
+@router.get("/queue", response_model=SupportQueuePage)
+async def get_queue(
+    status_filter: list[str] = Query(list(QUEUE_STATUSES), alias="status"),
+    cursor: int | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    agent=Depends(get_current_agent_reader),
+):
+    """Tickets of all users with the given statuses, oldest first."""
+    statuses = list(dict.fromkeys(status_filter))
+    return await SupportService.agent_queue(db=db, statuses=statuses, cursor=cursor, limit=limit)
+
+
+@router.get("/search", response_model=SupportSearchPage)
+async def search_messages(
+    q: str = Query(..., min_length=2, max_length=200),
+    cursor: int = Query(0, ge=0, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    agent=Depends(get_current_agent_reader),
+):
+    """Full-text search over messages of all tickets: one hit per ticket, best match first, with a snippet."""
+    return await SupportService.search_messages(db=db, q=q, offset=cursor, limit=limit)
+
+
+@router.post(
+    "/claim",
+    response_model=SupportAgentTicket,
+    responses={204: {"description": "No open tickets"}},
+)
+async def claim_ticket(
+    db: AsyncSession = Depends(get_db),
+    agent=Depends(get_current_agent),
+):
+    """Assigns the oldest open ticket to the current agent and moves it to in_progress."""
+    ticket = await SupportService.claim_next_ticket(db=db, agent_id=agent.id)
+    if ticket is None:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return ticket
@@ -1,13 +1,48 @@
-from fastapi import APIRouter, Depends, File, UploadFile
+import asyncio
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+    WebSocketException,
+    status,
+)
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from starlette.datastructures import UploadFile as StarletteUploadFile
 
 from app.core.db import get_async_db as get_db
-from app.routers.user_router import get_current_user
-from app.schemas.support_schema import SupportMessageCreate, SupportMessageRead, SupportTicketCreate, SupportTicketRead
-from app.services.support_service import SupportService
+from app.core.db import get_read_db
+from app.core.config import settings
+from app.core.pubsub import SlowConsumer, Subscription, hub
+from app.models.support import SupportTicket
+from app.models.user import User
+from app.routers.user_router import email_from_access_token, get_current_reader, get_current_user
+from app.schemas.support_schema import (
+    SupportMessageCreate,
+    SupportMessagePage,
+    SupportMessageRead,
+    SupportTicketCreate,
+    SupportTicketPage,
+    SupportTicketRead,
+)
+from app.services.storage import object_store
+from app.services.support_service import SupportService, message_channels
+from app.services.user_service import UserService
 
 router = APIRouter(prefix="/support", tags=["Support"])
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MULTIPART_OVERHEAD = 64 * 1024  # заголовки и границы multipart сверх размера файла
+INLINE_ATTACHMENT_TYPES = frozenset({"image/jpeg", "image/png", "image/gif", "image/webp"})
+
 
 @router.post("/", response_model=SupportTicketRead)
 async def create_ticket(
@@ -18,12 +53,29 @@ async def create_ticket(
     return await SupportService.create_ticket(db=db, user_id=user.id, subject=data.subject)
 
 
-@router.get("/", response_model=list[SupportTicketRead])
+@router.get("/", response_model=SupportTicketPage)
 async def get_my_tickets(
-    db: AsyncSession = Depends(get_db),
-    user=Depends(get_current_user),
+    cursor: int | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    user=Depends(get_current_reader),
 ):
-    return await SupportService.get_user_tickets(db=db, user_id=user.id)
+    """Ticket summaries, newest first: message count, last activity and a preview of the last message."""
+    return await SupportService.list_ticket_summaries(db=db, user_id=user.id, cursor=cursor, limit=limit)
+
+
+@router.get("/{ticket_id}/messages", response_model=SupportMessagePage)
+async def get_ticket_messages(
+    ticket_id: int,
+    cursor: int | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    user=Depends(get_current_reader),
+):
+    """Messages of a ticket, newest first."""
+    return await SupportService.list_messages(
+        db=db, ticket_id=ticket_id, user_id=user.id, cursor=cursor, limit=limit
+    )
 
 
 @router.post("/{ticket_id}/message", response_model=SupportMessageRead)
@@ -43,11 +95,125 @@ async def add_message(
     )
 
 
-@router.post("/{ticket_id}/upload")
+@router.post(
+    "/{ticket_id}/upload",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                    }
+                }
+            },
+        }
+    },
+)
 async def upload_file(
     ticket_id: int,
-    file: UploadFile = File(...),
+    request: Request,
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
-    return await SupportService.upload_attachment(db=db, ticket_id=ticket_id, user_id=user.id, file=file)
+    # Тело разбираем сами: с параметром File(...) FastAPI принял бы весь multipart
+    # ещё до вызова эндпоинта, а так слишком большой запрос отклоняется по Content-Length сразу
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.ATTACHMENT_MAX_BYTES + MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail="Attachment is too large")
+
+    async with request.form(max_files=1) as form:
+        file = form.get("file")
+        if not isinstance(file, StarletteUploadFile):
+            raise HTTPException(status_code=422, detail="Field 'file' is required")
+        return await SupportService.upload_attachment(db=db, ticket_id=ticket_id, user_id=user.id, file=file)
+
+
+@router.get("/attachments/{key}")
+async def download_attachment(
+    key: str = Path(..., pattern=r"^[0-9a-f]{64}$"),
+    db: AsyncSession = Depends(get_read_db),
+    user=Depends(get_current_reader),
+):
+    """Attachment content; supports Range requests. Objects are immutable, so they are cached by clients."""
+    path = object_store.path(key)
+    if path is None or not await SupportService.can_read_attachment(db, user.id, key):
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    meta = await object_store.head(key) or {}
+    content_type = meta.get("content_type", "application/octet-stream")
+    # Тип задаёт загрузивший: inline показываем только растровые картинки, остальное
+    # (HTML, SVG, ...) — скачиванием, чтобы оно не исполнялось на домене API
+    disposition = "inline" if content_type in INLINE_ATTACHMENT_TYPES else "attachment"
+    return FileResponse(
+        path,
+        media_type=content_type,
+        headers={
+            "Cache-Control": "private, max-age=31536000, immutable",
+            "Content-Disposition": f'{disposition}; filename="{key}"',
+            "X-Content-Type-Options": "nosniff",
+            "Content-Security-Policy": "sandbox",
+        },
+    )
+
+
+# --- Доставка новых сообщений в реальном времени ---
+async def websocket_user(token: str, db: AsyncSession) -> User:
+    """Пользователь по access-токену из ?token= (браузер не передаёт заголовки в WebSocket)."""
+    try:
+        email = email_from_access_token(token)
+    except HTTPException:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
+    user = await UserService.get_user_by_email(db, email)
+    if not user:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
+    return user
+
+
+async def _wait_disconnect(websocket: WebSocket) -> None:
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+
+async def stream_events(websocket: WebSocket, subscription: Subscription) -> None:
+    """Отправляет события подписки, пока клиент не отключится; медленный клиент закрывается с 1013."""
+    await websocket.accept()
+    async with subscription:
+        disconnected = asyncio.create_task(_wait_disconnect(websocket))
+        try:
+            while True:
+                next_event = asyncio.create_task(subscription.get())
+                await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_event.done():
+                    next_event.cancel()
+                    return
+                await websocket.send_json(next_event.result())
+        except SlowConsumer:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        finally:
+            disconnected.cancel()
+
+
+@router.websocket("/ws")
+async def my_messages_ws(websocket: WebSocket, token: str = Query(...), db: AsyncSession = Depends(get_db)):
+    """New messages in all tickets of the user."""
+    user = await websocket_user(token, db)
+    await db.close()  # соединение с БД не держим всё время подписки
+    await stream_events(websocket, hub.subscribe(f"user:{user.id}"))
+
+
+@router.websocket("/{ticket_id}/ws")
+async def ticket_messages_ws(
+    websocket: WebSocket, ticket_id: int, token: str = Query(...), db: AsyncSession = Depends(get_db)
+):
+    """New messages in one ticket."""
+    user = await websocket_user(token, db)
+    owner_id = await db.scalar(select(SupportTicket.user_id).where(SupportTicket.id == ticket_id))
+    await db.close()
+    if owner_id != user.id:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Ticket not found")
+    await stream_events(websocket, hub.subscribe(message_channels(ticket_id, user.id)[0]))
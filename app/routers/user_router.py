@@ -1,16 +1,22 @@
 # app/routers/user_router.py
+import uuid
 from datetime import UTC, datetime, timedelta
 from fastapi import APIRouter, Depends, Form, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token
+from google.auth.exceptions import TransportError
 from jose import JWTError, jwt
+from loguru import logger
 from pydantic import ValidationError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_object_session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.core.db import get_async_db as get_db
+from app.core.db import get_read_db
+from app.core.google_auth import google_token_verifier
 from app.schemas.user_schema import GoogleLogin, Token, UserRegister, UserResponse
+from app.services.token_service import refresh_token_store
 from app.services.user_service import UserService
+from app.services.vehicle_service import VehicleService
 
 SECRET_KEY = "your-secret-key"
 REFRESH_SECRET_KEY = "your-refresh-secret-key"
@@ -34,8 +40,25 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None):
     to_encode.update({"exp": expire, "type": "refresh"})
     return jwt.encode(to_encode, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
 
+def new_refresh_token(user) -> tuple[str, str, datetime]:
+    """Refresh-токен с уникальным jti: (token, jti, expires_at)"""
+    jti = uuid.uuid4().hex
+    expires_delta = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    token = create_refresh_token({"sub": user.email, "jti": jti}, expires_delta)
+    return token, jti, datetime.now(UTC) + expires_delta
+
+async def issue_tokens(db: AsyncSession, user) -> Token:
+    refresh_token, jti, expires_at = new_refresh_token(user)
+    await refresh_token_store.register(db, jti, user.id, expires_at)
+    await db.commit()
+    return Token(
+        access_token=create_access_token({"sub": user.email}),
+        refresh_token=refresh_token,
+        token_type="bearer"
+    )
+
 # Current user dependency
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+def email_from_access_token(token: str) -> str:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -49,10 +72,28 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
+    return email
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    email = email_from_access_token(token)
     user = await UserService.get_user_by_email(db, email)
     if not user:
-        raise credentials_exception
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    return user
+
+# Current user for read-only endpoints (может читать из реплики)
+async def get_current_reader(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_read_db),
+    primary_db: AsyncSession = Depends(get_db),
+):
+    email = email_from_access_token(token)
+    user = await UserService.get_user_by_email(db, email)
+    if not user and db.bind is not primary_db.bind:
+        # Только что зарегистрированный пользователь мог ещё не доехать до реплики
+        user = await UserService.get_user_by_email(primary_db, email)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
     return user
 
 # --- REGISTER ---
@@ -83,18 +124,12 @@ async def register(
         errors = [{"field": err["loc"][0], "message": err["msg"]} for err in e.errors()]
         raise HTTPException(status_code=400, detail=errors)
 
-    # Проверка на существующего пользователя
-    if await UserService.get_user_by_email(db, email):
-        raise HTTPException(status_code=400, detail="Email is already registered")
-
+    # Дубликат email определяется уникальным индексом внутри create_user
     try:
-        user = await UserService.create_user(db, user_data)
-        await db.refresh(user, attribute_names=["vehicles"])
+        return await UserService.create_user(db, user_data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return user
-
 # --- LOGIN ---
 @router.post("/login", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
@@ -102,72 +137,83 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
     if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    access_token = create_access_token({"sub": user.email})
-    refresh_token = create_refresh_token({"sub": user.email})
-    
-    return Token(
-        access_token=access_token,
-        refresh_token=refresh_token,
-        token_type="bearer"
-    )
+    return await issue_tokens(db, user)
 
 # --- REFRESH TOKEN ---
-@router.post("/refresh", response_model=Token)
-async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
+def decode_refresh_token(refresh_token: str) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid refresh token",
     )
-    
     try:
         payload = jwt.decode(refresh_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
-        if payload.get("type") != "refresh":
-            raise credentials_exception
-        email: str = payload.get("sub")
-        if not email:
-            raise credentials_exception
     except JWTError:
         raise credentials_exception
+    if payload.get("type") != "refresh" or not payload.get("sub") or not payload.get("jti"):
+        raise credentials_exception
+    return payload
+
+@router.post("/refresh", response_model=Token)
+async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+    )
+    payload = decode_refresh_token(refresh_token)
 
     # Проверяем, что пользователь все еще существует
-    user = await UserService.get_user_by_email(db, email)
+    user = await UserService.get_user_by_email(db, payload["sub"])
     if not user:
         raise credentials_exception
 
-    # Создаем новые токены
-    new_access_token = create_access_token({"sub": user.email})
-    new_refresh_token = create_refresh_token({"sub": user.email})
-    
+    # Повторное использование токена — признак утечки: отзываем всю цепочку
+    if await refresh_token_store.is_revoked(db, payload["jti"]):
+        revoked = await refresh_token_store.revoke_all_for_user(db, user.id)
+        logger.warning(f"Refresh token reuse for {user.email}, revoked {revoked} active tokens")
+        raise credentials_exception
+
+    # Одноразовая ротация: старый jti гасится, новый регистрируется в той же транзакции
+    new_refresh, new_jti, expires_at = new_refresh_token(user)
+    if not await refresh_token_store.rotate(db, payload["jti"], user.id, new_jti, expires_at):
+        raise credentials_exception
+
     return Token(
-        access_token=new_access_token,
-        refresh_token=new_refresh_token,
+        access_token=create_access_token({"sub": user.email}),
+        refresh_token=new_refresh,
         token_type="bearer"
     )
 
+# --- LOGOUT ---
+@router.post("/logout")
+async def logout(refresh_token: str, db: AsyncSession = Depends(get_db)):
+    payload = decode_refresh_token(refresh_token)
+    user = await UserService.get_user_by_email(db, payload["sub"])
+    if user:
+        await refresh_token_store.revoke(db, payload["jti"], user.id)
+    return {"detail": "Logged out"}
+
 # --- GOOGLE LOGIN ---
 @router.post("/login/google", response_model=Token)
 async def google_login(google_data: GoogleLogin, db: AsyncSession = Depends(get_db)):
     try:
-        payload = id_token.verify_oauth2_token(google_data.id_token, google_requests.Request())
+        payload = await google_token_verifier.verify(google_data.id_token)
         email = payload.get("email")
         if not email:
             raise HTTPException(status_code=400, detail="Google token invalid: email missing")
     except ValueError:
         raise HTTPException(status_code=400, detail="Google token invalid")
+    except TransportError:
+        raise HTTPException(status_code=503, detail="Google certificates are temporarily unavailable")
 
     user = await UserService.create_or_get_google_user(db, email)
-    access_token = create_access_token({"sub": user.email})
-    refresh_token = create_refresh_token({"sub": user.email})
-    
-    return Token(
-        access_token=access_token,
-        refresh_token=refresh_token,
-        token_type="bearer"
-    )
+    return await issue_tokens(db, user)
 
 # --- GET ME ---
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user=Depends(get_current_user)):
+async def get_me(current_user=Depends(get_current_reader)):
+    # Машины нужны только здесь — грузим одним запросом, а не при каждой аутентификации
+    vehicles = await VehicleService.get_user_vehicles(async_object_session(current_user), current_user)
+    set_committed_value(current_user, "vehicles", vehicles)
     return current_user
 
 # --- UPDATE ME ---
@@ -1,21 +1,40 @@
 # app/routers/vehicle_router.py
-from fastapi import APIRouter, Depends, Form, HTTPException, Path, UploadFile, status
+from fastapi import APIRouter, Depends, Form, HTTPException, Path, Query, Request, Response, UploadFile, status
 from loguru import logger
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.conditional import not_modified
 from app.core.db import get_async_db as get_db
+from app.core.db import get_read_db
 from app.models.user import User
-from app.models.vehicle import Vehicle
-from app.routers.user_router import get_current_user
-from app.schemas.vehicle_schema import VehicleCreate, VehicleResponse
+from app.routers.user_router import get_current_reader, get_current_user
+from app.schemas.vehicle_schema import (
+    DocumentJobResponse,
+    VehicleCreate,
+    VehicleResponse,
+    VinDecodeRequest,
+    VinDecodeResult,
+)
+from app.services.document_jobs import QueueFull, job_manager
+from app.services.uploads import DocumentTooLarge
+from app.services.user_service import UserService
 from app.services.vehicle_service import VehicleService
+from app.utils.vin import decode_many
 
 router = APIRouter(prefix="/vehicles", tags=["vehicles"])
 
 
 @router.get("/", response_model=list[VehicleResponse])
-async def list_vehicles(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def list_vehicles(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader),
+):
+    if cached := not_modified(request, response, current_user, "vehicles"):
+        return cached
+
     try:
         vehicles = await VehicleService.get_user_vehicles(db, current_user)
         logger.info(f"User {current_user.email} listed {len(vehicles)} vehicles")
@@ -28,6 +47,27 @@ async def list_vehicles(db: AsyncSession = Depends(get_db), current_user: User =
         raise HTTPException(status_code=500, detail="Unexpected error occurred")
 
 
+@router.get("/selected", response_model=VehicleResponse)
+async def get_selected_vehicle(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader),
+):
+    if cached := not_modified(request, response, current_user, "vehicles"):
+        return cached
+
+    try:
+        vehicle = await VehicleService.get_selected_vehicle(db, current_user)
+    except SQLAlchemyError as e:
+        logger.error(f"DB error while fetching selected vehicle for {current_user.email}: {e}")
+        raise HTTPException(status_code=500, detail="Database error while fetching vehicle")
+
+    if not vehicle:
+        raise HTTPException(status_code=404, detail="No vehicle selected")
+    return vehicle
+
+
 @router.post("/", response_model=VehicleResponse)
 async def add_vehicle(
     vehicle_data: VehicleCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
@@ -87,8 +127,20 @@ async def select_vehicle(
         raise HTTPException(status_code=500, detail="Unexpected error occurred")
 
 
-@router.post("/add-from-doc", response_model=VehicleResponse)
+@router.post("/decode-batch", response_model=list[VinDecodeResult])
+def decode_vins(payload: VinDecodeRequest, current_user: User = Depends(get_current_reader)):
+    """
+    Офлайн-декодирование списка VIN (до 10 000 за запрос) без обращений к БД.
+    Обычная def: FastAPI выполнит её в пуле потоков, не занимая event loop.
+    """
+    results = decode_many(payload.vins)
+    logger.info(f"User {current_user.email} decoded {len(results)} VINs")
+    return results
+
+
+@router.post("/add-from-doc", response_model=VehicleResponse | DocumentJobResponse)
 async def add_vehicle_from_doc(
+    response: Response,
     vin: str | None = Form(None, description="VIN or KBA code of the vehicle"),
     search_code: str | None = Form(None, description="Optional vehicle search code extracted from document"),
     document: UploadFile | None = None,
@@ -97,8 +149,10 @@ async def add_vehicle_from_doc(
 ):
     """
     Add a vehicle by either:
-    - VIN/KBA code (`vin`)
-    - Or uploading a STS document (`document`) to extract vehicle data
+    - VIN/KBA code (`vin`) — the vehicle is created immediately
+    - Or uploading a STS document (`document`) — returns 202 with a recognition job;
+      poll `GET /vehicles/jobs/{id}` until it is `done` and has a `vehicle_id`.
+      A document recognized before (same content) returns 200 with a finished job.
     Optional `search_code` can be provided to help searching parts.
     """
 
@@ -107,22 +161,30 @@ async def add_vehicle_from_doc(
             status_code=status.HTTP_400_BAD_REQUEST, detail="You must provide either vin/kba or a document."
         )
 
-    # Здесь можно добавить логику распознавания документа
-    # Пока мок: если есть документ, просто создаем vehicle с test VIN
+    if not vin:
+        try:
+            job = await job_manager.submit(db, current_user.id, document, search_code)
+        except DocumentTooLarge:
+            raise HTTPException(status_code=413, detail="Document is too large")
+        except QueueFull:
+            raise HTTPException(status_code=503, detail="Document queue is full, try again later")
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"DB error while queueing document for {current_user.email}: {e}")
+            raise HTTPException(status_code=500, detail="Database error while queueing document")
+        logger.info(f"User {current_user.email} submitted document job {job.id} ({job.status})")
+        # Уже распознанный ранее файл завершается сразу — 200 вместо 202
+        if job.status != "done":
+            response.status_code = status.HTTP_202_ACCEPTED
+        return DocumentJobResponse.model_validate(job)
+
     try:
-        vehicle = Vehicle(
-            user_id=current_user.id,
-            vin=vin or "MOCK_VIN_FROM_DOC",
-            brand="MockBrand",
-            model="MockModel",
-            engine="MockEngine",
-            kba_code=vin or "MOCK_KBA",
-            search_code=search_code,
-        )
+        vehicle = VehicleService.vehicle_from_vin(current_user.id, vin, vin, search_code)
         db.add(vehicle)
+        await UserService.bump_version(db, current_user.id, "vehicles")
         await db.commit()
         await db.refresh(vehicle)
-        logger.info(f"User {current_user.email} added vehicle {vehicle.id} via doc or VIN")
+        logger.info(f"User {current_user.email} added vehicle {vehicle.id} via VIN")
         return vehicle
     except SQLAlchemyError as e:
         await db.rollback()
@@ -132,3 +194,21 @@ async def add_vehicle_from_doc(
         await db.rollback()
         logger.exception(f"Unexpected error while adding vehicle for {current_user.email}: {e}")
         raise HTTPException(status_code=500, detail="Unexpected error occurred")
+
+
+@router.get("/jobs/{job_id}", response_model=DocumentJobResponse)
+async def get_document_job(
+    job_id: str = Path(...),
+    wait: float = Query(0, ge=0, le=30, description="Wait up to N seconds for the job to finish"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        job = await job_manager.wait(db, job_id, wait)
+    except SQLAlchemyError as e:
+        logger.error(f"DB error while fetching document job {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Database error while fetching job")
+
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class CartItemResponse(BaseModel):
@@ -9,3 +9,22 @@ class CartItemResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+# --- Массовые операции с корзиной ---
+class CartBulkItem(BaseModel):
+    title: str
+    brand: str = ""
+    price: str = ""
+    image_url: str = ""
+    product_url: str
+    seller_name: str = ""
+    delivery_time: str = ""
+    description: str = ""
+    vin: str | None = None
+    quantity: int = Field(1, ge=1)
+
+
+class CartQuantityUpdate(BaseModel):
+    id: int
+    quantity: int = Field(..., ge=0)  # 0 — удалить из корзины
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class FavoriteResponse(BaseModel):
@@ -8,3 +8,14 @@ class FavoriteResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+# --- Статус товаров из выдачи поиска: в избранном / в корзине ---
+class ProductStatusRequest(BaseModel):
+    product_urls: list[str] = Field(..., min_length=1, max_length=500)
+
+
+class ProductStatus(BaseModel):
+    product_url: str
+    favorite: bool
+    in_cart: bool
@@ -37,3 +37,54 @@ class SupportTicketRead(SupportTicketBase):
 
     class Config:
         orm_mode = True
+
+
+class SupportTicketSummary(SupportTicketBase):
+    id: int
+    status: str
+    created_at: datetime
+    message_count: int
+    last_activity_at: datetime
+    last_message_preview: str | None = None
+    last_message_sender: str | None = None
+
+
+class SupportTicketPage(BaseModel):
+    items: list[SupportTicketSummary]
+    next_cursor: int | None = None  # передать как ?cursor= для следующей страницы
+
+
+class SupportMessagePage(BaseModel):
+    items: list[SupportMessageRead]  # от новых к старым
+    next_cursor: int | None = None
+
+
+class SupportAgentTicket(SupportTicketBase):
+    id: int
+    user_id: int
+    status: str
+    created_at: datetime
+    assigned_agent_id: int | None = None
+    assigned_at: datetime | None = None
+
+    class Config:
+        orm_mode = True
+
+
+class SupportQueuePage(BaseModel):
+    items: list[SupportAgentTicket]  # от старых к новым
+    next_cursor: int | None = None
+
+
+class SupportSearchHit(BaseModel):
+    ticket_id: int
+    subject: str
+    status: str
+    message_id: int  # самое релевантное сообщение тикета
+    rank: float
+    snippet: str | None = None  # экранированный текст, совпадения в <mark>
+
+
+class SupportSearchPage(BaseModel):
+    items: list[SupportSearchHit]  # по убыванию релевантности
+    next_cursor: int | None = None
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, Field
 
 
 class VehicleBase(BaseModel):
@@ -20,3 +22,35 @@ class VehicleResponse(VehicleBase):
 
     class Config:
         from_attributes = True
+
+
+class VinDecodeRequest(BaseModel):
+    vins: list[str] = Field(min_length=1, max_length=10_000)
+
+
+class VinDecodeResult(BaseModel):
+    vin: str
+    valid: bool
+    error: str | None = None
+    check_digit_valid: bool | None = None
+    wmi: str | None = None
+    manufacturer: str | None = None
+    country: str | None = None
+    region: str | None = None
+    model: str | None = None
+    model_year: int | None = None
+    plant_code: str | None = None
+    plant: str | None = None
+
+
+class DocumentJobResponse(BaseModel):
+    id: str
+    status: str
+    error: str | None = None
+    vehicle_id: int | None = None
+    created_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,210 @@
+# app/services/cart_service.py
+from cachetools import TTLCache
+from sqlalchemy import bindparam, case, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+
+from app.core.config import settings
+from app.models.user import CartItem, Product
+from app.services.product_service import ProductService, upsert_insert
+
+UNKNOWN_SELLER = "N/A"
+
+# Итоги корзины по user_id вместе с users.cart_version, для которой они посчитаны.
+# Любое изменение корзины увеличивает версию, поэтому устаревшая запись
+# не используется ни одним воркером, а TTL лишь ограничивает размер кэша.
+_summary_cache: TTLCache = TTLCache(maxsize=10_000, ttl=settings.CART_SUMMARY_CACHE_TTL_SECONDS)
+
+
+def build_summary(groups) -> dict:
+    """
+    Собирает ответ из групп (currency, seller_name, item_count, total_quantity,
+    total_cents, unpriced_count) — их отдаёт и SQL-агрегат, и подсчёт в Python.
+    Товары без распознанной цены в суммы не входят и считаются отдельно.
+    """
+    summary = {"item_count": 0, "total_quantity": 0, "unpriced_item_count": 0, "totals": [], "sellers": []}
+    by_currency: dict[str, int] = {}
+    for g in sorted(groups, key=lambda g: (g["currency"] or "", g["seller_name"])):
+        summary["item_count"] += g["item_count"]
+        summary["total_quantity"] += g["total_quantity"]
+        summary["unpriced_item_count"] += g["unpriced_count"]
+        if g["currency"] is None:
+            continue
+        by_currency[g["currency"]] = by_currency.get(g["currency"], 0) + g["total_cents"]
+        summary["sellers"].append(
+            {
+                "seller_name": g["seller_name"],
+                "currency": g["currency"],
+                "item_count": g["item_count"],
+                "total_quantity": g["total_quantity"],
+                "total_cents": g["total_cents"],
+            }
+        )
+    summary["totals"] = [{"currency": currency, "total_cents": cents} for currency, cents in by_currency.items()]
+    return summary
+
+
+def summarize_items(items: list[dict]) -> dict:
+    """Итоги по уже загруженным строкам корзины — без дополнительных запросов."""
+    groups: dict[tuple, dict] = {}
+    for item in items:
+        product = item["product"]
+        cents = product["price_cents"]
+        currency = product["currency"] if cents is not None else None
+        key = (currency, product["seller_name"])
+        g = groups.setdefault(
+            key,
+            {
+                "currency": currency,
+                "seller_name": product["seller_name"],
+                "item_count": 0,
+                "total_quantity": 0,
+                "total_cents": 0,
+                "unpriced_count": 0,
+            },
+        )
+        quantity = item["quantity"] or 0
+        g["item_count"] += 1
+        g["total_quantity"] += quantity
+        if cents is None:
+            g["unpriced_count"] += 1
+        else:
+            g["total_cents"] += cents * quantity
+    return build_summary(groups.values())
+
+
+def serialize_cart_item(item: CartItem) -> dict:
+    return {
+        "id": item.id,
+        "quantity": item.quantity,
+        "product": {
+            "title": item.product.title,
+            "product_url": item.product.product_url,
+            "image_url": item.product.image_url,
+            "price": item.product.price,
+            "price_cents": item.product.price_cents,
+            "currency": item.product.currency,
+            "seller_name": item.product.seller_name or UNKNOWN_SELLER,
+            "delivery_time": getattr(item.product, "delivery_time", None),
+            "description": getattr(item.product, "description", ""),
+        },
+    }
+
+
+class CartService:
+    @staticmethod
+    async def get_cart(session: AsyncSession, user_id: int) -> dict:
+        """Корзина вместе с итогами; итоги считаются по тем же строкам."""
+        items = await CartService.list_items(session, user_id)
+        return {"items": items, "summary": summarize_items(items)}
+
+    @staticmethod
+    async def summary(session: AsyncSession, user_id: int, version: int) -> dict:
+        """
+        Итоги корзины одним агрегирующим запросом (GROUP BY валюта, продавец)
+        с кэшем на пользователя, действительным для версии корзины version.
+        """
+        cached = _summary_cache.get(user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        seller = func.coalesce(func.nullif(Product.seller_name, ""), UNKNOWN_SELLER)
+        # Валюта имеет смысл только при распознанной цене
+        currency = case((Product.price_cents.is_not(None), Product.currency))
+        quantity = func.coalesce(CartItem.quantity, 0)
+        result = await session.execute(
+            select(
+                currency.label("currency"),
+                seller.label("seller_name"),
+                func.count(CartItem.id).label("item_count"),
+                func.coalesce(func.sum(quantity), 0).label("total_quantity"),
+                func.coalesce(func.sum(quantity * Product.price_cents), 0).label("total_cents"),
+                func.count(CartItem.id).filter(Product.price_cents.is_(None)).label("unpriced_count"),
+            )
+            .join(Product, Product.id == CartItem.product_id)
+            .where(CartItem.user_id == user_id)
+            .group_by(currency, seller)
+        )
+        summary = build_summary([dict(row._mapping) for row in result])
+        _summary_cache[user_id] = (version, summary)
+        return summary
+
+    @staticmethod
+    async def list_items(session: AsyncSession, user_id: int) -> list[dict]:
+        # populate_existing: сессия живёт без expire_on_commit, а строки могли измениться Core-запросами выше
+        result = await session.execute(
+            select(CartItem)
+            .join(CartItem.product)
+            .options(contains_eager(CartItem.product))
+            .where(CartItem.user_id == user_id)
+            .order_by(CartItem.id)
+            .execution_options(populate_existing=True)
+        )
+        return [serialize_cart_item(item) for item in result.scalars().all()]
+
+    @staticmethod
+    def _add_stmt(session: AsyncSession, values):
+        stmt = upsert_insert(session, CartItem).values(values)
+        return stmt.on_conflict_do_update(
+            index_elements=[CartItem.user_id, CartItem.product_id],
+            set_={"quantity": CartItem.quantity + stmt.excluded.quantity},
+        ).returning(CartItem.id, CartItem.quantity)
+
+    @staticmethod
+    async def add_item(session: AsyncSession, user_id: int, product_id: int, quantity: int, vin: str | None) -> dict:
+        """
+        Добавляет товар в корзину или атомарно увеличивает количество:
+        INSERT ... ON CONFLICT (user_id, product_id) DO UPDATE SET quantity = quantity + n.
+        Коммит остаётся за вызывающим кодом.
+        """
+        stmt = CartService._add_stmt(
+            session, {"user_id": user_id, "product_id": product_id, "quantity": quantity, "vin": vin}
+        )
+        result = await session.execute(stmt)
+        return dict(result.one()._mapping)
+
+    @staticmethod
+    async def add_items(session: AsyncSession, user_id: int, items: list[dict]) -> None:
+        """
+        Массовое добавление: один INSERT для всех товаров и один для строк корзины,
+        независимо от размера списка. Повторы одного товара складываются.
+        """
+        products = await ProductService.upsert_many(session, items)
+
+        rows = {}
+        for item in items:
+            product_id = products[item["product_url"]]["id"]
+            if product_id in rows:
+                rows[product_id]["quantity"] += item["quantity"]
+            else:
+                rows[product_id] = {
+                    "user_id": user_id,
+                    "product_id": product_id,
+                    "quantity": item["quantity"],
+                    "vin": item.get("vin"),
+                }
+        # Порядок product_id — тот же порядок блокировок при параллельных запросах
+        await session.execute(CartService._add_stmt(session, [rows[product_id] for product_id in sorted(rows)]))
+
+    @staticmethod
+    async def remove_items(session: AsyncSession, user_id: int, ids: list[int]) -> list[int]:
+        if not ids:
+            return []
+        result = await session.execute(
+            delete(CartItem).where(CartItem.user_id == user_id, CartItem.id.in_(ids)).returning(CartItem.id)
+        )
+        return list(result.scalars())
+
+    @staticmethod
+    async def set_quantities(session: AsyncSession, user_id: int, quantities: dict[int, int]) -> None:
+        """Количество 0 удаляет строку; остальные обновляются одним executemany."""
+        await CartService.remove_items(session, user_id, [item_id for item_id, qty in quantities.items() if qty == 0])
+
+        params = [{"item_id": item_id, "qty": qty} for item_id, qty in quantities.items() if qty > 0]
+        if params:
+            await session.execute(
+                update(CartItem.__table__)
+                .where(CartItem.id == bindparam("item_id"), CartItem.user_id == user_id)
+                .values(quantity=bindparam("qty")),
+                params,
+            )
@@ -0,0 +1,342 @@
+# app/services/document_jobs.py
+"""
+Фоновое распознавание документов.
+
+Запрос только сохраняет файл на диск и пишет строку document_jobs со статусом
+queued — id задания возвращается сразу. Дальше задание берёт один из
+asyncio-воркеров и отдаёт файл распознавателю в ProcessPoolExecutor, так что
+ни event loop, ни GIL воркера API не заняты. Готовое задание создаёт Vehicle.
+
+Клиент опрашивает GET /vehicles/jobs/{id}; с ?wait=N запрос ждёт завершения
+до N секунд (long polling). Метрики — GET /metrics/jobs.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import UTC, datetime, timedelta
+
+from fastapi import UploadFile
+from loguru import logger
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.core.metrics import Histogram
+from app.models.document_job import DocumentJob
+from app.services.recognition import run_recognizer
+from app.services.uploads import recognition_cache, remove_file, spool_upload
+from app.services.user_service import UserService
+from app.services.vehicle_service import VehicleService
+
+FINISHED = ("done", "failed")
+POLL_INTERVAL_SECONDS = 0.5
+
+
+def spool_path(job_id: str) -> str:
+    """Где лежит загруженный документ задания до обработки."""
+    return os.path.join(settings.DOCUMENT_SPOOL_DIR, job_id)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobStats:
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.queue_wait_ms = Histogram()
+        self.processing_ms = Histogram()
+        self.latency_ms = Histogram()  # от загрузки до готового результата
+
+
+class DocumentJobManager:
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self.stats = JobStats()
+        self._pool: ProcessPoolExecutor | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._busy = 0
+        self._started_at = time.monotonic()
+        self._submitted_at: dict[str, float] = {}  # job_id -> monotonic время загрузки
+        self._done: dict[str, asyncio.Event] = {}
+
+    # -----------------------
+    # Жизненный цикл
+    # -----------------------
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._pool is None:
+            # spawn: форк процесса с работающим event loop и соединениями БД небезопасен
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.DOCUMENT_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=settings.DOCUMENT_QUEUE_SIZE)
+        self._workers = [loop.create_task(self._worker()) for _ in range(settings.DOCUMENT_WORKERS)]
+        self._busy = 0
+        self._done.clear()
+
+    async def start(self) -> int:
+        """
+        Запускает воркеры и подбирает незавершённые задания: queued — как есть,
+        running — только брошенные (started_at старше DOCUMENT_JOB_LEASE_SECONDS).
+        Задание может оказаться и в очереди живого воркера — обработает его тот,
+        кто первым захватит строку в _claim, второй пропустит.
+        """
+        self._ensure_started()
+        stale = datetime.now(UTC) - timedelta(seconds=settings.DOCUMENT_JOB_LEASE_SECONDS)
+        async with self.session_factory() as db:
+            await db.execute(
+                update(DocumentJob)
+                .where(DocumentJob.status == "running", DocumentJob.started_at < stale)
+                .values(status="queued", started_at=None)
+            )
+            result = await db.execute(
+                select(DocumentJob.id).where(DocumentJob.status == "queued").order_by(DocumentJob.created_at)
+            )
+            job_ids = list(result.scalars())
+            await db.commit()
+        for job_id in job_ids:
+            self._queue.put_nowait(job_id)
+        return len(job_ids)
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers, self._loop = [], None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # -----------------------
+    # Постановка в очередь
+    # -----------------------
+    async def submit(
+        self, db: AsyncSession, user_id: int, document: UploadFile, search_code: str | None
+    ) -> DocumentJob:
+        """
+        Сохраняет документ и ставит задание в очередь. Если этот файл уже
+        распознавался (совпал SHA-256), задание завершается сразу, без пула.
+        """
+        self._ensure_started()
+        if self._queue.full():
+            raise QueueFull
+
+        job_id = str(uuid.uuid4())
+        os.makedirs(settings.DOCUMENT_SPOOL_DIR, exist_ok=True)
+        path = spool_path(job_id)
+        _, content_sha256 = await run_in_threadpool(spool_upload, document.file, path, settings.DOCUMENT_MAX_BYTES)
+
+        job = DocumentJob(
+            id=job_id,
+            user_id=user_id,
+            status="queued",
+            file_path=path,
+            content_sha256=content_sha256,
+            search_code=search_code,
+        )
+        db.add(job)
+        cached = await recognition_cache.get(
+            recognition_cache.key("document", settings.DOCUMENT_RECOGNIZER, content_sha256)
+        )
+        try:
+            if cached is not None:
+                now = datetime.now(UTC)
+                job.started_at = job.finished_at = now
+                await self._complete(db, job, cached)
+            await db.commit()
+        except BaseException:
+            await run_in_threadpool(remove_file, path)
+            raise
+
+        self.stats.submitted += 1
+        if cached is not None:
+            self.stats.completed += 1
+            await run_in_threadpool(remove_file, path)
+            return job
+
+        self._submitted_at[job_id] = time.monotonic()
+        self._done[job_id] = asyncio.Event()
+        self._queue.put_nowait(job_id)
+        return job
+
+    async def recognize(self, kind: str, upload: UploadFile) -> dict:
+        """
+        Распознавание, результат которого нужен прямо в запросе (поиск):
+        кэш по SHA-256, при промахе — пул процессов, event loop не блокируется.
+        """
+        self._ensure_started()
+        os.makedirs(settings.DOCUMENT_SPOOL_DIR, exist_ok=True)
+        path = os.path.join(settings.DOCUMENT_SPOOL_DIR, f"{kind}-{uuid.uuid4()}")
+        try:
+            _, content_sha256 = await run_in_threadpool(
+                spool_upload, upload.file, path, settings.DOCUMENT_MAX_BYTES
+            )
+            key = recognition_cache.key(kind, settings.DOCUMENT_RECOGNIZER, content_sha256)
+            result = await recognition_cache.get(key)
+            if result is None:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._pool, run_recognizer, settings.DOCUMENT_RECOGNIZER, kind, path
+                )
+                await recognition_cache.set(key, result)
+            return result
+        finally:
+            await run_in_threadpool(remove_file, path)
+
+    # -----------------------
+    # Обработка
+    # -----------------------
+    @staticmethod
+    async def _complete(db: AsyncSession, job: DocumentJob, result: dict) -> None:
+        """Создаёт машину по результату распознавания; коммит делает вызывающий код."""
+        vehicle = VehicleService.vehicle_from_vin(
+            job.user_id, result["vin"], result.get("kba_code"), job.search_code, result.get("engine")
+        )
+        db.add(vehicle)
+        await db.flush()
+        await UserService.bump_version(db, job.user_id, "vehicles")
+        job.status, job.result, job.vehicle_id = "done", result, vehicle.id
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id = await self._queue.get()
+            self._busy += 1
+            started = time.monotonic()
+            try:
+                await self._process(loop, job_id, started)
+            except Exception as e:
+                logger.exception(f"Document job {job_id} crashed: {e}")
+            finally:
+                self._busy -= 1
+                self.stats.busy_seconds += time.monotonic() - started
+                self._queue.task_done()
+                if event := self._done.pop(job_id, None):
+                    event.set()
+
+    @staticmethod
+    async def _claim(db: AsyncSession, job_id: str) -> bool:
+        """Переводит задание queued -> running; False — его уже взял другой воркер или оно завершено."""
+        result = await db.execute(
+            update(DocumentJob)
+            .where(DocumentJob.id == job_id, DocumentJob.status == "queued")
+            .values(status="running", started_at=datetime.now(UTC))
+            .returning(DocumentJob.id)
+        )
+        await db.commit()
+        return result.scalar_one_or_none() is not None
+
+    async def _process(self, loop: asyncio.AbstractEventLoop, job_id: str, started: float) -> None:
+        submitted = self._submitted_at.pop(job_id, None)
+        if submitted is not None:
+            self.stats.queue_wait_ms.observe((started - submitted) * 1000)
+
+        async with self.session_factory() as db:
+            if not await self._claim(db, job_id):
+                job = await db.get(DocumentJob, job_id)
+                # Задание выполняет другой воркер — его файл не трогаем
+                if job is None or job.status in FINISHED:
+                    await run_in_threadpool(remove_file, spool_path(job_id))
+                return
+
+            job = await db.get(DocumentJob, job_id)
+            if job is None:
+                await run_in_threadpool(remove_file, spool_path(job_id))
+                return
+            file_path = job.file_path
+            try:
+                try:
+                    result = await loop.run_in_executor(
+                        self._pool, run_recognizer, settings.DOCUMENT_RECOGNIZER, "document", file_path
+                    )
+                    content_sha256 = job.content_sha256
+                    await self._complete(db, job, result)
+                    job.finished_at = datetime.now(UTC)
+                    await db.commit()
+                    self.stats.completed += 1
+                    # Кэш — только после коммита: сбой кэша не должен превращать готовое задание в failed
+                    if content_sha256:
+                        await recognition_cache.set(
+                            recognition_cache.key("document", settings.DOCUMENT_RECOGNIZER, content_sha256), result
+                        )
+                except Exception as e:
+                    await db.rollback()
+                    job = await db.get(DocumentJob, job_id)
+                    if job is None:
+                        # Пользователь удалён вместе с заданиями, пока шло распознавание
+                        logger.info(f"Document job {job_id} was deleted while running")
+                        return
+                    self.stats.failed += 1
+                    job.status, job.error = "failed", str(e)[:512] or type(e).__name__
+                    job.finished_at = datetime.now(UTC)
+                    await db.commit()
+                    logger.warning(f"Document job {job_id} failed: {e!r}")
+            finally:
+                await run_in_threadpool(remove_file, file_path)
+
+        finished = time.monotonic()
+        self.stats.processing_ms.observe((finished - started) * 1000)
+        if submitted is not None:
+            self.stats.latency_ms.observe((finished - submitted) * 1000)
+
+    # -----------------------
+    # Чтение результата
+    # -----------------------
+    async def wait(self, db: AsyncSession, job_id: str, timeout: float) -> DocumentJob | None:
+        """
+        Задание из БД; если оно ещё не завершено — ждёт до timeout секунд.
+        Задания этого процесса будят ожидающих через Event, чужие — опрашиваются.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = (
+                await db.execute(
+                    select(DocumentJob).where(DocumentJob.id == job_id).execution_options(populate_existing=True)
+                )
+            ).scalar_one_or_none()
+            remaining = deadline - time.monotonic()
+            if job is None or job.status in FINISHED or remaining <= 0:
+                return job
+            # Не держим соединение, пока ждём
+            await db.commit()
+            event = self._done.get(job_id)
+            try:
+                if event is not None:
+                    await asyncio.wait_for(event.wait(), remaining)
+                else:
+                    await asyncio.sleep(min(POLL_INTERVAL_SECONDS, remaining))
+            except TimeoutError:
+                pass
+
+    def snapshot(self) -> dict:
+        workers = settings.DOCUMENT_WORKERS
+        uptime = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "workers": workers,
+            "busy_workers": self._busy,
+            "utilization": round(self.stats.busy_seconds / (uptime * workers), 4),
+            "submitted": self.stats.submitted,
+            "completed": self.stats.completed,
+            "failed": self.stats.failed,
+            "queue_wait_ms": self.stats.queue_wait_ms.snapshot(),
+            "processing_ms": self.stats.processing_ms.snapshot(),
+            "latency_ms": self.stats.latency_ms.snapshot(),
+            "recognition_cache": recognition_cache.snapshot(),
+        }
+
+
+job_manager = DocumentJobManager()
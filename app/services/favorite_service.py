@@ -0,0 +1,69 @@
+# app/services/favorite_service.py
+from cachetools import TTLCache
+from sqlalchemy import exists, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import CartItem, Favorite, Product, User
+
+# user_id -> ((favorites_version, cart_version), избранные URL, URL в корзине).
+# Версии из строки users делают запись недействительной сразу после любого изменения.
+_membership_cache: TTLCache = TTLCache(maxsize=10_000, ttl=max(settings.FAVORITES_STATUS_CACHE_TTL_SECONDS, 1))
+
+
+class FavoriteService:
+    @staticmethod
+    async def product_status(session: AsyncSession, user: User, product_urls: list[str]) -> list[dict]:
+        """Флаги «в избранном» / «в корзине» для списка product_url в порядке запроса."""
+        urls = list(dict.fromkeys(product_urls))
+        if settings.FAVORITES_STATUS_CACHE_TTL_SECONDS > 0:
+            favorites, cart = await FavoriteService._membership_sets(session, user)
+        else:
+            favorites, cart = await FavoriteService._lookup(session, user.id, urls)
+        return [{"product_url": url, "favorite": url in favorites, "in_cart": url in cart} for url in urls]
+
+    @staticmethod
+    async def _lookup(session: AsyncSession, user_id: int, urls: list[str]) -> tuple[set[str], set[str]]:
+        """
+        Один запрос: товары ищутся по уникальному индексу product_url, членство —
+        EXISTS по индексам (user_id, product_id) избранного и корзины.
+        """
+        favorite = exists().where(Favorite.user_id == user_id, Favorite.product_id == Product.id)
+        in_cart = exists().where(CartItem.user_id == user_id, CartItem.product_id == Product.id)
+        result = await session.execute(
+            select(Product.product_url, favorite.label("favorite"), in_cart.label("in_cart")).where(
+                Product.product_url.in_(urls)
+            )
+        )
+        favorites, cart = set(), set()
+        for url, is_favorite, is_in_cart in result:
+            if is_favorite:
+                favorites.add(url)
+            if is_in_cart:
+                cart.add(url)
+        return favorites, cart
+
+    @staticmethod
+    async def _membership_sets(session: AsyncSession, user: User) -> tuple[set[str], set[str]]:
+        """Все URL из избранного и корзины пользователя одним запросом, с кэшем по версиям коллекций."""
+        versions = (user.favorites_version, user.cart_version)
+        cached = _membership_cache.get(user.id)
+        if cached is not None and cached[0] == versions:
+            return cached[1], cached[2]
+
+        result = await session.execute(
+            union_all(
+                select(literal("favorite").label("kind"), Product.product_url)
+                .join(Favorite, Favorite.product_id == Product.id)
+                .where(Favorite.user_id == user.id),
+                select(literal("cart").label("kind"), Product.product_url)
+                .join(CartItem, CartItem.product_id == Product.id)
+                .where(CartItem.user_id == user.id),
+            )
+        )
+        favorites, cart = set(), set()
+        for kind, url in result:
+            (favorites if kind == "favorite" else cart).add(url)
+
+        _membership_cache[user.id] = (versions, favorites, cart)
+        return favorites, cart
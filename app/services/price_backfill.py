@@ -0,0 +1,128 @@
+# app/services/price_backfill.py
+"""
+Онлайн-заполнение products.price_cents / currency для существующих строк.
+
+Идём по products в порядке id (keyset, без OFFSET) пачками; каждая пачка —
+короткая транзакция, между пачками пауза, чтобы не давить на primary.
+Прогресс пишется в лог вместе с последним id — по нему можно продолжить:
+
+    python -m app.services.price_backfill --batch-size 1000 --sleep 0.2 --start-after 0
+
+Режим --fix-currency чистит строки, записанные до белого списка ISO_CURRENCIES:
+у них в currency лежит слово из цены ("Preis auf Anfrage" -> "AUF",
+"Lieferung TOP 12,00" -> "TOP"), в том числе при уже заполненных центах.
+Такие строки разбираются заново, и (центы, валюта) пишутся как есть, вместе с NULL.
+"""
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+
+from loguru import logger
+from sqlalchemy import bindparam, func, select, update
+
+from app.models.user import Product
+from app.utils.prices import ISO_CURRENCIES, parse_price
+
+
+@dataclass
+class BackfillProgress:
+    last_id: int = 0
+    scanned: int = 0
+    updated: int = 0
+    unparsed: int = 0
+
+
+async def backfill_prices(
+    session_factory,
+    batch_size: int = 1000,
+    sleep: float = 0.2,
+    start_after: int = 0,
+    max_batches: int | None = None,
+    fix_currency: bool = False,
+) -> BackfillProgress:
+    progress = BackfillProgress(last_id=start_after)
+    if fix_currency:
+        pending_filter = (Product.currency.is_not(None), Product.currency.not_in(ISO_CURRENCIES))
+    else:
+        pending_filter = (Product.price_cents.is_(None), Product.price.is_not(None))
+
+    async with session_factory() as session:
+        remaining = await session.scalar(
+            select(func.count()).select_from(Product).where(Product.id > start_after, *pending_filter)
+        )
+    logger.info(f"Price backfill: {remaining} products to process after id {start_after}")
+
+    # Обновляем только строки, которые не изменились с чтения: параллельная запись из API не перетирается
+    guard = Product.currency == bindparam("old_cur") if fix_currency else Product.price_cents.is_(None)
+    stmt = (
+        update(Product.__table__)
+        .where(Product.id == bindparam("row_id"), guard)
+        .values(price_cents=bindparam("cents"), currency=bindparam("cur"))
+    )
+
+    started = time.monotonic()
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        async with session_factory() as session:
+            rows = (
+                await session.execute(
+                    select(Product.id, Product.price, Product.currency)
+                    .where(Product.id > progress.last_id, *pending_filter)
+                    .order_by(Product.id)
+                    .limit(batch_size)
+                )
+            ).all()
+            if not rows:
+                break
+
+            params = []
+            for row_id, raw, old_currency in rows:
+                cents, currency = parse_price(raw)
+                if cents is None:
+                    progress.unparsed += 1
+                    if not fix_currency:
+                        continue
+                params.append({"row_id": row_id, "cents": cents, "cur": currency, "old_cur": old_currency})
+
+            if params:
+                await session.execute(stmt, params)
+            await session.commit()
+
+        batches += 1
+        progress.last_id = rows[-1].id
+        progress.scanned += len(rows)
+        progress.updated += len(params)
+        rate = progress.scanned / max(time.monotonic() - started, 1e-9)
+        logger.info(
+            f"Price backfill: {progress.scanned}/{remaining} scanned, {progress.updated} updated, "
+            f"{progress.unparsed} unparsed, last id {progress.last_id} ({rate:.0f} rows/s)"
+        )
+
+        if len(rows) < batch_size:
+            break
+        if sleep:
+            await asyncio.sleep(sleep)
+
+    logger.info(f"Price backfill finished at id {progress.last_id}")
+    return progress
+
+
+if __name__ == "__main__":
+    from app.core.db import AsyncSessionLocal
+
+    parser = argparse.ArgumentParser(description="Fill products.price_cents/currency from products.price")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--sleep", type=float, default=0.2, help="pause between batches, seconds")
+    parser.add_argument("--start-after", type=int, default=0, help="resume after this product id")
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument(
+        "--fix-currency", action="store_true", help="re-parse rows whose currency is not a known ISO code"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        backfill_prices(
+            AsyncSessionLocal, args.batch_size, args.sleep, args.start_after, args.max_batches, args.fix_currency
+        )
+    )
@@ -0,0 +1,74 @@
+# app/services/product_service.py
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import Product
+from app.utils.prices import parse_price
+
+PRODUCT_FIELDS = (
+    "title",
+    "brand",
+    "price",
+    "image_url",
+    "product_url",
+    "seller_name",
+    "delivery_time",
+    "description",
+)
+PRODUCT_COLUMNS = ("id", *PRODUCT_FIELDS, "price_cents", "currency")
+
+
+def upsert_insert(session: AsyncSession, model):
+    """INSERT с поддержкой ON CONFLICT для диалекта сессии (PostgreSQL в проде, SQLite в тестах)."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"ON CONFLICT is not supported for dialect {dialect}")
+
+
+class ProductService:
+    @staticmethod
+    def _values(data: dict) -> dict:
+        values = {field: data.get(field) for field in PRODUCT_FIELDS}
+        values["price_cents"], values["currency"] = parse_price(values["price"])
+        return values
+
+    @staticmethod
+    def _upsert_stmt(session: AsyncSession, values):
+        stmt = upsert_insert(session, Product).values(values)
+        return stmt.on_conflict_do_update(
+            index_elements=[Product.product_url],
+            set_={"product_url": stmt.excluded.product_url},
+        ).returning(*(getattr(Product, column) for column in PRODUCT_COLUMNS))
+
+    @staticmethod
+    async def upsert(session: AsyncSession, data: dict) -> dict:
+        """
+        Находит или создаёт товар по product_url одним запросом:
+        INSERT ... ON CONFLICT (product_url) DO UPDATE ... RETURNING.
+        Уже существующий товар не меняется — холостой UPDATE нужен только
+        затем, чтобы RETURNING вернул строку и в случае конфликта.
+        Коммит остаётся за вызывающим кодом.
+        """
+        result = await session.execute(ProductService._upsert_stmt(session, ProductService._values(data)))
+        return dict(result.one()._mapping)
+
+    @staticmethod
+    async def upsert_many(session: AsyncSession, items: list[dict]) -> dict[str, dict]:
+        """
+        То же для списка товаров одним многострочным INSERT.
+        Дубликаты product_url схлопываются заранее: PostgreSQL не даёт
+        одному INSERT ... ON CONFLICT задеть строку дважды.
+        Строки идут в порядке product_url: products общая для всех
+        пользователей, и два пакета с пересекающимися товарами должны брать
+        блокировки в одном порядке, иначе возможен deadlock.
+        Возвращает товары по product_url.
+        """
+        unique = {}
+        for item in items:
+            unique.setdefault(item["product_url"], ProductService._values(item))
+        values = [unique[url] for url in sorted(unique)]
+        result = await session.execute(ProductService._upsert_stmt(session, values))
+        return {row.product_url: dict(row._mapping) for row in result}
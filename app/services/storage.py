@@ -0,0 +1,81 @@
+# app/services/storage.py
+"""
+Хранилище вложений с интерфейсом в духе S3: put / head по ключу.
+
+LocalObjectStore — файловая реализация (один хост, разработка, тесты).
+Ключ объекта — SHA-256 содержимого, поэтому одинаковые файлы хранятся один
+раз, а одинаковые имена файлов больше не конфликтуют. Метаданные объекта
+(размер, content-type) лежат рядом в <key>.json, как object metadata в S3.
+Удаления по ключу нет: после дедупликации один объект может быть вложением
+нескольких сообщений, и удалять его можно только вместе с проверкой ссылок.
+
+Загрузка читается из UploadFile кусками (spool_upload) во временный файл
+в том же каталоге и атомарно переименовывается — целиком в памяти файл
+не держится. Отдача — FileResponse: Range-запросы и sendfile на стороне
+сервера (расширение http.response.pathsend), если он его поддерживает.
+"""
+import json
+import os
+import uuid
+from dataclasses import dataclass
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.uploads import remove_file, spool_upload
+
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    content_type: str
+    deduplicated: bool = False
+
+
+class LocalObjectStore:
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        # Два уровня каталогов по префиксу ключа, чтобы не держать всё в одной папке
+        return os.path.join(self.root, key[:2], key)
+
+    def path(self, key: str) -> str | None:
+        """Путь к содержимому для отдачи через FileResponse (None — объекта нет)."""
+        path = self._path(key)
+        return path if os.path.isfile(path) else None
+
+    def _put(self, src, max_bytes: int, content_type: str) -> StoredObject:
+        os.makedirs(os.path.join(self.root, "tmp"), exist_ok=True)
+        tmp = os.path.join(self.root, "tmp", uuid.uuid4().hex)
+        size, key = spool_upload(src, tmp, max_bytes)
+
+        path = self._path(key)
+        if os.path.isfile(path):
+            remove_file(tmp)
+            stored_type = (self._head(key) or {}).get("content_type", content_type)
+            return StoredObject(key=key, size=size, content_type=stored_type, deduplicated=True)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.json", "w") as f:
+            json.dump({"size": size, "content_type": content_type}, f)
+        os.replace(tmp, path)  # объект появляется атомарно и уже с метаданными
+        return StoredObject(key=key, size=size, content_type=content_type)
+
+    def _head(self, key: str) -> dict | None:
+        try:
+            with open(f"{self._path(key)}.json") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    async def put(self, src, max_bytes: int, content_type: str) -> StoredObject:
+        """Сохраняет поток; при превышении max_bytes — DocumentTooLarge, на диске ничего не остаётся."""
+        return await run_in_threadpool(self._put, src, max_bytes, content_type)
+
+    async def head(self, key: str) -> dict | None:
+        return await run_in_threadpool(self._head, key)
+
+
+object_store = LocalObjectStore(settings.ATTACHMENT_STORAGE_DIR)
@@ -1,8 +1,115 @@
+import html
+import re
+
 from fastapi import HTTPException, UploadFile
+from loguru import logger
+from sqlalchemy import func, text, tuple_, union_all, update
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.core.pubsub import broadcast
+from app.models.support import SEARCH_CONFIG, SEARCH_VECTOR_SQL, SQLITE_FTS_TABLE, SupportMessage, SupportTicket
+from app.schemas.support_schema import SupportMessageRead
+from app.services.storage import object_store
+from app.services.uploads import DocumentTooLarge
+
+PREVIEW_LENGTH = 120
+QUEUE_STATUSES = ("open", "in_progress")
+CLAIM_ATTEMPTS = 5
+
+# Подсветка в сниппетах: БД ставит управляющие символы, а теги <mark> добавляются
+# уже после экранирования текста сообщения — сниппет безопасно вставлять как HTML
+_HIGHLIGHT_START, _HIGHLIGHT_END = "\x02", "\x03"
+SNIPPET_WORDS = 16
+
+# Лучшее совпадение на тикет, по релевантности; сниппет считается только для страницы
+POSTGRES_SEARCH_SQL = f"""
+WITH query AS (SELECT websearch_to_tsquery('{SEARCH_CONFIG}', :q) AS q),
+hits AS (
+    SELECT support_messages.id, support_messages.ticket_id,
+           row_number() OVER (
+               PARTITION BY support_messages.ticket_id
+               ORDER BY ts_rank({SEARCH_VECTOR_SQL}, query.q) DESC, support_messages.id DESC
+           ) AS n,
+           ts_rank({SEARCH_VECTOR_SQL}, query.q) AS rank
+    FROM support_messages, query
+    WHERE {SEARCH_VECTOR_SQL} @@ query.q
+),
+page AS (
+    SELECT id, ticket_id, rank FROM hits WHERE n = 1
+    ORDER BY rank DESC, ticket_id DESC LIMIT :limit OFFSET :offset
+)
+SELECT page.ticket_id, support_tickets.subject, support_tickets.status, page.id AS message_id, page.rank,
+       ts_headline('{SEARCH_CONFIG}', coalesce(support_messages.message, ''), query.q, :headline) AS snippet
+FROM page
+JOIN support_messages ON support_messages.id = page.id
+JOIN support_tickets ON support_tickets.id = page.ticket_id
+CROSS JOIN query
+ORDER BY page.rank DESC, page.ticket_id DESC
+"""
+
+SQLITE_SEARCH_SQL = f"""
+WITH hits AS (
+    SELECT support_messages.id, support_messages.ticket_id,
+           -bm25({SQLITE_FTS_TABLE}) AS rank,
+           snippet({SQLITE_FTS_TABLE}, 0, :start, :end, '…', {SNIPPET_WORDS}) AS snippet
+    FROM {SQLITE_FTS_TABLE}
+    JOIN support_messages ON support_messages.id = {SQLITE_FTS_TABLE}.rowid
+    WHERE {SQLITE_FTS_TABLE} MATCH :q
+),
+ranked AS (
+    SELECT *, row_number() OVER (PARTITION BY ticket_id ORDER BY rank DESC, id DESC) AS n FROM hits
+)
+SELECT ranked.ticket_id, support_tickets.subject, support_tickets.status, ranked.id AS message_id,
+       ranked.rank, ranked.snippet
+FROM ranked
+JOIN support_tickets ON support_tickets.id = ranked.ticket_id
+WHERE ranked.n = 1
+ORDER BY ranked.rank DESC, ranked.ticket_id DESC
+LIMIT :limit OFFSET :offset
+"""
+
+
+def message_channels(ticket_id: int, user_id: int) -> tuple[str, str]:
+    """Каналы pub/sub: конкретный тикет и все тикеты пользователя."""
+    return f"ticket:{ticket_id}", f"user:{user_id}"
+
+
+async def publish_message(user_id: int, msg: SupportMessage) -> None:
+    """Рассылает новое сообщение подписчикам WebSocket; сбой доставки не ломает запрос."""
+    try:
+        event = {"type": "support_message", "ticket_id": msg.ticket_id}
+        event |= SupportMessageRead.model_validate(msg, from_attributes=True).model_dump(mode="json")
+        for channel in message_channels(msg.ticket_id, user_id):
+            await broadcast.publish(channel, event)
+    except Exception as e:
+        logger.warning(f"Could not publish support message {msg.id}: {e}")
+
 
-from app.models.support import SupportMessage, SupportTicket
+def fts5_query(q: str) -> str:
+    """
+    Поисковая строка пользователя -> запрос FTS5: все слова, каждое как префикс.
+    Синтаксис FTS5 наружу не пропускаем; префикс частично заменяет стемминг
+    ("Bremsscheibe" находит и "Bremsscheiben").
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", q))
+
+
+def highlight(snippet: str | None) -> str | None:
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_HIGHLIGHT_START, "<mark>").replace(_HIGHLIGHT_END, "</mark>")
+
+
+def _page(rows: list, limit: int, cursor_of) -> dict:
+    """Из limit + 1 строк: страница и курсор следующей (None — страниц больше нет)."""
+    items = rows[:limit]
+    next_cursor = cursor_of(items[-1]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
 
 
 class SupportService:
@@ -12,19 +119,77 @@ class SupportService:
         db.add(ticket)
         await db.commit()
         await db.refresh(ticket)
+        # Новый тикет без сообщений — отдаём пустой список, не обращаясь к БД
+        set_committed_value(ticket, "messages", [])
         return ticket
 
     @staticmethod
-    async def get_user_tickets(db: AsyncSession, user_id: int):
-        result = await db.execute(select(SupportTicket).where(SupportTicket.user_id == user_id))
-        return result.scalars().all()
+    def ticket_summaries_stmt(user_id: int, cursor: int | None, limit: int):
+        """
+        Страница тикетов пользователя (новые первыми, keyset по id) одним запросом:
+        CTE со страницей id по индексу user_id, агрегат по сообщениям только этих
+        тикетов (число, последняя активность) и превью последнего сообщения.
+        """
+        page = select(SupportTicket.id).where(SupportTicket.user_id == user_id)
+        if cursor is not None:
+            page = page.where(SupportTicket.id < cursor)
+        page = page.order_by(SupportTicket.id.desc()).limit(limit).cte("ticket_page")
+
+        stats = (
+            select(
+                SupportMessage.ticket_id,
+                func.count(SupportMessage.id).label("message_count"),
+                func.max(SupportMessage.id).label("last_message_id"),
+                func.max(SupportMessage.created_at).label("last_message_at"),
+            )
+            .where(SupportMessage.ticket_id.in_(select(page.c.id)))
+            .group_by(SupportMessage.ticket_id)
+            .subquery()
+        )
+        last = aliased(SupportMessage)
+        return (
+            select(
+                SupportTicket.id,
+                SupportTicket.subject,
+                SupportTicket.status,
+                SupportTicket.created_at,
+                func.coalesce(stats.c.message_count, 0).label("message_count"),
+                func.coalesce(stats.c.last_message_at, SupportTicket.created_at).label("last_activity_at"),
+                func.substr(last.message, 1, PREVIEW_LENGTH).label("last_message_preview"),
+                last.sender.label("last_message_sender"),
+            )
+            .join(page, page.c.id == SupportTicket.id)
+            .outerjoin(stats, stats.c.ticket_id == SupportTicket.id)
+            .outerjoin(last, last.id == stats.c.last_message_id)
+            .order_by(SupportTicket.id.desc())
+        )
+
+    @staticmethod
+    async def list_ticket_summaries(db: AsyncSession, user_id: int, cursor: int | None, limit: int) -> dict:
+        result = await db.execute(SupportService.ticket_summaries_stmt(user_id, cursor, limit + 1))
+        rows = [dict(row._mapping) for row in result]
+        return _page(rows, limit, lambda row: row["id"])
+
+    @staticmethod
+    async def list_messages(db: AsyncSession, ticket_id: int, user_id: int, cursor: int | None, limit: int) -> dict:
+        """Сообщения тикета от новых к старым, keyset по id (индекс ticket_id + PK)."""
+        owner_id = await db.scalar(select(SupportTicket.user_id).where(SupportTicket.id == ticket_id))
+        if owner_id != user_id:
+            raise HTTPException(status_code=404, detail="Ticket not found")
+
+        query = select(SupportMessage).where(SupportMessage.ticket_id == ticket_id)
+        if cursor is not None:
+            query = query.where(SupportMessage.id < cursor)
+        result = await db.execute(query.order_by(SupportMessage.id.desc()).limit(limit + 1))
+        return _page(list(result.scalars()), limit, lambda msg: msg.id)
 
     @staticmethod
     async def add_message(
         db: AsyncSession, ticket_id: int, user_id: int, sender: str, message: str = None, attachment_url: str = None
     ):
-        ticket = await db.get(SupportTicket, ticket_id)
-        if not ticket or ticket.user_id != user_id:
+        # Нужен только владелец тикета — без загрузки всей переписки
+        owner_id = await db.scalar(select(SupportTicket.user_id).where(SupportTicket.id == ticket_id))
+        if owner_id != user_id:
             raise HTTPException(status_code=404, detail="Ticket not found")
 
         msg = SupportMessage(
@@ -36,18 +201,143 @@ class SupportService:
         db.add(msg)
         await db.commit()
         await db.refresh(msg)
+        await publish_message(user_id, msg)
         return msg
 
     @staticmethod
     async def upload_attachment(db: AsyncSession, ticket_id: int, user_id: int, file: UploadFile):
-        ticket = await db.get(SupportTicket, ticket_id)
-        if not ticket or ticket.user_id != user_id:
+        owner_id = await db.scalar(select(SupportTicket.user_id).where(SupportTicket.id == ticket_id))
+        if owner_id != user_id:
             raise HTTPException(status_code=404, detail="Ticket not found")
 
-        # TODO: заменить на реальную загрузку (например, S3)
-        fake_url = f"https://cdn.example.com/uploads/{file.filename}"
+        try:
+            stored = await object_store.put(
+                file.file, settings.ATTACHMENT_MAX_BYTES, file.content_type or "application/octet-stream"
+            )
+        except DocumentTooLarge:
+            raise HTTPException(status_code=413, detail="Attachment is too large")
+        url = f"{settings.ATTACHMENT_BASE_URL}/{stored.key}"
 
-        msg = SupportMessage(ticket_id=ticket_id, sender="user", attachment_url=fake_url)
+        msg = SupportMessage(ticket_id=ticket_id, sender="user", attachment_url=url)
         db.add(msg)
         await db.commit()
-        return {"attachment_url": fake_url}
+        await db.refresh(msg)
+        await publish_message(user_id, msg)
+        # stored.deduplicated наружу не отдаём: по нему можно узнать, загружал ли кто-то такой же файл
+        return {"attachment_url": url, "size": stored.size, "content_type": stored.content_type}
+
+    @staticmethod
+    async def can_read_attachment(db: AsyncSession, user_id: int, key: str) -> bool:
+        """Вложение доступно, если оно есть в сообщениях одного из тикетов пользователя."""
+        found = await db.scalar(
+            select(SupportMessage.id)
+            .join(SupportTicket, SupportTicket.id == SupportMessage.ticket_id)
+            .where(
+                SupportTicket.user_id == user_id,
+                SupportMessage.attachment_url == f"{settings.ATTACHMENT_BASE_URL}/{key}",
+            )
+            .limit(1)
+        )
+        return found is not None
+
+    # --- Очередь агентов поддержки ---
+    @staticmethod
+    def agent_queue_stmt(statuses: list[str], cursor: int | None, limit: int):
+        """
+        Тикеты указанных статусов от старых к новым, keyset по (created_at, id).
+
+        Для каждого статуса — отдельный подзапрос, который читает ровно limit строк
+        по индексу (status, created_at, id), а не сортирует всю очередь;
+        результаты сливаются и обрезаются до limit. Курсор — id последнего тикета
+        страницы: его (created_at, id) сравнивается в самой БД.
+        """
+        after = None
+        if cursor is not None:
+            last = aliased(SupportTicket)
+            after = select(last.created_at, last.id).where(last.id == cursor).scalar_subquery()
+
+        parts = []
+        for status in statuses:
+            part = select(SupportTicket).where(SupportTicket.status == status)
+            if after is not None:
+                part = part.where(tuple_(SupportTicket.created_at, SupportTicket.id) > after)
+            part = part.order_by(SupportTicket.created_at, SupportTicket.id).limit(limit).subquery()
+            parts.append(select(part))
+        merged = union_all(*parts).subquery() if len(parts) > 1 else parts[0].subquery()
+        ticket = aliased(SupportTicket, merged)
+        return select(ticket).order_by(ticket.created_at, ticket.id).limit(limit)
+
+    @staticmethod
+    async def agent_queue(db: AsyncSession, statuses: list[str], cursor: int | None, limit: int) -> dict:
+        result = await db.execute(SupportService.agent_queue_stmt(statuses, cursor, limit + 1))
+        return _page(list(result.scalars()), limit, lambda ticket: ticket.id)
+
+    @staticmethod
+    async def claim_next_ticket(db: AsyncSession, agent_id: int) -> SupportTicket | None:
+        """
+        Берёт самый старый открытый тикет и назначает его агенту.
+
+        SELECT ... FOR UPDATE SKIP LOCKED: параллельные агенты пропускают строки,
+        которые уже захватывает кто-то другой, и не ждут друг друга. Условный UPDATE
+        (status = 'open') дополнительно защищает от двойного назначения там, где
+        блокировок строк нет (SQLite) — тогда проигравший просто берёт следующий тикет.
+        """
+        try:
+            for _ in range(CLAIM_ATTEMPTS):
+                ticket_id = await db.scalar(
+                    select(SupportTicket.id)
+                    .where(SupportTicket.status == "open", SupportTicket.assigned_agent_id.is_(None))
+                    .order_by(SupportTicket.created_at, SupportTicket.id)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                )
+                if ticket_id is None:
+                    await db.rollback()
+                    return None
+
+                result = await db.execute(
+                    update(SupportTicket)
+                    .where(SupportTicket.id == ticket_id, SupportTicket.status == "open")
+                    .values(status="in_progress", assigned_agent_id=agent_id, assigned_at=func.now())
+                )
+                await db.commit()
+                if result.rowcount == 1:
+                    return await db.get(SupportTicket, ticket_id, populate_existing=True)
+            return None
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Failed to claim support ticket: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
+
+    @staticmethod
+    async def search_messages(db: AsyncSession, q: str, offset: int, limit: int) -> dict:
+        """
+        Полнотекстовый поиск по сообщениям всех тикетов: по одной строке на тикет
+        (лучшее сообщение), по убыванию релевантности. Курсор — смещение: порядок
+        по рангу не даёт устойчивого keyset, а глубоко такие выдачи не листают.
+        """
+        dialect = db.get_bind().dialect.name
+        params = {"limit": limit + 1, "offset": offset}
+        if dialect == "postgresql":
+            stmt = text(POSTGRES_SEARCH_SQL)
+            params |= {
+                "q": q,
+                "headline": f"StartSel={_HIGHLIGHT_START}, StopSel={_HIGHLIGHT_END}, "
+                f"MaxWords={SNIPPET_WORDS}, MinWords=5, MaxFragments=2",
+            }
+        elif dialect == "sqlite":
+            match = fts5_query(q)
+            if not match:
+                return {"items": [], "next_cursor": None}
+            stmt = text(SQLITE_SEARCH_SQL)
+            params |= {"q": match, "start": _HIGHLIGHT_START, "end": _HIGHLIGHT_END}
+        else:
+            raise NotImplementedError(f"Full-text search is not supported for dialect {dialect}")
+
+        try:
+            result = await db.execute(stmt, params)
+        except SQLAlchemyError as e:
+            logger.error(f"Support search failed: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
+        rows = [dict(row._mapping) | {"snippet": highlight(row.snippet)} for row in result]
+        return _page(rows, limit, lambda _: offset + limit)
@@ -0,0 +1,168 @@
+# app/services/token_service.py
+import asyncio
+from datetime import UTC, datetime
+
+from cachetools import LRUCache
+from loguru import logger
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+
+
+class RefreshTokenStore:
+    """
+    Хранилище refresh-токенов с одноразовой ротацией.
+
+    Источник истины — таблица refresh_tokens. Использованные и отозванные jti
+    дополнительно попадают в Bloom-фильтр (все) и точный LRU-кэш (последние),
+    поэтому типичный ответ «не отозван» не требует запроса к БД.
+    """
+
+    def __init__(self, bloom_capacity: int, bloom_error_rate: float, cache_size: int):
+        self._bloom_capacity = bloom_capacity
+        self._bloom_error_rate = bloom_error_rate
+        self._bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._revoked: LRUCache = LRUCache(maxsize=cache_size)  # jti -> expires_at
+
+    def _remember(self, jti: str, expires_at: datetime | None) -> None:
+        self._bloom.add(jti)
+        self._revoked[jti] = expires_at
+
+    # -----------------------
+    # Проверки
+    # -----------------------
+    async def is_revoked(self, db: AsyncSession, jti: str) -> bool:
+        if jti not in self._bloom:
+            return False
+        if jti in self._revoked:
+            return True
+
+        # Ложное срабатывание фильтра или jti вытеснен из точного кэша
+        result = await db.execute(
+            select(RefreshToken.used_at, RefreshToken.revoked_at, RefreshToken.expires_at).where(
+                RefreshToken.jti == jti
+            )
+        )
+        row = result.first()
+        if row and (row.used_at or row.revoked_at):
+            self._revoked[jti] = row.expires_at
+            return True
+        return False
+
+    # -----------------------
+    # Выпуск / ротация / отзыв
+    # -----------------------
+    @staticmethod
+    async def register(db: AsyncSession, jti: str, user_id: int, expires_at: datetime) -> None:
+        """Добавляет новый токен в сессию; коммит делает вызывающий код."""
+        db.add(RefreshToken(jti=jti, user_id=user_id, expires_at=expires_at))
+
+    async def rotate(
+        self, db: AsyncSession, jti: str, user_id: int, new_jti: str, new_expires_at: datetime
+    ) -> bool:
+        """
+        Атомарно помечает jti использованным и регистрирует новый токен.
+        Возвращает False, если токен уже был использован или отозван
+        (в том числе другим воркером).
+        """
+        now = datetime.now(UTC)
+        result = await db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.jti == jti,
+                RefreshToken.user_id == user_id,
+                RefreshToken.used_at.is_(None),
+                RefreshToken.revoked_at.is_(None),
+            )
+            .values(used_at=now)
+            .returning(RefreshToken.expires_at)
+        )
+        consumed = result.first()
+        if not consumed:
+            await db.rollback()
+            return False
+
+        await self.register(db, new_jti, user_id, new_expires_at)
+        await db.commit()
+        self._remember(jti, consumed.expires_at)
+        return True
+
+    async def revoke(self, db: AsyncSession, jti: str, user_id: int) -> bool:
+        result = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.jti == jti, RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(UTC))
+            .returning(RefreshToken.expires_at)
+        )
+        row = result.first()
+        await db.commit()
+        if row:
+            self._remember(jti, row.expires_at)
+        return row is not None
+
+    async def revoke_all_for_user(self, db: AsyncSession, user_id: int) -> int:
+        """Отзывает все активные токены пользователя (повторное использование = утечка)."""
+        result = await db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.user_id == user_id,
+                RefreshToken.used_at.is_(None),
+                RefreshToken.revoked_at.is_(None),
+            )
+            .values(revoked_at=datetime.now(UTC))
+            .returning(RefreshToken.jti, RefreshToken.expires_at)
+        )
+        rows = result.all()
+        await db.commit()
+        for row in rows:
+            self._remember(row.jti, row.expires_at)
+        return len(rows)
+
+    # -----------------------
+    # Прогрев и очистка
+    # -----------------------
+    async def load(self, db: AsyncSession) -> int:
+        """Пересобирает фильтр и кэш из БД (старт приложения / после очистки)."""
+        result = await db.execute(
+            select(RefreshToken.jti, RefreshToken.expires_at).where(
+                or_(RefreshToken.used_at.is_not(None), RefreshToken.revoked_at.is_not(None))
+            )
+        )
+        rows = result.all()
+
+        # Фильтр не умеет удалять, поэтому строим новый и подменяем целиком
+        bloom = BloomFilter(max(self._bloom_capacity, len(rows) * 2), self._bloom_error_rate)
+        revoked = LRUCache(maxsize=self._revoked.maxsize)
+        for row in rows:
+            bloom.add(row.jti)
+            revoked[row.jti] = row.expires_at
+        self._bloom, self._revoked = bloom, revoked
+        return len(rows)
+
+    async def purge_expired(self, db: AsyncSession) -> int:
+        result = await db.execute(delete(RefreshToken).where(RefreshToken.expires_at < datetime.now(UTC)))
+        await db.commit()
+        await self.load(db)
+        return result.rowcount
+
+
+refresh_token_store = RefreshTokenStore(
+    bloom_capacity=settings.REFRESH_BLOOM_CAPACITY,
+    bloom_error_rate=settings.REFRESH_BLOOM_ERROR_RATE,
+    cache_size=settings.REFRESH_REVOKED_CACHE_SIZE,
+)
+
+
+async def run_refresh_token_purge(session_factory, interval: int) -> None:
+    """Фоновая задача: периодически удаляет истёкшие токены."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                purged = await refresh_token_store.purge_expired(db)
+            logger.info(f"Purged {purged} expired refresh tokens")
+        except Exception as e:
+            logger.exception(f"Refresh token purge failed: {e}")
@@ -0,0 +1,162 @@
+# app/services/uploads.py
+"""
+Загрузки документов и фото: потоковое сохранение с SHA-256 и кэш
+результатов распознавания по хэшу содержимого.
+
+Повторная загрузка того же файла (типично при повторе шага в приложении)
+даёт тот же хэш, и результат берётся из кэша: сначала из памяти процесса,
+затем из небольшого хранилища на диске, общего для воркеров одного хоста.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from cachetools import LRUCache
+from loguru import logger
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+CHUNK_SIZE = 1024 * 1024
+EVICT_INTERVAL_SECONDS = 60.0  # обход каталога кэша не чаще раза в минуту на процесс
+
+
+class DocumentTooLarge(Exception):
+    pass
+
+
+def remove_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def spool_upload(src, path: str | None, limit: int) -> tuple[int, str]:
+    """
+    Читает загрузку кусками по 1 МБ, считая SHA-256 на лету, и пишет в path
+    (None — только хэш). Возвращает (размер, sha256). При превышении limit
+    файл удаляется и поднимается DocumentTooLarge.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    dst = open(path, "wb") if path else None
+    try:
+        while chunk := src.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > limit:
+                raise DocumentTooLarge
+            hasher.update(chunk)
+            if dst:
+                dst.write(chunk)
+    except BaseException:
+        if dst:
+            dst.close()
+            remove_file(path)
+        raise
+    if dst:
+        dst.close()
+    return size, hasher.hexdigest()
+
+
+class RecognitionCache:
+    """
+    Результаты распознавания по (вид, распознаватель, sha256 содержимого).
+
+    Память — LRU на процесс; диск — JSON-файл на запись, порядок LRU по mtime
+    (чтение обновляет mtime), при переполнении удаляются самые старые. Переполнение
+    проверяется не на каждой записи, а раз в evict_interval секунд — между проверками
+    каталог может ненадолго превысить disk_entries.
+    Смена распознавателя меняет ключ, поэтому старые результаты не используются.
+    """
+
+    def __init__(
+        self, memory_size: int, directory: str, disk_entries: int, evict_interval: float = EVICT_INTERVAL_SECONDS
+    ):
+        self._memory: LRUCache = LRUCache(maxsize=memory_size)
+        self.directory = directory
+        self.disk_entries = disk_entries
+        self.evict_interval = evict_interval
+        self._evicted_at: float | None = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(kind: str, recognizer: str, content_sha256: str) -> str:
+        return hashlib.sha256(f"{kind}|{recognizer}|{content_sha256}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_disk(self, key: str) -> dict | None:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+            os.utime(path)
+            return value
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_disk(self, key: str, value: dict) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        # Уникальное имя: один ключ могут писать одновременно несколько потоков и процессов
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f)
+            os.replace(tmp, self._path(key))  # атомарно для параллельных воркеров
+        except BaseException:
+            remove_file(tmp)
+            raise
+
+        now = time.monotonic()
+        if self._evicted_at is None or now - self._evicted_at >= self.evict_interval:
+            self._evicted_at = now
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(".json")]
+        if len(entries) > self.disk_entries:
+            mtimes = {}
+            for entry in entries:
+                try:
+                    mtimes[entry.path] = entry.stat().st_mtime
+                except FileNotFoundError:
+                    pass
+            for path in sorted(mtimes, key=mtimes.get)[: len(mtimes) - self.disk_entries]:
+                remove_file(path)
+
+    async def get(self, key: str) -> dict | None:
+        value = self._memory.get(key)
+        if value is None and self.disk_entries > 0:
+            value = await run_in_threadpool(self._read_disk, key)
+            if value is not None:
+                self._memory[key] = value
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: dict) -> None:
+        """Best effort: сбой записи на диск только логируется — результат распознавания важнее кэша."""
+        self._memory[key] = value
+        if self.disk_entries > 0:
+            try:
+                await run_in_threadpool(self._write_disk, key, value)
+            except OSError as e:
+                logger.warning(f"Could not write recognition cache entry {key}: {e}")
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+    def snapshot(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "memory_entries": len(self._memory)}
+
+
+recognition_cache = RecognitionCache(
+    settings.RECOGNITION_CACHE_SIZE, settings.RECOGNITION_CACHE_DIR, settings.RECOGNITION_CACHE_DISK_ENTRIES
+)
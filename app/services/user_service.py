@@ -1,9 +1,11 @@
 # app/services/user_service.py
+import asyncio
+
 from fastapi import HTTPException
 from passlib.context import CryptContext
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.models.user import User
 from app.models.vehicle import Vehicle
@@ -11,47 +13,88 @@ from app.models.vehicle import Vehicle
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+# bcrypt намеренно медленный — считаем его в потоке, чтобы не блокировать event loop
+async def hash_password(password: str) -> str:
+    return await asyncio.to_thread(pwd_context.hash, password)
+
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    return await asyncio.to_thread(pwd_context.verify, password, password_hash)
+
+
 class UserService:
     @staticmethod
     async def get_user_by_email(db: AsyncSession, email: str):
-        result = await db.execute(
-            select(User)
-            .options(selectinload(User.vehicles))  # загружаем машины сразу
-            .where(User.email == email)
-        )
+        result = await db.execute(select(User).where(User.email == email))
         return result.scalars().first()
 
     @staticmethod
-    async def create_user(db: AsyncSession, user_data):
+    async def create_user(db: AsyncSession, user_data) -> dict:
+        """
+        Регистрация одной транзакцией: INSERT ... RETURNING для пользователя
+        и (опционально) машины, один коммит. Дубликат email ловим по
+        уникальному индексу users.email, без предварительного SELECT.
+        """
         if len(user_data.password.encode("utf-8")) > 72:
             raise HTTPException(status_code=400, detail="Password too long (max 72 bytes).")
 
-        hashed_pw = pwd_context.hash(user_data.password)
-        user = User(email=user_data.email, password_hash=hashed_pw)
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
+        hashed_pw = await hash_password(user_data.password)
+        try:
+            result = await db.execute(
+                insert(User)
+                .values(email=user_data.email, password_hash=hashed_pw)
+                .returning(User.id, User.email, User.created_at)
+            )
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="Email is already registered")
+        user = dict(result.one()._mapping)
 
+        vehicles = []
         if user_data.vin:
-            vehicle = Vehicle(
-                user_id=user.id,
-                vin=user_data.vin,
-                brand=user_data.brand,
-                model=user_data.model,
-                engine=user_data.engine,
-                kba_code=user_data.kba_code,
-                search_code=user_data.search_code,
+            result = await db.execute(
+                insert(Vehicle)
+                .values(
+                    user_id=user["id"],
+                    vin=user_data.vin,
+                    brand=user_data.brand,
+                    model=user_data.model,
+                    engine=user_data.engine,
+                    kba_code=user_data.kba_code,
+                    search_code=user_data.search_code,
+                )
+                .returning(
+                    Vehicle.id,
+                    Vehicle.vin,
+                    Vehicle.brand,
+                    Vehicle.model,
+                    Vehicle.engine,
+                    Vehicle.kba_code,
+                    Vehicle.search_code,
+                    Vehicle.is_selected,
+                )
             )
-            db.add(vehicle)
-            await db.commit()
-            await db.refresh(vehicle)
+            vehicles.append(dict(result.one()._mapping))
 
-        return user
+        await db.commit()
+        return {**user, "vehicles": vehicles}
+
+    @staticmethod
+    async def bump_version(db: AsyncSession, user_id: int, collection: str) -> int:
+        """
+        Увеличивает версию коллекции ("cart", "favorites", "vehicles") в той же
+        транзакции, что и само изменение. Коммит остаётся за вызывающим кодом.
+        """
+        column = getattr(User, f"{collection}_version")
+        result = await db.execute(
+            update(User).where(User.id == user_id).values({column: column + 1}).returning(column)
+        )
+        return result.scalar_one()
 
     @staticmethod
     async def authenticate_user(db: AsyncSession, email: str, password: str):
         user = await UserService.get_user_by_email(db, email)
-        if user and pwd_context.verify(password, user.password_hash):
+        if user and user.password_hash and await verify_password(password, user.password_hash):
             return user
         return None
 
@@ -87,7 +130,7 @@ class UserService:
         if update_data.get("full_name") or getattr(update_data, "password", None):
             if len(update_data.password.encode("utf-8")) > 72:
                 raise HTTPException(status_code=400, detail="Password too long (max 72 bytes).")
-            user.password_hash = pwd_context.hash(update_data.password)
+            user.password_hash = await hash_password(update_data.password)
             updated = True
 
         if updated:
@@ -1,9 +1,14 @@
 from fastapi import HTTPException
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.models.user import User
 from app.models.vehicle import Vehicle
+from app.services.user_service import UserService
+from app.utils.vin import decode_vin
+
+UNKNOWN = "Unknown"
 
 
 class VehicleService:
@@ -12,6 +17,25 @@ class VehicleService:
         result = await db.execute(select(Vehicle).where(Vehicle.user_id == user.id))
         return result.scalars().all()
 
+    @staticmethod
+    def vehicle_from_vin(
+        user_id: int, vin: str, kba_code: str | None, search_code: str | None, engine: str | None = None
+    ) -> Vehicle:
+        """Машина по VIN: марка и модель из офлайн-декодера, неизвестное — "Unknown"."""
+        decoded = decode_vin(vin)
+        if decoded["valid"]:
+            vin = decoded["vin"]
+        return Vehicle(
+            user_id=user_id,
+            vin=vin,
+            brand=decoded["manufacturer"] or UNKNOWN,
+            model=decoded["model"] or UNKNOWN,
+            # Европейские VIN двигатель не кодируют; уточняется по KBA/документу
+            engine=engine or UNKNOWN,
+            kba_code=kba_code or vin,
+            search_code=search_code,
+        )
+
     @staticmethod
     async def add_vehicle(db: AsyncSession, user: User, vehicle_data):
         vehicle = Vehicle(
@@ -23,6 +47,7 @@ class VehicleService:
             kba_code=vehicle_data.kba_code,
         )
         db.add(vehicle)
+        await UserService.bump_version(db, user.id, "vehicles")
         await db.commit()
         await db.refresh(vehicle)
         return vehicle
@@ -34,24 +59,45 @@ class VehicleService:
         if not vehicle:
             raise HTTPException(status_code=404, detail="Vehicle not found")
         await db.delete(vehicle)
+        await UserService.bump_version(db, user.id, "vehicles")
         await db.commit()
         return {"detail": "Vehicle deleted"}
 
+    @staticmethod
+    async def get_selected_vehicle(db: AsyncSession, user: User):
+        # Условие совпадает с предикатом ux_vehicles_user_selected — поиск идёт по частичному индексу
+        result = await db.execute(select(Vehicle).where(Vehicle.user_id == user.id, Vehicle.is_selected))
+        return result.scalar_one_or_none()
+
     @staticmethod
     async def select_vehicle(db: AsyncSession, user: User, vehicle_id: int):
-        # Получаем машину для выбора
-        result = await db.execute(select(Vehicle).where(Vehicle.user_id == user.id, Vehicle.id == vehicle_id))
-        vehicle_to_select = result.scalar_one_or_none()
-        if not vehicle_to_select:
-            raise HTTPException(status_code=404, detail="Vehicle not found")
+        """
+        Выбор машины без чтения списка в Python.
 
-        # Сбрасываем все остальные авто
-        result = await db.execute(select(Vehicle).where(Vehicle.user_id == user.id))
-        all_vehicles = result.scalars().all()
-        for v in all_vehicles:
-            v.is_selected = False
+        Сначала увеличиваем users.vehicles_version: эта строка блокируется до коммита,
+        и параллельные выборы одного пользователя выполняются по очереди. Затем
+        снимаем флаг с прежней машины и ставим на новую. Одним UPDATE
+        (is_selected = (id = :vid)) это сделать нельзя: неотложенный уникальный
+        индекс проверяется построчно и может сработать на промежуточном состоянии.
+        """
+        await UserService.bump_version(db, user.id, "vehicles")
+        await db.execute(
+            update(Vehicle)
+            .where(Vehicle.user_id == user.id, Vehicle.is_selected, Vehicle.id != vehicle_id)
+            .values(is_selected=False)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(
+            update(Vehicle)
+            .where(Vehicle.user_id == user.id, Vehicle.id == vehicle_id)
+            .values(is_selected=True)
+            .returning(Vehicle)
+            .execution_options(synchronize_session=False)
+        )
+        vehicle = result.scalar_one_or_none()
+        if not vehicle:
+            await db.rollback()
+            raise HTTPException(status_code=404, detail="Vehicle not found")
 
-        vehicle_to_select.is_selected = True
         await db.commit()
-        await db.refresh(vehicle_to_select)
-        return vehicle_to_select
+        return vehicle
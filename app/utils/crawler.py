@@ -0,0 +1,216 @@
+# app/utils/crawler.py
+"""
+Загрузка страниц магазина для парсера.
+
+- Один httpx.AsyncClient на весь обход: пул соединений с keep-alive, без
+  нового TCP/TLS-рукопожатия на каждую страницу.
+- Параллельность ограничена семафором (concurrency); его слот занят только
+  на время самого запроса, ожидание токена хоста идёт до него.
+- Вежливость — token bucket на каждый хост: в среднем не больше rate запросов
+  в секунду, пачкой не больше burst. Лимиты задаются отдельно для хоста
+  (host_limits), иначе действует default_limits.
+- Временные ошибки (сеть, 429, 5xx) повторяются с экспоненциальной задержкой
+  и случайным разбросом (full jitter); Retry-After сервера учитывается.
+  Если сервер просит ждать дольше max_retry_after, URL считается неудачным:
+  иначе один ответ "Retry-After: 86400" остановил бы весь обход на сутки.
+  Каждая попытка снова проходит через token bucket.
+
+    async with Crawler(concurrency=8, default_limits=HostLimits(rate=4, burst=4)) as crawler:
+        async for result in crawler.crawl(urls):
+            ...
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 10.0
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+
+@dataclass(frozen=True)
+class HostLimits:
+    rate: float = 2.0  # запросов в секунду в среднем
+    burst: int = 2  # сколько запросов можно сделать подряд без ожидания
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int | None = None
+    text: str | None = None
+    error: str | None = None
+    attempts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.text is not None
+
+
+class TokenBucket:
+    """Token bucket для asyncio: ожидающие обслуживаются по очереди (lock), без опроса."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """Full jitter: случайная задержка от 0 до base * 2^attempt (не больше cap)."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Retry-After в секундах: число секунд или HTTP-дата."""
+    value = response.headers.get("retry-after", "").strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return max((moment - datetime.now(UTC)).total_seconds(), 0.0)
+
+
+class CrawlStats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failed = 0
+        self.by_host: dict[str, int] = {}
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failed": self.failed,
+            "by_host": dict(self.by_host),
+        }
+
+
+class Crawler:
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        default_limits: HostLimits = HostLimits(),
+        host_limits: dict[str, HostLimits] | None = None,
+        retries: int = DEFAULT_RETRIES,
+        timeout: float = DEFAULT_TIMEOUT,
+        backoff_base: float = BACKOFF_BASE,
+        max_retry_after: float = BACKOFF_MAX,
+        client: httpx.AsyncClient | None = None,
+    ):
+        self.concurrency = concurrency
+        self.default_limits = default_limits
+        self.host_limits = host_limits or {}
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.max_retry_after = max_retry_after
+        self.stats = CrawlStats()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._buckets: dict[str, TokenBucket] = {}
+        self._own_client = client is None
+        self.client = client or httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def __aenter__(self) -> "Crawler":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._own_client:
+            await self.client.aclose()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            limits = self.host_limits.get(host, self.default_limits)
+            bucket = self._buckets[host] = TokenBucket(limits.rate, limits.burst)
+        return bucket
+
+    async def fetch(self, url: str) -> FetchResult:
+        """Загружает страницу с повторами; не бросает исключений — ошибка в FetchResult.error."""
+        host = urlsplit(url).netloc
+        result = FetchResult(url=url)
+        for attempt in range(self.retries + 1):
+            delay = None
+            # Токен хоста — до слота: запрос, ждущий медленный хост, не занимает общий слот
+            # и не мешает остальным хостам. Пауза перед повтором слот тоже не держит.
+            await self._bucket(host).acquire()
+            async with self._semaphore:
+                result.attempts += 1
+                self.stats.requests += 1
+                self.stats.by_host[host] = self.stats.by_host.get(host, 0) + 1
+                try:
+                    response = await self.client.get(url)
+                    result.status = response.status_code
+                    if response.status_code < 400:
+                        result.text, result.error = response.text, None
+                        return result
+                    result.error = f"HTTP {response.status_code}"
+                    if response.status_code not in RETRY_STATUSES:
+                        break
+                    delay = retry_after_seconds(response)
+                    if delay is not None and delay > self.max_retry_after:
+                        result.error += f", Retry-After {delay:.0f}s exceeds {self.max_retry_after:.0f}s"
+                        break
+                except httpx.TransportError as e:
+                    result.error = f"{type(e).__name__}: {e}"
+
+            if attempt < self.retries:
+                self.stats.retries += 1
+                delay = max(delay or 0, backoff_delay(attempt, self.backoff_base))
+                logger.debug(f"Retrying {url} in {delay:.2f}s after {result.error}")
+                await asyncio.sleep(delay)
+
+        self.stats.failed += 1
+        logger.error(f"Error fetching {url}: {result.error}")
+        return result
+
+    async def crawl(self, urls):
+        """Результаты по мере готовности (не в порядке urls)."""
+        tasks = [asyncio.create_task(self.fetch(url)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_all(self, urls) -> list[FetchResult]:
+        """Результаты в порядке urls."""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
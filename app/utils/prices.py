@@ -0,0 +1,50 @@
+import re
+from decimal import Decimal, InvalidOperation
+
+CURRENCY_SYMBOLS = {"€": "EUR", "$": "USD", "£": "GBP", "₽": "RUB", "CHF": "CHF"}
+# Коды ISO 4217, которые встречаются у магазинов; любое другое слово из трёх букв
+# ("Preis auf Anfrage" -> "AUF") валютой не считается
+ISO_CURRENCIES = frozenset({"EUR", "USD", "GBP", "CHF", "RUB", "PLN", "CZK", "DKK", "SEK", "NOK", "HUF"})
+ISO_CODE = re.compile(r"\b([A-Z]{3})\b")
+AMOUNT = re.compile(r"\d[\d.,\s ]*")
+
+
+def parse_price(raw: str | None) -> tuple[int | None, str | None]:
+    """
+    Разбирает строку цены из выдачи магазинов в (центы, ISO-код валюты).
+
+    "45,99 €" -> (4599, "EUR"), "1.234,56 €" -> (123456, "EUR"),
+    "$12.50" -> (1250, "USD"), "N/A" -> (None, None).
+    Без суммы валюта не возвращается: "Preis auf Anfrage" -> (None, None).
+    Десятичным разделителем считается последний из "," и ".", если после
+    него одна-две цифры; остальные разделители — разряды.
+    """
+    if not raw:
+        return None, None
+
+    currency = None
+    for symbol, code in CURRENCY_SYMBOLS.items():
+        if symbol in raw:
+            currency = code
+            break
+    if currency is None:
+        codes = (code for code in ISO_CODE.findall(raw.upper()) if code in ISO_CURRENCIES)
+        currency = next(codes, None)
+
+    match = AMOUNT.search(raw)
+    if not match:
+        return None, None
+
+    amount = re.sub(r"[\s ]", "", match.group(0)).rstrip(".,")
+    last_sep = max(amount.rfind(","), amount.rfind("."))
+    if last_sep != -1 and 1 <= len(amount) - last_sep - 1 <= 2:
+        integer, fraction = amount[:last_sep], amount[last_sep + 1 :]
+    else:
+        integer, fraction = amount, ""
+    integer = re.sub(r"[.,]", "", integer) or "0"
+
+    try:
+        cents = int(Decimal(f"{integer}.{fraction or '0'}") * 100)
+    except InvalidOperation:
+        return None, None
+    return cents, currency
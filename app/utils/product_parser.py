@@ -0,0 +1,147 @@
+# app/utils/product_parser.py
+"""
+Разбор страниц autoteile-markt.de.
+
+Каждая страница разбирается в одно дерево lxml; все селекторы — заранее
+скомпилированные XPath (etree.XPath), без обхода дерева Python-лямбдами.
+Результат совпадает с прежним разбором через BeautifulSoup (get_text(strip=True)
+и т.п.), так что CSV и данные в БД не меняются.
+
+Функции модуля — чистые и импортируемые на верхнем уровне: их можно отдавать
+в ProcessPoolExecutor (ParserPool), чтобы разбор не занимал event loop,
+пока идёт загрузка следующих страниц.
+"""
+import asyncio
+import base64
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin
+
+from loguru import logger
+from lxml import etree, html
+
+BASE_URL = "https://www.autoteile-markt.de"
+MAX_PRODUCTS = 3
+NOT_FOUND = "N/A"
+
+
+def _has_class(name: str) -> str:
+    """Точное совпадение одного из классов элемента."""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+# Подстрока в атрибуте class — как class_=lambda x: x and "..." in x у BeautifulSoup
+PRODUCT_CARDS = etree.XPath('//div[contains(@class, "card") and contains(@class, "itemRow")]')
+CARD_TITLE = etree.XPath(
+    f'(.//*[(self::a or self::span) and {_has_class("card-title")} and {_has_class("itemTitle")}])[1]'
+)
+
+TITLE = etree.XPath("(//h1)[1]")
+IMAGE = etree.XPath(
+    '((//div[contains(@class, "carousel-inner")])[1]//span[contains(@class, "zoomImg")])[1]/@href'
+)
+PRICE = etree.XPath('(//span[contains(@class, "supplierPrice")])[1]')
+SELLER = etree.XPath('((//div[contains(@class, "supplierBox")])[1]//a[@data-click="infopage"])[1]')
+# Текст сразу после <span>Lieferzeit:</span> внутри блока partInfo
+DELIVERY_TIME = etree.XPath(
+    '((//div[contains(@class, "partInfo")])[1]//span[not(*) and contains(., "Lieferzeit")])[1]'
+    "/following-sibling::text()[1]"
+)
+DESCRIPTION = etree.XPath('(//div[@id="partDescription"])[1]')
+# Текст элемента без <script>, <style> и <template> — их get_text() у BeautifulSoup тоже пропускает
+TEXT_NODES = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+
+def _first(matches):
+    return matches[0] if matches else None
+
+
+def _text(element) -> str:
+    """Аналог get_text(strip=True): все текстовые узлы без пробелов по краям, подряд."""
+    return "".join(part.strip() for part in TEXT_NODES(element) if part.strip())
+
+
+def decode_base64_url(encoded_href):
+    try:
+        return base64.b64decode(encoded_href).decode("utf-8")
+    except Exception as e:
+        logger.warning(f"Failed to decode base64 {encoded_href}: {e}")
+        return None
+
+
+def extract_product_urls(page: str, max_products: int = MAX_PRODUCTS, base_url: str = BASE_URL) -> list[str]:
+    """Ссылки на карточки товаров со страницы выдачи (закодированные в data-href64 тоже)."""
+    cards = PRODUCT_CARDS(html.fromstring(page))
+    logger.debug(f"Found {len(cards)} product cards on page")
+    urls = []
+    for i, card in enumerate(cards[:max_products]):
+        title = _first(CARD_TITLE(card))
+        path = None
+        if title is not None:
+            if title.tag == "a" and "href" in title.attrib:
+                path = title.get("href")
+            elif "data-href64" in title.attrib:
+                path = decode_base64_url(title.get("data-href64"))
+        if path:
+            urls.append(urljoin(base_url, path))
+        else:
+            logger.warning(f"{i + 1}: No valid link found in card")
+    return urls
+
+
+def extract_product_data(page: str, url: str) -> dict:
+    """Поля товара со страницы карточки; отсутствующее поле — "N/A"."""
+    root = html.fromstring(page)
+    product = {"product_url": url}
+
+    title = _first(TITLE(root))
+    product["title"] = _text(title) if title is not None else NOT_FOUND
+
+    image = _first(IMAGE(root))
+    product["image_url"] = str(image) if image is not None else NOT_FOUND
+
+    price = _first(PRICE(root))
+    product["price"] = _text(price) if price is not None else NOT_FOUND
+
+    seller = _first(SELLER(root))
+    product["seller_name"] = _text(seller) if seller is not None else NOT_FOUND
+
+    delivery = _first(DELIVERY_TIME(root))
+    product["delivery_time"] = str(delivery).strip() if delivery is not None else NOT_FOUND
+
+    description = _first(DESCRIPTION(root))
+    product["description"] = _text(description) if description is not None else NOT_FOUND
+
+    return product
+
+
+class ParserPool:
+    """
+    Пул процессов для разбора страниц. workers=0 — разбор в текущем процессе
+    (в потоке, чтобы не блокировать loop): для пары страниц запуск процессов дороже разбора.
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+
+    async def __aenter__(self) -> "ParserPool":
+        if self.workers != 0:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def product_urls(self, page: str, max_products: int = MAX_PRODUCTS, base_url: str = BASE_URL):
+        return await self.run(extract_product_urls, page, max_products, base_url)
+
+    async def product_data(self, page: str, url: str) -> dict:
+        return await self.run(extract_product_data, page, url)
@@ -0,0 +1,264 @@
+"""
+Офлайн-декодер VIN (ISO 3779 / 49 CFR 565).
+
+    WMI (1–3)  производитель и страна
+    VDS (4–9)  модель; 9-й символ — контрольная цифра (обязательна для Северной Америки)
+    VIS (10–17) 10-й символ — модельный год, 11-й — завод
+
+Все таблицы собираются один раз при импорте. Символы переводятся в значения
+через массивы, индексируемые ord(c), остальное — словари: декодирование одного
+VIN — несколько обращений по индексу без регулярных выражений и запросов в БД.
+Таблицы моделей и заводов неполные: неизвестное возвращается как None.
+"""
+from datetime import date
+
+VIN_LENGTH = 17
+
+# Порядок символов VIN для диапазонов стран (I, O, Q не используются)
+VIN_ALPHABET = "ABCDEFGHJKLMNPRSTUVWXYZ1234567890"
+
+_TRANSLITERATION = {
+    **{str(d): d for d in range(10)},
+    "A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6, "G": 7, "H": 8,
+    "J": 1, "K": 2, "L": 3, "M": 4, "N": 5, "P": 7, "R": 9,
+    "S": 2, "T": 3, "U": 4, "V": 5, "W": 6, "X": 7, "Y": 8, "Z": 9,
+}
+_WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+
+# ord(символ) -> числовое значение; -1 для недопустимых символов
+_VALUES = [-1] * 128
+for _char, _value in _TRANSLITERATION.items():
+    _VALUES[ord(_char)] = _value
+
+# ord(10-го символа) -> год первого 30-летнего цикла (A=1980 ... Y=2000, 1=2001 ... 9=2009)
+_YEAR_CODES = "ABCDEFGHJKLMNPRSTVWXY123456789"
+_BASE_YEAR = [0] * 128
+for _offset, _char in enumerate(_YEAR_CODES):
+    _BASE_YEAR[ord(_char)] = 1980 + _offset
+
+# --- Регионы и страны по первым символам ---
+_REGIONS = {
+    **dict.fromkeys("ABCDEFGH", "Africa"),
+    **dict.fromkeys("JKLMNPR", "Asia"),
+    **dict.fromkeys("STUVWXYZ", "Europe"),
+    **dict.fromkeys("12345", "North America"),
+    **dict.fromkeys("67", "Oceania"),
+    **dict.fromkeys("89", "South America"),
+}
+
+# (первый символ, начало диапазона второго, конец диапазона, страна)
+_COUNTRY_RANGES = (
+    ("J", "A", "0", "Japan"),
+    ("K", "L", "R", "South Korea"),
+    ("L", "A", "0", "China"),
+    ("M", "A", "E", "India"),
+    ("N", "L", "R", "Turkey"),
+    ("S", "A", "M", "United Kingdom"),
+    ("S", "N", "T", "Germany"),
+    ("S", "U", "Z", "Poland"),
+    ("T", "A", "H", "Switzerland"),
+    ("T", "J", "P", "Czech Republic"),
+    ("T", "R", "V", "Hungary"),
+    ("T", "W", "1", "Portugal"),
+    ("U", "U", "1", "Romania"),
+    ("V", "A", "E", "Austria"),
+    ("V", "F", "R", "France"),
+    ("V", "S", "W", "Spain"),
+    ("W", "A", "0", "Germany"),
+    ("X", "L", "R", "Netherlands"),
+    ("X", "S", "0", "Russia"),
+    ("Y", "A", "E", "Belgium"),
+    ("Y", "F", "K", "Finland"),
+    ("Y", "S", "W", "Sweden"),
+    ("Z", "A", "R", "Italy"),
+    ("1", "A", "0", "United States"),
+    ("2", "A", "0", "Canada"),
+    ("3", "A", "W", "Mexico"),
+    ("4", "A", "0", "United States"),
+    ("5", "A", "0", "United States"),
+    ("6", "A", "W", "Australia"),
+    ("9", "A", "E", "Brazil"),
+)
+
+
+def _expand_countries() -> dict[str, str]:
+    countries = {}
+    for first, start, end, country in _COUNTRY_RANGES:
+        for second in VIN_ALPHABET[VIN_ALPHABET.index(start) : VIN_ALPHABET.index(end) + 1]:
+            countries[first + second] = country
+    return countries
+
+
+_COUNTRIES = _expand_countries()
+
+# --- Производители (WMI) ---
+WMI_MANUFACTURERS = {
+    # Германия
+    "WVW": "Volkswagen", "WV1": "Volkswagen", "WV2": "Volkswagen", "WV3": "Volkswagen",
+    "WAU": "Audi", "WA1": "Audi", "WUA": "Audi",
+    "WBA": "BMW", "WBS": "BMW", "WBX": "BMW", "WBY": "BMW", "WMW": "MINI",
+    "WDB": "Mercedes-Benz", "WDC": "Mercedes-Benz", "WDD": "Mercedes-Benz", "WDF": "Mercedes-Benz",
+    "W1K": "Mercedes-Benz", "W1N": "Mercedes-Benz", "W1V": "Mercedes-Benz", "WMX": "Mercedes-AMG",
+    "WME": "smart", "WP0": "Porsche", "WP1": "Porsche",
+    "W0L": "Opel", "W0V": "Opel", "WF0": "Ford",
+    # Чехия, Испания, Франция, Италия
+    "TMB": "Skoda", "TMA": "Hyundai", "VSS": "SEAT", "VSK": "Nissan",
+    "VF1": "Renault", "VF3": "Peugeot", "VF7": "Citroen", "VR3": "Peugeot", "VR7": "Citroen",
+    "ZFA": "Fiat", "ZAR": "Alfa Romeo", "ZFF": "Ferrari", "ZHW": "Lamborghini",
+    # Швеция, Великобритания
+    "YV1": "Volvo", "YV4": "Volvo", "YS3": "Saab",
+    "SAL": "Land Rover", "SAJ": "Jaguar", "SCC": "Lotus", "SCF": "Aston Martin",
+    # Азия
+    "JTD": "Toyota", "JTE": "Toyota", "JTH": "Lexus", "JTN": "Toyota", "SB1": "Toyota",
+    "JHM": "Honda", "JN1": "Nissan", "JMZ": "Mazda", "JM1": "Mazda", "JF1": "Subaru", "JS2": "Suzuki",
+    "JMB": "Mitsubishi", "KMH": "Hyundai", "KNA": "Kia", "KNM": "Renault Samsung", "U5Y": "Kia",
+    # Северная Америка
+    "1FA": "Ford", "1FT": "Ford", "1FM": "Ford", "1G1": "Chevrolet", "1GC": "Chevrolet",
+    "1HG": "Honda", "2HG": "Honda", "5FN": "Honda", "1N4": "Nissan", "1C4": "Chrysler", "1J4": "Jeep",
+    "2T1": "Toyota", "4T1": "Toyota", "5YJ": "Tesla", "7SA": "Tesla",
+    "3VW": "Volkswagen", "1VW": "Volkswagen", "5UX": "BMW", "4JG": "Mercedes-Benz",
+}
+
+# --- Модели: производитель -> (срез VDS, {код: модель}) ---
+_VW_GROUP_MODEL_SLICE = slice(6, 8)  # 7–8 символы у VW, Audi, Skoda, SEAT
+_MODELS = {
+    "Volkswagen": (
+        _VW_GROUP_MODEL_SLICE,
+        {
+            "1J": "Golf IV", "1K": "Golf V", "5K": "Golf VI", "AU": "Golf VII", "5G": "Golf VII", "CD": "Golf VIII",
+            "9N": "Polo IV", "6R": "Polo V", "AW": "Polo VI", "3B": "Passat B5", "3C": "Passat B6/B7",
+            "3G": "Passat B8", "1T": "Touran", "5N": "Tiguan", "AD": "Tiguan II", "7L": "Touareg",
+            "7P": "Touareg II", "7N": "Sharan", "2K": "Caddy", "7H": "Transporter T5", "7J": "Transporter T5",
+            "SH": "Transporter T6", "13": "Scirocco", "16": "Jetta VI", "2H": "Amarok", "AJ": "T-Roc",
+        },
+    ),
+    "Audi": (
+        _VW_GROUP_MODEL_SLICE,
+        {
+            "8X": "A1", "8P": "A3", "8V": "A3", "8E": "A4 B6/B7", "8K": "A4 B8", "8W": "A4 B9", "8T": "A5",
+            "4F": "A6 C6", "4G": "A6 C7", "4K": "A6 C8", "4H": "A8 D4", "8U": "Q3", "8R": "Q5", "FY": "Q5 II",
+            "4L": "Q7", "4M": "Q7 II", "8J": "TT", "FV": "TT",
+        },
+    ),
+    "Skoda": (
+        _VW_GROUP_MODEL_SLICE,
+        {
+            "1Z": "Octavia II", "5E": "Octavia III", "NX": "Octavia IV", "5J": "Fabia II", "NJ": "Fabia III",
+            "3T": "Superb II", "3V": "Superb III", "5L": "Yeti", "NS": "Kodiaq", "NU": "Karoq",
+        },
+    ),
+    "SEAT": (
+        _VW_GROUP_MODEL_SLICE,
+        {"1P": "Leon II", "5F": "Leon III", "6J": "Ibiza IV", "6F": "Ibiza V", "5P": "Altea", "KL": "Leon IV"},
+    ),
+    # Mercedes-Benz кодирует шасси в 4–6 символах
+    "Mercedes-Benz": (
+        slice(3, 6),
+        {
+            "168": "A-Class W168", "169": "A-Class W169", "176": "A-Class W176", "177": "A-Class W177",
+            "245": "B-Class W245", "246": "B-Class W246", "203": "C-Class W203", "204": "C-Class W204",
+            "205": "C-Class W205", "211": "E-Class W211", "212": "E-Class W212", "213": "E-Class W213",
+            "221": "S-Class W221", "222": "S-Class W222", "164": "M-Class W164", "166": "M-Class W166",
+            "156": "GLA X156", "253": "GLC X253", "906": "Sprinter 906", "639": "Vito W639", "447": "Vito W447",
+        },
+    ),
+}
+
+# --- Заводы: производитель -> {11-й символ: завод} ---
+_PLANTS = {
+    "Volkswagen": {
+        "W": "Wolfsburg", "E": "Emden", "H": "Hannover", "K": "Osnabrück", "P": "Mosel",
+        "D": "Bratislava", "M": "Puebla", "N": "Neckarsulm", "B": "Brussels",
+    },
+    "Audi": {"A": "Ingolstadt", "N": "Neckarsulm", "1": "Győr", "D": "Bratislava"},
+    "Skoda": {"0": "Mladá Boleslav", "6": "Kvasiny", "8": "Vrchlabí"},
+    "SEAT": {"R": "Martorell"},
+}
+
+
+def _model_year(vin: str, region: str | None, today: date | None = None) -> int | None:
+    base = _BASE_YEAR[ord(vin[9])] if ord(vin[9]) < 128 else 0
+    if not base:
+        return None
+    if region == "North America":
+        # Для легковых в США/Канаде: буква в 7-й позиции — цикл с 2010 года
+        return base + 30 if vin[6].isalpha() else base
+    # Вне Северной Америки правило не действует: берём последний цикл, который не в будущем
+    latest = (today or date.today()).year + 1
+    return base + 30 if base + 30 <= latest else base
+
+
+def check_digit(vin: str) -> str | None:
+    """Ожидаемая контрольная цифра (9-й символ) или None для недопустимых символов."""
+    total = 0
+    for char, weight in zip(vin, _WEIGHTS):
+        value = _VALUES[ord(char)] if ord(char) < 128 else -1
+        if value < 0:
+            return None
+        total += value * weight
+    remainder = total % 11
+    return "X" if remainder == 10 else str(remainder)
+
+
+def decode_vin(raw: str) -> dict:
+    """
+    Разбирает VIN в словарь: valid/error, check_digit_valid, wmi, manufacturer,
+    country, region, model, model_year, plant_code, plant.
+
+    Неверная контрольная цифра не делает VIN невалидным: европейские
+    производители её не обязаны заполнять (у VW там обычно "Z").
+    """
+    vin = (raw or "").strip().upper()
+    result = {
+        "vin": vin,
+        "valid": False,
+        "error": None,
+        "check_digit_valid": None,
+        "wmi": None,
+        "manufacturer": None,
+        "country": None,
+        "region": None,
+        "model": None,
+        "model_year": None,
+        "plant_code": None,
+        "plant": None,
+    }
+    if len(vin) != VIN_LENGTH:
+        result["error"] = f"VIN must be {VIN_LENGTH} characters"
+        return result
+
+    expected = check_digit(vin)
+    if expected is None:
+        result["error"] = "VIN contains invalid characters"
+        return result
+
+    wmi = vin[:3]
+    manufacturer = WMI_MANUFACTURERS.get(wmi)
+    region = _REGIONS.get(vin[0])
+    result.update(
+        valid=True,
+        check_digit_valid=vin[8] == expected,
+        wmi=wmi,
+        manufacturer=manufacturer,
+        country=_COUNTRIES.get(vin[:2]),
+        region=region,
+        model_year=_model_year(vin, region),
+        plant_code=vin[10],
+    )
+    if manufacturer in _MODELS:
+        vds, models = _MODELS[manufacturer]
+        result["model"] = models.get(vin[vds])
+    if manufacturer in _PLANTS:
+        result["plant"] = _PLANTS[manufacturer].get(vin[10])
+    return result
+
+
+def decode_many(vins: list[str]) -> list[dict]:
+    """Пакетное декодирование в порядке запроса; повторы декодируются один раз."""
+    decoded: dict[str, dict] = {}
+    results = []
+    for raw in vins:
+        if raw not in decoded:
+            decoded[raw] = decode_vin(raw)
+        results.append(decoded[raw])
+    return results
@@ -0,0 +1,66 @@
+"""
+Бенчмарк разбора страниц магазина на сохранённых HTML-фикстурах.
+
+    python -m benchmarks.bench_product_parser --pages 2000 --workers 4
+
+Меряет страницы в секунду: в одном процессе (= на ядро) и через ParserPool
+с --workers процессами (в пересчёте на ядро). Для сравнения — построение
+дерева BeautifulSoup той же страницы, с которого начинался прежний разбор.
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from app.utils.product_parser import ParserPool, extract_product_data, extract_product_urls
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "autoteile"
+
+
+def pages_per_second(fn, pages: int) -> float:
+    started = time.perf_counter()
+    for _ in range(pages):
+        fn()
+    return pages / (time.perf_counter() - started)
+
+
+async def pool_pages_per_second(page: str, pages: int, workers: int) -> float:
+    async with ParserPool(workers) as parser:
+        # Прогрев: процессы пула запускаются и импортируют модуль до замера
+        await asyncio.gather(*(parser.product_data(page, "warmup") for _ in range(workers * 2)))
+        started = time.perf_counter()
+        await asyncio.gather(*(parser.product_data(page, f"u{i}") for i in range(pages)))
+        return pages / (time.perf_counter() - started)
+
+
+def report(name: str, rate: float):
+    print(f"  {name}: {rate:,.0f} pages/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    logger.remove()  # отладочный лог на каждую страницу исказил бы замер
+
+    listing = (FIXTURES / "listing.html").read_text()
+    product = (FIXTURES / "product.html").read_text()
+
+    print("single process (per core):")
+    report("listing -> urls", pages_per_second(lambda: extract_product_urls(listing, 100), args.pages))
+    report("product -> fields", pages_per_second(lambda: extract_product_data(product, "u"), args.pages))
+    try:
+        from bs4 import BeautifulSoup
+
+        soup_rate = pages_per_second(lambda: BeautifulSoup(product, "lxml"), args.pages)
+        report("BeautifulSoup tree only (reference)", soup_rate)
+    except ImportError:
+        pass
+
+    rate = asyncio.run(pool_pages_per_second(product, args.pages, args.workers))
+    print(f"ParserPool, {args.workers} workers:")
+    report("product -> fields", rate)
+    report("per core", rate / args.workers)
@@ -0,0 +1,76 @@
+"""
+Бенчмарк регистрации: пропускная способность POST /auth/register
+и количество SQL-запросов на одну регистрацию.
+
+    python -m benchmarks.bench_register --users 100 --concurrency 10
+
+Работает на временной SQLite-базе через ASGI-транспорт, без сети.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.db import Base, get_async_db
+from app.main import app
+
+
+async def run(users: int, concurrency: int, with_vehicle: bool):
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_register.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(*args):
+        nonlocal statements
+        statements += 1
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def _get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = _get_db
+    statements = 0
+
+    semaphore = asyncio.Semaphore(concurrency)
+    form = {"password": "pass123"}
+    if with_vehicle:
+        form.update({"vin": "WVWZZZ3CZLE073029", "brand": "VW", "model": "Passat", "engine": "2.0 TDI", "kba_code": "0603"})
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def register_one():
+            async with semaphore:
+                resp = await client.post("/auth/register", data={**form, "email": f"bench_{uuid.uuid4()}@example.com"})
+                resp.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(register_one() for _ in range(users)))
+        elapsed = time.perf_counter() - started
+
+    await engine.dispose()
+    app.dependency_overrides.clear()
+
+    print(f"users={users} concurrency={concurrency} with_vehicle={with_vehicle}")
+    print(f"  total: {elapsed:.2f}s, throughput: {users / elapsed:.1f} signups/s")
+    print(f"  SQL statements per signup: {statements / users:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--no-vehicle", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.concurrency, not args.no_vehicle))
@@ -0,0 +1,56 @@
+"""
+Бенчмарк подготовки схемы: загрузка графа ревизий alembic
+и полный bootstrap пустой базы.
+
+    python -m benchmarks.bench_schema_bootstrap --repeat 20
+
+Bootstrap меряется на временной SQLite-базе; для PostgreSQL передайте --url.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+
+from app.core.bootstrap import ALEMBIC_INI, bootstrap
+
+
+def load_graph() -> int:
+    script = ScriptDirectory.from_config(Config(ALEMBIC_INI))
+    return len(list(script.walk_revisions()))
+
+
+def timed(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(name: str, samples: list[float]):
+    print(f"  {name}: median {statistics.median(samples):.1f} ms, max {max(samples):.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--url", default=None, help="sync URL пустой базы (по умолчанию временный SQLite)")
+    args = parser.parse_args()
+
+    print(f"revisions: {load_graph()}")
+    report("revision graph load", timed(load_graph, args.repeat))
+
+    if args.url:
+        report("bootstrap", timed(lambda: bootstrap(args.url), 1))
+    else:
+        tmp = tempfile.mkdtemp()
+        counter = iter(range(args.repeat))
+        report(
+            "bootstrap (fresh sqlite)",
+            timed(lambda: bootstrap(f"sqlite:///{os.path.join(tmp, f'{next(counter)}.db')}"), args.repeat),
+        )
@@ -1,13 +1,35 @@
 # tests/conftest.py
+import os
+import tempfile
+import uuid
+
+import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.main import app
-from app.core.db import Base, get_async_db
+from app.core.db import Base, get_async_db, get_read_db
+from app.core.query_stats import collect_queries
+from app.core.config import settings
+from app.services.document_jobs import job_manager
+from app.services.storage import object_store
+from app.services.uploads import recognition_cache
 
 # --- Тестовая база SQLite ---
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+# Файл, а не :memory:: in-memory база живёт в одном общем соединении, и фоновые
+# задачи (распознавание документов) смешивали бы свои транзакции с запросами.
+# WAL — чтобы читатели не блокировали запись.
+TEST_DATABASE_URL = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
 engine = create_async_engine(TEST_DATABASE_URL, future=True)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _sqlite_pragmas(dbapi_connection, _):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
 TestSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 # --- Создание/удаление таблиц ---
@@ -25,6 +47,16 @@ async def session() -> AsyncSession:
     async with TestSessionLocal() as session:
         yield session
 
+# --- Фабрика сессий (для фоновых задач, которые открывают сессии сами) ---
+@pytest_asyncio.fixture
+async def session_factory():
+    return TestSessionLocal
+
+# --- Бюджет SQL-запросов: with query_counter() as queries: ...; assert queries.count <= 2 ---
+@pytest.fixture
+def query_counter():
+    return collect_queries
+
 # --- Подмена зависимости FastAPI ---
 @pytest_asyncio.fixture(autouse=True)
 async def override_db_dependency():
@@ -32,6 +64,53 @@ async def override_db_dependency():
         async with TestSessionLocal() as session:
             yield session
     app.dependency_overrides[get_async_db] = _get_db_override
+    app.dependency_overrides[get_read_db] = _get_db_override
+    job_manager.session_factory = TestSessionLocal
+
+# --- Загрузки и кэш распознавания — во временной папке теста ---
+@pytest.fixture(autouse=True)
+def upload_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_SPOOL_DIR", str(tmp_path / "spool"))
+    monkeypatch.setattr(recognition_cache, "directory", str(tmp_path / "recognition_cache"))
+    monkeypatch.setattr(object_store, "root", str(tmp_path / "attachments"))
+    recognition_cache.clear_memory()
+    return tmp_path
+
+# --- Доступ к /metrics: в тестах по токену, как у сборщика метрик в проде ---
+METRICS_TOKEN = "test-metrics-token"
+
+
+@pytest.fixture(autouse=True)
+def metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", METRICS_TOKEN)
+
+
+@pytest.fixture
+def metrics_headers():
+    return {"Authorization": f"Bearer {METRICS_TOKEN}"}
+
+# --- Токен нового пользователя ---
+async def register_user(client) -> str:
+    email = f"user_{uuid.uuid4()}@example.com"
+    await client.post("/auth/register", data={"email": email, "password": "pass123"})
+    login = await client.post("/auth/login", data={"username": email, "password": "pass123"})
+    return login.json()["access_token"]
+
+
+@pytest_asyncio.fixture
+async def auth_token(client):
+    return await register_user(client)
+
+
+@pytest.fixture
+def auth_headers(auth_token):
+    return {"Authorization": f"Bearer {auth_token}"}
+
+
+# Второй пользователь — для проверок доступа к чужим данным
+@pytest_asyncio.fixture
+async def other_auth_headers(client):
+    return {"Authorization": f"Bearer {await register_user(client)}"}
 
 # --- Фикстура клиента ---
 @pytest_asyncio.fixture
@@ -0,0 +1,49 @@
+import os
+import tempfile
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.bootstrap import ALEMBIC_INI, BASELINE_REVISION, LEGACY_REVISIONS, bootstrap, remap_legacy_revisions
+from app.core.db import Base
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_current_head()
+
+
+def test_fresh_database_is_created_and_stamped():
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bootstrap.db')}"
+
+    assert bootstrap(url) == "created"
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        tables = set(inspect(conn).get_table_names())
+        version = conn.execute(text("SELECT version_num FROM alembic_version")).scalar_one()
+    engine.dispose()
+
+    assert set(Base.metadata.tables) <= tables
+    assert version == head_revision()
+
+    # Повторный запуск: база уже на head, миграции не применяются
+    assert bootstrap(url) == "migrated"
+
+
+def test_legacy_revisions_are_remapped_to_baseline():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        assert remap_legacy_revisions(conn) == 0  # таблицы версий ещё нет
+
+        conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        conn.execute(text("INSERT INTO alembic_version VALUES (:v)"), {"v": LEGACY_REVISIONS[-1]})
+        assert remap_legacy_revisions(conn) == 1
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar_one() == BASELINE_REVISION
+
+
+def test_revision_chain_is_linear():
+    script = ScriptDirectory.from_config(Config(ALEMBIC_INI))
+    revisions = list(script.walk_revisions())
+    assert revisions[-1].revision == BASELINE_REVISION
+    assert not {r.revision for r in revisions} & set(LEGACY_REVISIONS)
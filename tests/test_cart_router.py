@@ -1,3 +1,10 @@
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+
 # import uuid
 # import pytest
 # from httpx import AsyncClient
@@ -44,3 +51,103 @@
 #     assert len(data) == 1
 #     assert data[0]["product"]["title"] == "Test Product"
 #     assert data[0]["quantity"] == 2
+
+
+def product_form(url: str, **extra) -> dict:
+    return {"title": "Brake pad", "price": "10.00 €", "product_url": url, **extra}
+
+
+@pytest.mark.asyncio
+async def test_add_to_cart_increments_existing_row(client: AsyncClient, auth_headers):
+    url = f"https://shop.test/p/{uuid.uuid4()}"
+
+    first = await client.post("/cart/add", headers=auth_headers, data=product_form(url, quantity=2))
+    assert first.status_code == 200
+    second = await client.post("/cart/add", headers=auth_headers, data=product_form(url, title="Renamed", quantity=3))
+    assert second.status_code == 200
+
+    assert second.json()["id"] == first.json()["id"]
+    assert second.json()["quantity"] == 5
+    # Существующий товар не перезаписывается
+    assert second.json()["product"]["title"] == "Brake pad"
+
+    cart = (await client.get("/cart/", headers=auth_headers)).json()["items"]
+    assert [item["quantity"] for item in cart] == [5]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_adds_of_same_product(client: AsyncClient, auth_headers):
+    url = f"https://shop.test/p/{uuid.uuid4()}"
+
+    responses = await asyncio.gather(
+        *(client.post("/cart/add", headers=auth_headers, data=product_form(url)) for _ in range(5))
+    )
+    assert all(r.status_code == 200 for r in responses)
+
+    cart = (await client.get("/cart/", headers=auth_headers)).json()["items"]
+    assert len(cart) == 1
+    assert cart[0]["quantity"] == 5
+
+
+@pytest.mark.asyncio
+async def test_bulk_cart_operations(client: AsyncClient, auth_headers):
+    urls = [f"https://shop.test/p/{uuid.uuid4()}" for _ in range(3)]
+
+    # Повтор одного товара в запросе складывается в одну строку
+    payload = [
+        {"title": "Pads", "price": "45,99 €", "product_url": urls[0], "quantity": 1},
+        {"title": "Discs", "price": "89,00 €", "product_url": urls[1], "quantity": 2},
+        {"title": "Sensor", "product_url": urls[2]},
+        {"title": "Pads", "price": "45,99 €", "product_url": urls[0], "quantity": 1},
+    ]
+    resp = await client.post("/cart/bulk", headers=auth_headers, json=payload)
+    assert resp.status_code == 200
+    cart = {item["product"]["product_url"]: item for item in resp.json()["items"]}
+    assert {url: cart[url]["quantity"] for url in urls} == {urls[0]: 2, urls[1]: 2, urls[2]: 1}
+
+    resp = await client.patch(
+        "/cart/bulk",
+        headers=auth_headers,
+        json=[{"id": cart[urls[0]]["id"], "quantity": 4}, {"id": cart[urls[1]]["id"], "quantity": 0}],
+    )
+    assert resp.status_code == 200
+    assert {item["product"]["product_url"]: item["quantity"] for item in resp.json()["items"]} == {urls[0]: 4, urls[2]: 1}
+
+    resp = await client.post("/cart/bulk/remove", headers=auth_headers, json=[cart[urls[0]]["id"], 999_999])
+    assert resp.status_code == 200
+    assert [item["product"]["product_url"] for item in resp.json()["items"]] == [urls[2]]
+
+
+@pytest.mark.asyncio
+async def test_bulk_cart_rejects_empty_list(client: AsyncClient, auth_headers):
+    assert (await client.post("/cart/bulk", headers=auth_headers, json=[])).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_cart_summary_matches_cart_totals(client: AsyncClient, auth_headers):
+    payload = [
+        {"title": "Pads", "price": "45,99 €", "seller_name": "Shop A", "product_url": f"https://shop.test/p/{uuid.uuid4()}", "quantity": 2},
+        {"title": "Discs", "price": "89,00 €", "seller_name": "Shop B", "product_url": f"https://shop.test/p/{uuid.uuid4()}"},
+        {"title": "Bolt", "price": "$1.50", "seller_name": "Shop A", "product_url": f"https://shop.test/p/{uuid.uuid4()}", "quantity": 4},
+        {"title": "Sensor", "price": "N/A", "product_url": f"https://shop.test/p/{uuid.uuid4()}"},
+    ]
+    cart = (await client.post("/cart/bulk", headers=auth_headers, json=payload)).json()
+
+    summary = (await client.get("/cart/summary", headers=auth_headers)).json()
+    assert summary == cart["summary"]
+    assert summary["item_count"] == 4
+    assert summary["total_quantity"] == 8
+    assert summary["unpriced_item_count"] == 1
+    assert summary["totals"] == [{"currency": "EUR", "total_cents": 2 * 4599 + 8900}, {"currency": "USD", "total_cents": 600}]
+    assert [(s["seller_name"], s["currency"]) for s in summary["sellers"]] == [
+        ("Shop A", "EUR"),
+        ("Shop B", "EUR"),
+        ("Shop A", "USD"),
+    ]
+
+    # Любое изменение корзины сбрасывает кэш итогов
+    pads = next(item for item in cart["items"] if item["product"]["title"] == "Pads")
+    await client.post("/cart/bulk/remove", headers=auth_headers, json=[pads["id"]])
+    summary = (await client.get("/cart/summary", headers=auth_headers)).json()
+    assert summary["item_count"] == 3
+    assert summary["totals"][0] == {"currency": "EUR", "total_cents": 8900}
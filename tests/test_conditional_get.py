@@ -0,0 +1,56 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+
+def product_form() -> dict:
+    return {"title": "Filter", "price": "5,00 €", "product_url": f"https://shop.test/p/{uuid.uuid4()}"}
+
+
+async def add_cart_item(client, headers):
+    return await client.post("/cart/add", headers=headers, data=product_form())
+
+
+async def add_favorite(client, headers):
+    return await client.post("/favorites/", headers=headers, data=product_form())
+
+
+async def add_vehicle(client, headers):
+    vehicle = {"vin": uuid.uuid4().hex[:17], "brand": "VW", "model": "Golf", "engine": "1.4", "kba_code": "111"}
+    return await client.post("/vehicles/", headers=headers, json=vehicle)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path,mutate",
+    [("/cart/", add_cart_item), ("/cart/summary", add_cart_item), ("/favorites/", add_favorite), ("/vehicles/", add_vehicle)],
+)
+async def test_conditional_get(client: AsyncClient, query_counter, path, mutate, auth_headers):
+    assert (await mutate(client, auth_headers)).status_code == 200
+
+    first = await client.get(path, headers=auth_headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    # Совпадающий ETag: 304 без чтения строк — только поиск пользователя
+    with query_counter() as queries:
+        cached = await client.get(path, headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+    assert queries.count == 1, queries.statements
+
+    # Любое изменение коллекции меняет ETag
+    assert (await mutate(client, auth_headers)).status_code == 200
+    changed = await client.get(path, headers={**auth_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_etag_is_per_collection(client: AsyncClient, auth_headers):
+    cart_etag = (await client.get("/cart/", headers=auth_headers)).headers["ETag"]
+
+    await add_favorite(client, auth_headers)
+    assert (await client.get("/cart/", headers={**auth_headers, "If-None-Match": cart_etag})).status_code == 304
@@ -0,0 +1,188 @@
+import asyncio
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.utils import crawler as crawler_module
+from app.utils.crawler import Crawler, HostLimits, TokenBucket, retry_after_seconds
+
+
+class StubShop(BaseHTTPRequestHandler):
+    """Локальный сервер: /page/N — страница, /flaky/N — сначала 503, /missing — 404."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            server.clients.add(self.client_address)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            hits = server.hits[self.path]
+        try:
+            time.sleep(server.delay)
+            if self.path.startswith("/flaky/") and hits <= 2:
+                self.reply(503, b"busy", {"Retry-After": "0"})
+            elif self.path == "/missing":
+                self.reply(404, b"not found")
+            else:
+                self.reply(200, f"<html><h1>{self.path}</h1></html>".encode())
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def reply(self, status: int, body: bytes, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def shop():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubShop)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.hits, server.clients = {}, set()
+    server.in_flight = server.max_in_flight = 0
+    server.delay = 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, burst=2)
+    started = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+    # 2 сразу (burst), остальные 4 — по одному каждые 50 мс
+    assert time.monotonic() - started >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_crawler_is_concurrent_and_bounded(shop):
+    shop.delay = 0.1
+    urls = [f"{shop.base_url}/page/{i}" for i in range(12)]
+    async with Crawler(concurrency=4, default_limits=HostLimits(rate=1000, burst=1000)) as crawler:
+        started = time.monotonic()
+        results = await crawler.fetch_all(urls)
+        elapsed = time.monotonic() - started
+
+    assert [r.url for r in results] == urls
+    assert all(r.ok and r.status == 200 for r in results)
+    assert shop.max_in_flight == 4
+    assert elapsed < 12 * shop.delay / 2  # последовательно было бы 1.2 с
+    # Соединения переиспользуются: не больше одного на слот
+    assert len(shop.clients) <= 4
+
+
+@pytest.mark.asyncio
+async def test_crawler_respects_per_host_rate(shop):
+    host = shop.base_url.removeprefix("http://")
+    other = host.replace("127.0.0.1", "localhost")
+    limits = {host: HostLimits(rate=10, burst=1)}
+    async with Crawler(concurrency=8, default_limits=HostLimits(rate=1000, burst=1000), host_limits=limits) as crawler:
+        started = time.monotonic()
+        await crawler.fetch_all([f"http://{other}/page/{i}" for i in range(5)])
+        fast = time.monotonic() - started
+        started = time.monotonic()
+        await crawler.fetch_all([f"http://{host}/page/{i}" for i in range(5)])
+        slow = time.monotonic() - started
+
+    assert slow >= 0.35  # 1 сразу, затем по одному каждые 100 мс
+    assert fast < slow
+    assert crawler.stats.by_host == {other: 5, host: 5}
+
+
+@pytest.mark.asyncio
+async def test_crawler_retries_with_backoff(shop, monkeypatch):
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def recording_sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(crawler_module.asyncio, "sleep", recording_sleep)
+    async with Crawler(retries=3, backoff_base=0.5, default_limits=HostLimits(rate=1000, burst=1000)) as crawler:
+        flaky = await crawler.fetch(f"{shop.base_url}/flaky/1")
+        missing = await crawler.fetch(f"{shop.base_url}/missing")
+        down = await crawler.fetch("http://127.0.0.1:9/page/1")
+
+    assert (flaky.ok, flaky.attempts) == (True, 3)
+    assert len(delays) == 2 + 3  # flaky: 2 повтора, down: 3
+    assert all(0 <= d <= 0.5 * 2**i for i, d in enumerate(delays[:2]))
+    assert (missing.ok, missing.status, missing.attempts) == (False, 404, 1)  # 404 не повторяется
+    assert not down.ok and down.error and down.attempts == 4
+    assert crawler.stats.snapshot()["failed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_host_does_not_hold_concurrency_slots(shop):
+    host = shop.base_url.removeprefix("http://")
+    fast = host.replace("127.0.0.1", "localhost")
+    limits = {host: HostLimits(rate=2, burst=1)}
+    async with Crawler(concurrency=2, default_limits=HostLimits(rate=1000, burst=1000), host_limits=limits) as crawler:
+        slow_tasks = [asyncio.create_task(crawler.fetch(f"http://{host}/page/{i}")) for i in range(6)]
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        results = await crawler.fetch_all([f"http://{fast}/page/{i}" for i in range(10)])
+        elapsed = time.monotonic() - started
+        for task in slow_tasks:
+            task.cancel()
+
+    assert all(r.ok for r in results)
+    assert elapsed < 0.5  # медленный хост отдаёт токен раз в 0.5 с — быстрый его не ждёт
+
+
+def test_retry_after_http_date():
+    later = format_datetime(datetime.now(UTC) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= retry_after_seconds(httpx.Response(503, headers={"Retry-After": later})) <= 30
+    past = format_datetime(datetime.now(UTC) - timedelta(seconds=30), usegmt=True)
+    assert retry_after_seconds(httpx.Response(503, headers={"Retry-After": past})) == 0
+    assert retry_after_seconds(httpx.Response(503, headers={"Retry-After": "7"})) == 7
+    assert retry_after_seconds(httpx.Response(503, headers={"Retry-After": "soon"})) is None
+    assert retry_after_seconds(httpx.Response(503)) is None
+
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "retry_after",
+    ["86400", format_datetime(datetime.now(UTC) + timedelta(days=365), usegmt=True)],
+    ids=["seconds", "http-date"],
+)
+async def test_long_retry_after_fails_the_url(retry_after):
+    hits = []
+
+    def shop(request: httpx.Request) -> httpx.Response:
+        hits.append(request.url)
+        return httpx.Response(429, headers={"Retry-After": retry_after})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(shop))
+    async with Crawler(client=client, retries=3, max_retry_after=5) as crawler, client:
+        started = time.monotonic()
+        result = await crawler.fetch("http://shop.test/p/1")
+
+    # Без ожидания и без повторов: такой URL сразу неудачный
+    assert time.monotonic() - started < 1
+    assert not result.ok and result.attempts == 1 and len(hits) == 1
+    assert "Retry-After" in result.error
+    assert crawler.stats.failed == 1
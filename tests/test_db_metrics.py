@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.metrics import Histogram, InstrumentedAsyncPool, pool_snapshot
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram(buckets=(1, 10))
+    for value in (0.5, 5, 50):
+        hist.observe(value)
+    snap = hist.snapshot()
+    assert snap["count"] == 3
+    assert snap["max"] == 50
+    assert snap["buckets"] == {"le_1": 1, "le_10": 2, "le_+Inf": 3}
+
+
+@pytest.mark.asyncio
+async def test_pool_tracks_checkouts_and_timeouts():
+    db_path = os.path.join(tempfile.mkdtemp(), "pool.db")
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}",
+        poolclass=InstrumentedAsyncPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    pool = engine.sync_engine.pool
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        snap = pool_snapshot(pool)
+        assert snap["checked_out"] == 1
+        assert snap["overflow"] == 0
+
+        # Единственное соединение занято — второй checkout упирается в pool_timeout
+        with pytest.raises(exc.TimeoutError):
+            async with engine.connect() as other:
+                await other.execute(text("SELECT 1"))
+
+    snap = pool_snapshot(pool)
+    assert snap["checked_out"] == 0
+    assert snap["acquisitions"] == 2
+    assert snap["timeouts"] == 1
+    assert snap["wait_ms"]["max"] >= 50
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_lists_primary_pool(client: AsyncClient, metrics_headers):
+    resp = await client.get("/metrics/db", headers=metrics_headers)
+    assert resp.status_code == 200
+    assert resp.json()["primary"]["size"] == 5
+
+
+@pytest.mark.asyncio
+async def test_metrics_require_token(client: AsyncClient, monkeypatch):
+    for path in ("/metrics/db", "/metrics/queries", "/metrics/jobs", "/metrics/pubsub"):
+        assert (await client.get(path)).status_code == 401
+        resp = await client.get(path, headers={"Authorization": "Bearer wrong"})
+        assert resp.status_code == 401
+
+    # Без токена в настройках метрики выключены, в DEBUG — открыты
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    assert (await client.get("/metrics/db")).status_code == 404
+    monkeypatch.setattr(settings, "DEBUG", True)
+    assert (await client.get("/metrics/db")).status_code == 200
@@ -0,0 +1,171 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.document_job import DocumentJob
+from app.models.vehicle import Vehicle
+from app.services.document_jobs import job_manager
+from app.services.recognition import StubRecognizer, load_recognizer
+
+DOCUMENT = b"Zulassungsbescheinigung Teil I\nE: WVWZZZ1KZ7W123456\n2.1/2.2: 0603/BRA\n"
+
+
+def test_stub_recognizer_is_deterministic(tmp_path):
+    text = tmp_path / "text.jpg"
+    text.write_bytes(DOCUMENT)
+    assert StubRecognizer().recognize(str(text)) == {
+        "vin": "WVWZZZ1KZ7W123456",
+        "kba_code": "0603/BRA",
+        "engine": None,
+    }
+
+    photo = tmp_path / "photo.jpg"
+    photo.write_bytes(bytes(range(256)) * 10)
+    first = StubRecognizer().recognize(str(photo))
+    assert first == StubRecognizer().recognize(str(photo))
+    assert len(first["vin"]) == 17
+
+
+def test_load_recognizer_rejects_incomplete_classes():
+    assert isinstance(load_recognizer("app.services.recognition:StubRecognizer"), StubRecognizer)
+    # Базовый класс абстрактный, посторонний класс — не распознаватель
+    with pytest.raises(TypeError):
+        load_recognizer("app.services.recognition:Recognizer")
+    with pytest.raises(TypeError, match="not a Recognizer"):
+        load_recognizer("app.services.uploads:RecognitionCache")
+
+
+@pytest.mark.asyncio
+async def test_document_job_creates_vehicle(client: AsyncClient, auth_token, upload_dirs, metrics_headers):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    resp = await client.post(
+        "/vehicles/add-from-doc",
+        headers=headers,
+        data={"search_code": "abc"},
+        files={"document": ("sts.jpg", DOCUMENT, "image/jpeg")},
+    )
+    assert resp.status_code == 202
+    job = resp.json()
+    assert job["status"] in ("queued", "running", "done")
+
+    resp = await client.get(f"/vehicles/jobs/{job['id']}", headers=headers, params={"wait": 20})
+    assert resp.status_code == 200
+    job = resp.json()
+    assert job["status"] == "done", job
+    assert job["vehicle_id"] is not None
+
+    vehicles = (await client.get("/vehicles/", headers=headers)).json()
+    vehicle = next(v for v in vehicles if v["id"] == job["vehicle_id"])
+    assert (vehicle["vin"], vehicle["brand"], vehicle["model"]) == ("WVWZZZ1KZ7W123456", "Volkswagen", "Golf V")
+    assert (vehicle["kba_code"], vehicle["search_code"]) == ("0603/BRA", "abc")
+
+    # Загруженный файл удаляется после обработки
+    assert list((upload_dirs / "spool").iterdir()) == []
+
+    metrics = (await client.get("/metrics/jobs", headers=metrics_headers)).json()
+    assert metrics["completed"] >= 1
+    assert metrics["latency_ms"]["count"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_document_job_failure_is_reported(client: AsyncClient, auth_token, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_RECOGNIZER", "app.services.recognition:Recognizer")
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    resp = await client.post(
+        "/vehicles/add-from-doc", headers=headers, files={"document": ("sts.jpg", DOCUMENT, "image/jpeg")}
+    )
+    job_id = resp.json()["id"]
+
+    job = (await client.get(f"/vehicles/jobs/{job_id}", headers=headers, params={"wait": 20})).json()
+    assert job["status"] == "failed"
+    assert job["vehicle_id"] is None
+    assert job["error"]
+
+
+@pytest.mark.asyncio
+async def test_document_job_limits(client: AsyncClient, auth_token, monkeypatch):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    monkeypatch.setattr(settings, "DOCUMENT_MAX_BYTES", 10)
+    resp = await client.post(
+        "/vehicles/add-from-doc", headers=headers, files={"document": ("sts.jpg", DOCUMENT, "image/jpeg")}
+    )
+    assert resp.status_code == 413
+
+    other = await client.post("/auth/register", data={"email": "jobs_other@example.com", "password": "pass123"})
+    assert other.status_code == 200
+    monkeypatch.setattr(settings, "DOCUMENT_MAX_BYTES", 1024)
+    resp = await client.post(
+        "/vehicles/add-from-doc", headers=headers, files={"document": ("sts.jpg", DOCUMENT, "image/jpeg")}
+    )
+    login = await client.post("/auth/login", data={"username": "jobs_other@example.com", "password": "pass123"})
+    foreign = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert (await client.get(f"/vehicles/jobs/{resp.json()['id']}", headers=foreign)).status_code == 404
+    assert (await client.get("/vehicles/jobs/missing", headers=headers)).status_code == 404
+
+
+async def queued_job(session, upload_dirs, user_id: int) -> DocumentJob:
+    job_id = str(uuid.uuid4())
+    path = upload_dirs / "spool" / job_id
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(DOCUMENT)
+    job = DocumentJob(id=job_id, user_id=user_id, status="queued", file_path=str(path))
+    session.add(job)
+    await session.commit()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_job_is_processed_once(client: AsyncClient, auth_token, session, upload_dirs):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    user_id = (await client.get("/auth/me", headers=headers)).json()["id"]
+    job = await queued_job(session, upload_dirs, user_id)
+
+    # Задание в очереди двух воркеров (например, после рестарта соседнего): обрабатывает один
+    job_manager._ensure_started()
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(job_manager._process(loop, job.id, time.monotonic()) for _ in range(2)))
+
+    vehicles = (await session.execute(select(Vehicle).where(Vehicle.user_id == user_id))).scalars().all()
+    assert len(vehicles) == 1
+    await session.refresh(job)
+    assert (job.status, job.vehicle_id) == ("done", vehicles[0].id)
+    assert not os.path.exists(job.file_path)
+
+    # Повторная обработка завершённого задания ничего не делает
+    await job_manager._process(loop, job.id, time.monotonic())
+    assert len((await session.execute(select(Vehicle).where(Vehicle.user_id == user_id))).scalars().all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_start_requeues_only_stale_running_jobs(client: AsyncClient, auth_token, session, upload_dirs):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    user_id = (await client.get("/auth/me", headers=headers)).json()["id"]
+    live = await queued_job(session, upload_dirs, user_id)
+    stale = await queued_job(session, upload_dirs, user_id)
+    now = datetime.now(UTC)
+    live.status, live.started_at = "running", now
+    stale.status, stale.started_at = "running", now - timedelta(seconds=settings.DOCUMENT_JOB_LEASE_SECONDS + 60)
+    await session.commit()
+
+    await job_manager.start()
+    for job_id in (live.id, stale.id):
+        wait = 10 if job_id == stale.id else 0
+        resp = await client.get(f"/vehicles/jobs/{job_id}", headers=headers, params={"wait": wait})
+        assert resp.json()["status"] == ("done" if job_id == stale.id else "running")
+
+
+@pytest.mark.asyncio
+async def test_deleted_job_file_is_removed(session, upload_dirs):
+    job_manager._ensure_started()
+    path = upload_dirs / "spool" / "missing-job"
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(DOCUMENT)
+    await job_manager._process(asyncio.get_running_loop(), "missing-job", time.monotonic())
+    assert not path.exists()
@@ -1,3 +1,9 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+
 # import uuid
 
 # import pytest
@@ -110,3 +116,19 @@
 #     assert response.status_code == 200
 #     data = response.json()
 #     assert len(data) == 0
+
+
+@pytest.mark.asyncio
+async def test_add_favorite_twice_is_rejected(client: AsyncClient, auth_headers):
+    form = {"title": "Oil filter", "product_url": f"https://shop.test/p/{uuid.uuid4()}", "vin": "VIN123"}
+
+    first = await client.post("/favorites/", headers=auth_headers, data=form)
+    assert first.status_code == 200
+    assert first.json()["vin"] == "VIN123"
+    assert first.json()["product"]["title"] == "Oil filter"
+
+    second = await client.post("/favorites/", headers=auth_headers, data=form)
+    assert second.status_code == 400
+
+    favorites = (await client.get("/favorites/", headers=auth_headers)).json()
+    assert len(favorites) == 1
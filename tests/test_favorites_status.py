@@ -0,0 +1,47 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cache_ttl", [300, 0], ids=["cached", "uncached"])
+async def test_favorites_status(client: AsyncClient, query_counter, monkeypatch, cache_ttl, auth_headers):
+    monkeypatch.setattr(settings, "FAVORITES_STATUS_CACHE_TTL_SECONDS", cache_ttl)
+    fav, cart, both, unknown = (f"https://shop.test/p/{uuid.uuid4()}" for _ in range(4))
+
+    await client.post("/favorites/", headers=auth_headers, data={"title": "A", "product_url": fav})
+    await client.post("/cart/add", headers=auth_headers, data={"title": "B", "product_url": cart})
+    await client.post("/favorites/", headers=auth_headers, data={"title": "C", "product_url": both})
+    await client.post("/cart/add", headers=auth_headers, data={"title": "C", "product_url": both})
+
+    body = {"product_urls": [unknown, fav, cart, both, fav]}
+    with query_counter() as queries:
+        resp = await client.post("/favorites/status", headers=auth_headers, json=body)
+    assert resp.status_code == 200
+    assert resp.json() == [
+        {"product_url": unknown, "favorite": False, "in_cart": False},
+        {"product_url": fav, "favorite": True, "in_cart": False},
+        {"product_url": cart, "favorite": False, "in_cart": True},
+        {"product_url": both, "favorite": True, "in_cart": True},
+    ]
+    assert queries.count == 2  # пользователь + один запрос членства
+
+    if cache_ttl:
+        # Повторная проверка — из кэша; изменение избранного его сбрасывает
+        with query_counter() as queries:
+            await client.post("/favorites/status", headers=auth_headers, json=body)
+        assert queries.count == 1
+
+        await client.post("/favorites/", headers=auth_headers, data={"title": "D", "product_url": unknown})
+        resp = await client.post("/favorites/status", headers=auth_headers, json={"product_urls": [unknown]})
+        assert resp.json()[0]["favorite"] is True
+
+
+@pytest.mark.asyncio
+async def test_favorites_status_limits(client: AsyncClient, auth_headers):
+    assert (await client.post("/favorites/status", headers=auth_headers, json={"product_urls": []})).status_code == 422
+    too_many = {"product_urls": [f"https://shop.test/p/{i}" for i in range(501)]}
+    assert (await client.post("/favorites/status", headers=auth_headers, json=too_many)).status_code == 422
@@ -0,0 +1,138 @@
+import datetime
+import time
+
+import httpx
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt
+from google.auth import jwt as google_jwt
+
+from app.core.google_auth import GoogleTokenVerifier
+
+CERTS_URL = "https://keys.test/oauth2/v1/certs"
+
+
+def make_key(kid: str):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, kid)])
+    now = datetime.datetime.now(datetime.UTC)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    signer = crypt.RSASigner.from_string(private_pem, key_id=kid)
+    return signer, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+def make_token(signer, **claims):
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": "client-id",
+        "email": "google_user@example.com",
+        "iat": now,
+        "exp": now + 600,
+    }
+    payload.update(claims)
+    return google_jwt.encode(signer, payload).decode()
+
+
+class KeyServer:
+    """Локальная замена https://www.googleapis.com/oauth2/v1/certs"""
+
+    def __init__(self, certs: dict, max_age: int = 3600):
+        self.certs = certs
+        self.max_age = max_age
+        self.hits = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.hits += 1
+        return httpx.Response(200, json=self.certs, headers={"Cache-Control": f"public, max-age={self.max_age}"})
+
+    @property
+    def transport(self):
+        return httpx.MockTransport(self.handler)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_verify_caches_certs_by_max_age():
+    signer, cert = make_key("k1")
+    server = KeyServer({"k1": cert}, max_age=600)
+    clock = FakeClock()
+    verifier = GoogleTokenVerifier(CERTS_URL, audience="client-id", refresh_margin=60, transport=server.transport, clock=clock)
+
+    token = make_token(signer)
+    for _ in range(5):
+        payload = await verifier.verify(token)
+    assert payload["email"] == "google_user@example.com"
+    assert server.hits == 1
+
+    # После истечения max-age сертификаты загружаются заново
+    clock.now += 601
+    await verifier.verify(token)
+    assert server.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_before_expiry():
+    signer, cert = make_key("k1")
+    server = KeyServer({"k1": cert}, max_age=600)
+    clock = FakeClock()
+    verifier = GoogleTokenVerifier(CERTS_URL, refresh_margin=60, transport=server.transport, clock=clock)
+
+    token = make_token(signer)
+    await verifier.verify(token)
+
+    # Внутри окна обновления запрос обслуживается из кэша, а обновление идёт в фоне
+    clock.now += 550
+    await verifier.verify(token)
+    await verifier._refresh_task
+    assert server.hits == 2
+    await verifier.close()
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_forces_refresh():
+    old_signer, old_cert = make_key("old")
+    new_signer, new_cert = make_key("new")
+    server = KeyServer({"old": old_cert})
+    verifier = GoogleTokenVerifier(CERTS_URL, transport=server.transport)
+
+    await verifier.verify(make_token(old_signer))
+    server.certs = {"old": old_cert, "new": new_cert}
+
+    payload = await verifier.verify(make_token(new_signer))
+    assert payload["email"] == "google_user@example.com"
+    assert server.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_rejects_wrong_audience_and_issuer():
+    signer, cert = make_key("k1")
+    server = KeyServer({"k1": cert})
+    verifier = GoogleTokenVerifier(CERTS_URL, audience="client-id", transport=server.transport)
+
+    with pytest.raises(ValueError):
+        await verifier.verify(make_token(signer, aud="someone-else"))
+    with pytest.raises(ValueError):
+        await verifier.verify(make_token(signer, iss="https://evil.example.com"))
@@ -0,0 +1,118 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, insert, select
+
+from app.models.user import Product
+from app.services.price_backfill import backfill_prices
+from app.utils.prices import parse_price
+
+
+@pytest.mark.parametrize(
+    "raw,expected",
+    [
+        ("45,99 €", (4599, "EUR")),
+        ("1.234,56 €", (123456, "EUR")),
+        ("1.234 €", (123400, "EUR")),
+        ("$12.50", (1250, "USD")),
+        ("1,234.5 USD", (123450, "USD")),
+        ("N/A", (None, None)),
+        ("Preis auf Anfrage", (None, None)),
+        ("Lieferung TOP", (None, None)),
+        ("EUR", (None, None)),
+        ("TOP 19,90 EUR", (1990, "EUR")),
+        ("12,00 XYZ", (1200, None)),
+        ("", (None, None)),
+        (None, (None, None)),
+    ],
+)
+def test_parse_price(raw, expected):
+    assert parse_price(raw) == expected
+
+
+@pytest.mark.asyncio
+async def test_cart_add_stores_numeric_price(client: AsyncClient):
+    email = f"price_{uuid.uuid4()}@example.com"
+    await client.post("/auth/register", data={"email": email, "password": "pass123"})
+    login = await client.post("/auth/login", data={"username": email, "password": "pass123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    form = {"title": "Disc", "price": "45,99 €", "product_url": f"https://shop.test/p/{uuid.uuid4()}"}
+    resp = await client.post("/cart/add", headers=headers, data=form)
+    assert resp.status_code == 200
+    assert resp.json()["product"]["price_cents"] == 4599
+    assert resp.json()["product"]["currency"] == "EUR"
+
+
+@pytest.mark.asyncio
+async def test_backfill_is_batched_and_resumable(session_factory):
+    tag = uuid.uuid4().hex
+    async with session_factory() as session:
+        # Строки других тестов в общей базе пропускаем через start_after
+        before = await session.scalar(select(func.coalesce(func.max(Product.id), 0)))
+        await session.execute(
+            insert(Product),
+            [{"title": "legacy", "price": f"{i},50 €", "product_url": f"https://legacy.test/{tag}/{i}"} for i in range(25)]
+            + [{"title": "legacy", "price": "N/A", "product_url": f"https://legacy.test/{tag}/na"}],
+        )
+        await session.commit()
+
+    # Останавливаемся после двух пачек и продолжаем с последнего id
+    first = await backfill_prices(session_factory, batch_size=10, sleep=0, start_after=before, max_batches=2)
+    assert first.scanned == 20
+    rest = await backfill_prices(session_factory, batch_size=10, sleep=0, start_after=first.last_id)
+    assert rest.scanned == 6 and rest.unparsed == 1
+
+    async with session_factory() as session:
+        rows = (
+            await session.execute(
+                select(Product.price, Product.price_cents, Product.currency).where(
+                    Product.product_url.like(f"https://legacy.test/{tag}/%")
+                )
+            )
+        ).all()
+    for price, cents, currency in rows:
+        assert (cents, currency) == parse_price(price)
+
+
+
+@pytest.mark.asyncio
+async def test_backfill_fix_currency_clears_bogus_codes(session_factory):
+    tag = uuid.uuid4().hex
+    legacy = [
+        # Так строки записывались до белого списка валют
+        ("Preis auf Anfrage", None, "AUF", (None, None)),
+        ("Lieferung TOP 12,00", 1200, "TOP", (1200, None)),
+        ("45,99 €", 4599, "EUR", (4599, "EUR")),
+    ]
+    async with session_factory() as session:
+        before = await session.scalar(select(func.coalesce(func.max(Product.id), 0)))
+        await session.execute(
+            insert(Product),
+            [
+                {
+                    "title": "legacy",
+                    "price": price,
+                    "price_cents": cents,
+                    "currency": currency,
+                    "product_url": f"https://legacy.test/{tag}/{i}",
+                }
+                for i, (price, cents, currency, _) in enumerate(legacy)
+            ],
+        )
+        await session.commit()
+
+    progress = await backfill_prices(session_factory, batch_size=10, sleep=0, start_after=before, fix_currency=True)
+    assert progress.scanned == 2 and progress.updated == 2
+
+    async with session_factory() as session:
+        rows = (
+            await session.execute(
+                select(Product.price, Product.price_cents, Product.currency).where(
+                    Product.product_url.like(f"https://legacy.test/{tag}/%")
+                )
+            )
+        ).all()
+    expected = {price: fixed for price, _, _, fixed in legacy}
+    assert {price: (cents, currency) for price, cents, currency in rows} == expected
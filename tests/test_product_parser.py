@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.utils.crawler import Crawler, HostLimits
+from app.utils.product_parser import extract_product_data, extract_product_urls
+from app.utils.test_parser import scrape_products
+
+FIXTURES = Path(__file__).parent / "fixtures" / "autoteile"
+LISTING = (FIXTURES / "listing.html").read_text()
+PRODUCT = (FIXTURES / "product.html").read_text()
+
+EXPECTED_PRODUCT = {
+    "title": "Bremsscheibevorne 340 mm",
+    "image_url": "https://img.autoteile-markt.de/101/front.jpg",
+    "price": "89,90 €",
+    "seller_name": "KFZ-Teile Müller GmbH",
+    "delivery_time": "2-4 Werktage",
+    "description": "Belüftete Bremsscheibe für die Vorderachse.Durchmesser: 340 mmLochzahl: 5",
+}
+
+
+def test_extract_product_urls():
+    assert extract_product_urls(LISTING, max_products=10) == [
+        "https://www.autoteile-markt.de/ersatzteil/bremsscheibe-vorne-101",
+        "https://www.autoteile-markt.de/ersatzteil/bremsbelag-102",  # из data-href64
+        "https://www.autoteile-markt.de/ersatzteil/luftfilter-104",
+    ]
+    assert len(extract_product_urls(LISTING, max_products=2)) == 2
+    assert extract_product_urls(LISTING, 1, base_url="http://shop.test/q")[0] == (
+        "http://shop.test/ersatzteil/bremsscheibe-vorne-101"
+    )
+
+
+def test_extract_product_data():
+    assert extract_product_data(PRODUCT, "u") == {"product_url": "u"} | EXPECTED_PRODUCT
+    empty = extract_product_data("<html><body><p>Nicht gefunden</p></body></html>", "u")
+    assert set(empty.values()) == {"u", "N/A"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [0, 2])
+async def test_scrape_products_parses_fetched_pages(workers):
+    def shop(request: httpx.Request) -> httpx.Response:
+        if request.url.path.startswith("/shop/"):
+            return httpx.Response(200, text=LISTING)
+        if request.url.path.endswith("-102"):
+            return httpx.Response(404)
+        return httpx.Response(200, text=PRODUCT)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(shop))
+    crawler = Crawler(client=client, retries=0, default_limits=HostLimits(rate=1000, burst=1000))
+    async with client:
+        products = await scrape_products("http://shop.test/shop/passat", 10, crawler, parse_workers=workers)
+
+    assert [p["product_url"] for p in products] == [
+        "http://shop.test/ersatzteil/bremsscheibe-vorne-101",
+        "http://shop.test/ersatzteil/luftfilter-104",
+    ]
+    assert all(p["price"] == EXPECTED_PRODUCT["price"] for p in products)
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.pubsub import Hub, PostgresBroadcast, SlowConsumer
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_hub_fan_out_and_slow_consumer():
+    hub = Hub(queue_size=2)
+    fast = hub.subscribe("ticket:1")
+    slow = hub.subscribe("ticket:1", "user:1")
+
+    for n in range(2):
+        assert hub.dispatch("ticket:1", {"n": n}) == 2
+        assert await fast.get() == {"n": n}
+
+    # У медленного подписчика очередь полна — он отключается, быстрый получает событие
+    assert hub.dispatch("ticket:1", {"n": 2}) == 1
+    assert await fast.get() == {"n": 2}
+    with pytest.raises(SlowConsumer):
+        await slow.get()
+    assert hub.dispatch("user:1", {"n": 3}) == 0
+    assert hub.snapshot()["dropped_subscribers"] == 1
+
+    async with fast:
+        pass
+    assert hub.snapshot()["channels"] == 0
+
+
+@pytest.mark.asyncio
+async def test_postgres_broadcast_payload():
+    hub = Hub(queue_size=10)
+    backend = PostgresBroadcast(hub, dsn="postgresql://unused", pg_channel="events")
+    sub = hub.subscribe("ticket:1")
+
+    # Не запущен (нет lifespan) — доставка в свой процесс
+    await backend.publish("ticket:1", {"id": 1})
+    assert await asyncio.wait_for(sub.get(), 1) == {"id": 1}
+
+    sent = []
+
+    class Sender:
+        async def execute(self, query, channel, payload):
+            sent.append(payload)
+            backend._on_notify(None, 0, channel, payload)  # PostgreSQL вернёт NOTIFY и отправителю
+
+    backend._sender = Sender()
+    await backend.publish("ticket:1", {"id": 2, "message": "x" * 10_000})
+    assert len(sent[0].encode()) < 8000
+    assert await asyncio.wait_for(sub.get(), 1) == {"id": 2, "truncated": True}
+    assert json.loads(sent[0])["channel"] == "ticket:1"
+
+
+def test_support_message_pushed_over_websocket():
+    client = TestClient(app)
+    email = f"ws_{uuid.uuid4()}@example.com"
+    client.post("/auth/register", data={"email": email, "password": "pass123"})
+    token = client.post("/auth/login", data={"username": email, "password": "pass123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    ticket_id = client.post("/support/", headers=headers, json={"subject": "Where is my order?"}).json()["id"]
+
+    with client.websocket_connect(f"/support/{ticket_id}/ws?token={token}") as ticket_ws:
+        with client.websocket_connect(f"/support/ws?token={token}") as user_ws:
+            client.post(f"/support/{ticket_id}/message", headers=headers, json={"sender": "user", "message": "hi"})
+            for ws in (ticket_ws, user_ws):
+                event = ws.receive_json()
+                assert (event["type"], event["ticket_id"], event["message"]) == ("support_message", ticket_id, "hi")
+
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect(f"/support/{ticket_id}/ws?token=bad") as ws:
+            ws.receive_json()
+    assert exc.value.code == 1008
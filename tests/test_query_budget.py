@@ -0,0 +1,58 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+
+
+async def fill_cart(client: AsyncClient, headers: dict, n: int = 5):
+    payload = [{"title": f"Part {i}", "price": "9,99 €", "product_url": f"https://shop.test/p/{uuid.uuid4()}"} for i in range(n)]
+    assert (await client.post("/cart/bulk", headers=headers, json=payload)).status_code == 200
+    for item in payload[:2]:
+        await client.post("/favorites/", headers=headers, data=item)
+
+
+@pytest.mark.asyncio
+async def test_cart_listing_query_budget(client: AsyncClient, query_counter, auth_headers):
+    await fill_cart(client, auth_headers)
+
+    # Пользователь + корзина с товарами одним JOIN, независимо от числа позиций
+    with query_counter() as queries:
+        resp = await client.get("/cart/", headers=auth_headers)
+    assert resp.status_code == 200
+    assert len(resp.json()["items"]) == 5
+    assert queries.count <= 2, queries.statements
+    assert queries.rows == 6
+
+    with query_counter() as queries:
+        resp = await client.get("/favorites/", headers=auth_headers)
+    assert len(resp.json()) == 2
+    assert queries.count <= 2, queries.statements
+
+
+@pytest.mark.asyncio
+async def test_me_loads_vehicles_explicitly(client: AsyncClient, query_counter, auth_headers):
+    vehicle = {"vin": "WVWZZZ3CZLE073029", "brand": "VW", "model": "Golf", "engine": "1.4", "kba_code": "111"}
+    assert (await client.post("/vehicles/", headers=auth_headers, json=vehicle)).status_code == 200
+
+    with query_counter() as queries:
+        resp = await client.get("/auth/me", headers=auth_headers)
+    assert [v["vin"] for v in resp.json()["vehicles"]] == ["WVWZZZ3CZLE073029"]
+    assert queries.count <= 2, queries.statements
+
+
+@pytest.mark.asyncio
+async def test_debug_headers_and_route_metrics(client: AsyncClient, monkeypatch, auth_headers):
+    monkeypatch.setattr(settings, "DEBUG", True)
+
+    resp = await client.get("/cart/", headers=auth_headers)
+    assert resp.headers["X-DB-Query-Count"] == "2"
+    assert float(resp.headers["X-DB-Time-Ms"]) >= 0
+    assert "SELECT" in resp.headers["X-DB-Slowest-Statement"]
+
+    metrics = (await client.get("/metrics/queries")).json()
+    assert metrics["GET /cart/"]["queries"]["count"] >= 1
+
+    monkeypatch.setattr(settings, "DEBUG", False)
+    assert "X-DB-Query-Count" not in (await client.get("/cart/", headers=auth_headers)).headers
@@ -0,0 +1,126 @@
+"""
+Регрессионные тесты планов запросов: горячие запросы на большом наборе
+данных не должны деградировать до последовательного сканирования.
+
+По умолчанию проверяется SQLite (EXPLAIN QUERY PLAN). Если задан
+TEST_POSTGRES_URL (sync-URL, например postgresql+psycopg2://...), те же
+запросы проверяются и на PostgreSQL через EXPLAIN (FORMAT JSON).
+"""
+import json
+import os
+
+import pytest
+from sqlalchemy import create_engine, exists, insert, select, text
+
+from app.core.db import Base
+from app.models.support import SupportMessage, SupportTicket
+from app.models.user import CartItem, Favorite, Product, User
+from app.models.vehicle import Vehicle
+from app.services.support_service import SupportService
+
+USERS = 2_000
+PRODUCTS = 20_000
+ROWS_PER_USER = 10
+
+
+def seed(engine):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": i, "email": f"user{i}@example.com", "password_hash": "x"} for i in range(1, USERS + 1)])
+        conn.execute(
+            insert(Product),
+            [
+                {"id": i, "title": f"Product {i}", "product_url": f"https://shop.test/p/{i}", "price_cents": i * 37 % 100_000}
+                for i in range(1, PRODUCTS + 1)
+            ],
+        )
+        per_user = [(u, (u * 7 + k * 13) % PRODUCTS + 1) for u in range(1, USERS + 1) for k in range(ROWS_PER_USER)]
+        conn.execute(insert(CartItem), [{"user_id": u, "product_id": p, "quantity": 1} for u, p in per_user])
+        conn.execute(insert(Favorite), [{"user_id": u, "product_id": p} for u, p in per_user])
+        conn.execute(
+            insert(Vehicle),
+            [{"user_id": u, "vin": f"VIN{u}", "is_selected": k == 0} for u in range(1, USERS + 1) for k in range(2)],
+        )
+        conn.execute(
+            insert(SupportTicket),
+            [{"id": t, "user_id": (t - 1) // 2 + 1, "subject": "help"} for t in range(1, USERS * 2 + 1)],
+        )
+        conn.execute(
+            insert(SupportMessage),
+            [{"ticket_id": t, "sender": "user", "message": "msg"} for t in range(1, USERS * 2 + 1) for _ in range(5)],
+        )
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        conn.commit()
+
+
+# --- Горячие запросы приложения: (имя, таблица, запрос) ---
+HOT_QUERIES = [
+    ("user by email", "users", select(User).where(User.email == "user42@example.com")),
+    ("product by url", "products", select(Product).where(Product.product_url == "https://shop.test/p/42")),
+    ("products by price", "products", select(Product).where(Product.price_cents.between(1000, 1100))),
+    ("cart of user", "cart_items", select(CartItem).where(CartItem.user_id == 42)),
+    ("cart row", "cart_items", select(CartItem).where(CartItem.user_id == 42, CartItem.product_id == 301)),
+    ("favorites of user", "favorites", select(Favorite).where(Favorite.user_id == 42)),
+    ("favorite row", "favorites", select(Favorite).where(Favorite.user_id == 42, Favorite.product_id == 301)),
+    (
+        "favorite/cart status",
+        "products",
+        select(
+            Product.product_url,
+            exists().where(Favorite.user_id == 42, Favorite.product_id == Product.id),
+            exists().where(CartItem.user_id == 42, CartItem.product_id == Product.id),
+        ).where(Product.product_url.in_([f"https://shop.test/p/{i}" for i in range(1, 300, 7)])),
+    ),
+    ("vehicles of user", "vehicles", select(Vehicle).where(Vehicle.user_id == 42)),
+    ("selected vehicle", "vehicles", select(Vehicle).where(Vehicle.user_id == 42, Vehicle.is_selected)),
+    ("tickets of user", "support_tickets", select(SupportTicket).where(SupportTicket.user_id == 42)),
+    ("messages of ticket", "support_messages", select(SupportMessage).where(SupportMessage.ticket_id == 42)),
+    (
+        "message by attachment",
+        "support_messages",
+        select(SupportMessage.id).where(SupportMessage.attachment_url == "/api/support/attachments/abc"),
+    ),
+    ("ticket summaries: tickets", "support_tickets", SupportService.ticket_summaries_stmt(42, cursor=None, limit=21)),
+    ("ticket summaries: messages", "support_messages", SupportService.ticket_summaries_stmt(42, cursor=None, limit=21)),
+]
+
+
+def sequential_scans(conn, stmt) -> list[str]:
+    """Таблицы, которые план читает целиком."""
+    sql = str(stmt.compile(conn, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+        # «SCAN t» — полный проход; «SEARCH t USING INDEX ...» — поиск по индексу
+        return [row[-1].split()[1] for row in rows if row[-1].startswith("SCAN ")]
+
+    plan = json.loads(conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar())
+    scans, stack = [], [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        if node["Node Type"] == "Seq Scan":
+            scans.append(node["Relation Name"])
+        stack.extend(node.get("Plans", []))
+    return scans
+
+
+def engines():
+    yield pytest.param("sqlite://", id="sqlite")
+    if os.getenv("TEST_POSTGRES_URL"):
+        yield pytest.param(os.environ["TEST_POSTGRES_URL"], id="postgresql")
+
+
+@pytest.fixture(scope="module", params=list(engines()))
+def seeded_engine(request):
+    engine = create_engine(request.param)
+    seed(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name,table,stmt", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_hot_query_uses_index(seeded_engine, name, table, stmt):
+    with seeded_engine.connect() as conn:
+        assert table not in sequential_scans(conn, stmt), f"{name}: sequential scan on {table}"
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import uuid
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.core.db as db_module
+from app.core.db import Base, get_async_db, get_read_db
+from app.main import app
+from app.models.user import User
+from app.models.vehicle import Vehicle
+
+
+@pytest_asyncio.fixture
+async def primary_and_replica(monkeypatch):
+    """Две SQLite-базы в файлах: primary и «реплика» без репликации."""
+    tmp = tempfile.mkdtemp()
+    factories = []
+    for name in ("primary", "replica"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, name)}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factories.append((engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)))
+    (primary_engine, primary), (replica_engine, replica) = factories
+
+    async def _get_primary():
+        async with primary() as session:
+            yield session
+
+    monkeypatch.setattr(db_module, "AsyncSessionLocal", primary)
+    monkeypatch.setattr(db_module, "AsyncReadSessionLocal", replica)
+    app.dependency_overrides[get_async_db] = _get_primary
+    app.dependency_overrides.pop(get_read_db, None)
+    yield primary, replica
+    await primary_engine.dispose()
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_until_own_write(client: AsyncClient, primary_and_replica):
+    primary, replica = primary_and_replica
+    email = f"replica_{uuid.uuid4()}@example.com"
+
+    assert (await client.post("/auth/register", data={"email": email, "password": "pass123"})).status_code == 200
+    login = await client.post("/auth/login", data={"username": email, "password": "pass123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    # /auth/me работает, даже если пользователь ещё не попал в реплику
+    assert (await client.get("/auth/me", headers=headers)).status_code == 200
+
+    # «Реплицируем» пользователя с машиной, которой нет в primary
+    async with replica() as session:
+        user = User(email=email, password_hash="x")
+        session.add(user)
+        await session.flush()
+        session.add(Vehicle(user_id=user.id, vin="REPLICA", brand="B", model="M", engine="E", kba_code="K"))
+        await session.commit()
+
+    vehicles = (await client.get("/vehicles/", headers=headers)).json()
+    assert [v["vin"] for v in vehicles] == ["REPLICA"]
+
+    # Своя запись → следующие чтения идут в primary (read-your-writes)
+    add = await client.post(
+        "/vehicles/",
+        headers=headers,
+        json={"vin": "PRIMARY", "brand": "VW", "model": "Golf", "engine": "1.4", "kba_code": "111"},
+    )
+    assert add.status_code == 200
+    vehicles = (await client.get("/vehicles/", headers=headers)).json()
+    assert [v["vin"] for v in vehicles] == ["PRIMARY"]
+
+
+@pytest.mark.asyncio
+async def test_strong_consistency_header_forces_primary(client: AsyncClient, primary_and_replica):
+    primary, replica = primary_and_replica
+    email = f"strong_{uuid.uuid4()}@example.com"
+
+    await client.post("/auth/register", data={"email": email, "password": "pass123", "vin": "PRIMARY"})
+    login = await client.post("/auth/login", data={"username": email, "password": "pass123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    async with replica() as session:
+        session.add(User(email=email, password_hash="x"))
+        await session.commit()
+
+    assert (await client.get("/vehicles/", headers=headers)).json() == []
+    strong = await client.get("/vehicles/", headers={**headers, "X-Consistency": "strong"})
+    assert [v["vin"] for v in strong.json()] == ["PRIMARY"]
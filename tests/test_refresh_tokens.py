@@ -0,0 +1,62 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.bloom import BloomFilter
+from app.services.token_service import refresh_token_store
+
+
+async def register_and_login(client: AsyncClient) -> dict:
+    email = f"refresh_{uuid.uuid4()}@example.com"
+    resp = await client.post("/auth/register", data={"email": email, "password": "pass123"})
+    assert resp.status_code == 200
+    login_resp = await client.post("/auth/login", data={"username": email, "password": "pass123"})
+    assert login_resp.status_code == 200
+    return login_resp.json()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [uuid.uuid4().hex for _ in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10_000))
+    assert false_positives < 300
+
+
+@pytest.mark.asyncio
+async def test_unknown_jti_is_not_revoked_without_db():
+    # Отрицательный ответ фильтра не должен трогать БД (db=None)
+    assert await refresh_token_store.is_revoked(None, uuid.uuid4().hex) is False
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_is_single_use(client: AsyncClient):
+    tokens = await register_and_login(client)
+
+    first = await client.post("/auth/refresh", params={"refresh_token": tokens["refresh_token"]})
+    assert first.status_code == 200
+    rotated = first.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    # Повторное использование старого токена отклоняется...
+    replay = await client.post("/auth/refresh", params={"refresh_token": tokens["refresh_token"]})
+    assert replay.status_code == 401
+
+    # ...и отзывает всю цепочку, включая только что выданный токен
+    after_replay = await client.post("/auth/refresh", params={"refresh_token": rotated["refresh_token"]})
+    assert after_replay.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_refresh_token(client: AsyncClient):
+    tokens = await register_and_login(client)
+
+    resp = await client.post("/auth/logout", params={"refresh_token": tokens["refresh_token"]})
+    assert resp.status_code == 200
+
+    resp = await client.post("/auth/refresh", params={"refresh_token": tokens["refresh_token"]})
+    assert resp.status_code == 401
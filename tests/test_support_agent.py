@@ -0,0 +1,124 @@
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from app.models.user import User
+
+
+async def register(client: AsyncClient, agent: bool = False, session=None) -> dict:
+    email = f"agent_{uuid.uuid4()}@example.com"
+    await client.post("/auth/register", data={"email": email, "password": "pass123"})
+    if agent:
+        await session.execute(update(User).where(User.email == email).values(is_support_agent=True))
+        await session.commit()
+    login = await client.post("/auth/login", data={"username": email, "password": "pass123"})
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+async def drain_open_tickets(client: AsyncClient, agent: dict) -> None:
+    # Тикеты других тестов в общей базе не должны мешать порядку
+    while (await client.post("/support/agent/claim", headers=agent)).status_code == 200:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_agent_queue_is_oldest_first(client: AsyncClient, session):
+    agent = await register(client, agent=True, session=session)
+    await drain_open_tickets(client, agent)
+    customer = await register(client)
+    tickets = [
+        (await client.post("/support/", headers=customer, json={"subject": f"Queue {i}"})).json()["id"]
+        for i in range(5)
+    ]
+
+    assert (await client.get("/support/agent/queue", headers=customer)).status_code == 403
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "status": "open"} | ({"cursor": cursor} if cursor else {})
+        resp = await client.get("/support/agent/queue", headers=agent, params=params)
+        assert resp.status_code == 200
+        seen += [t["id"] for t in resp.json()["items"]]
+        cursor = resp.json()["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == tickets
+
+    claimed = (await client.post("/support/agent/claim", headers=agent)).json()
+    assert claimed["id"] == tickets[0]
+    assert claimed["status"] == "in_progress"
+    assert claimed["assigned_agent_id"] is not None
+
+    # По умолчанию очередь — open и in_progress вместе, по времени создания
+    resp = await client.get("/support/agent/queue", headers=agent, params={"limit": 100})
+    ids = [t["id"] for t in resp.json()["items"]]
+    assert [i for i in ids if i in tickets] == tickets
+    open_only = await client.get("/support/agent/queue", headers=agent, params={"status": "open", "limit": 100})
+    assert tickets[0] not in [t["id"] for t in open_only.json()["items"]]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_do_not_collide(client: AsyncClient, session):
+    agent = await register(client, agent=True, session=session)
+    await drain_open_tickets(client, agent)
+    customer = await register(client)
+    tickets = {
+        (await client.post("/support/", headers=customer, json={"subject": f"Claim {i}"})).json()["id"]
+        for i in range(3)
+    }
+
+    responses = await asyncio.gather(*(client.post("/support/agent/claim", headers=agent) for _ in range(4)))
+    claimed = [r.json()["id"] for r in responses if r.status_code == 200]
+    assert sorted(claimed) == sorted(tickets)
+    assert [r.status_code for r in responses].count(204) == 1
+
+
+@pytest.mark.asyncio
+async def test_agent_search_ranks_tickets_with_snippets(client: AsyncClient, session):
+    agent = await register(client, agent=True, session=session)
+    customer = await register(client)
+    marker = uuid.uuid4().hex[:8]
+
+    async def ticket(subject: str, *messages: str) -> int:
+        ticket_id = (await client.post("/support/", headers=customer, json={"subject": subject})).json()["id"]
+        for message in messages:
+            await client.post(
+                f"/support/{ticket_id}/message", headers=customer, json={"sender": "user", "message": message}
+            )
+        return ticket_id
+
+    wrong_disc = await ticket(
+        "Lieferung",
+        f"Hallo {marker}, die Bremsscheibe wurde falsch geliefert <b>dringend</b>",
+        f"Noch einmal {marker}: Bremsscheibe falsch geliefert, Bremsscheibe passt nicht",
+    )
+    other_disc = await ticket("Frage", f"{marker} Passt diese Bremsscheiben für den Golf?")
+    await ticket("Filter", f"{marker} Ölfilter kam beschädigt an")
+
+    assert (await client.get("/support/agent/search", headers=customer, params={"q": marker})).status_code == 403
+
+    resp = await client.get("/support/agent/search", headers=agent, params={"q": f"{marker} Bremsscheibe falsch"})
+    assert resp.status_code == 200
+    hits = resp.json()["items"]
+    # Один результат на тикет, несмотря на два подходящих сообщения
+    assert [h["ticket_id"] for h in hits] == [wrong_disc]
+    assert "<mark>Bremsscheibe</mark>" in hits[0]["snippet"]
+    assert "<b>" not in hits[0]["snippet"]
+
+    page = (await client.get("/support/agent/search", headers=agent, params={"q": f"{marker} bremsscheibe"})).json()
+    assert {h["ticket_id"] for h in page["items"]} == {wrong_disc, other_disc}
+    assert page["items"][0]["rank"] >= page["items"][1]["rank"]
+
+    first = (await client.get("/support/agent/search", headers=agent, params={"q": marker, "limit": 2})).json()
+    second = await client.get(
+        "/support/agent/search", headers=agent, params={"q": marker, "limit": 2, "cursor": first["next_cursor"]}
+    )
+    assert len(first["items"]) == 2
+    assert len(second.json()["items"]) == 1
+    assert second.json()["next_cursor"] is None
+
+    empty = await client.get("/support/agent/search", headers=agent, params={"q": "!!"})
+    assert empty.json() == {"items": [], "next_cursor": None}
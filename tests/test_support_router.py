@@ -0,0 +1,105 @@
+import os
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+
+
+@pytest.mark.asyncio
+async def test_ticket_summaries_are_paginated(client: AsyncClient, query_counter, auth_headers):
+    tickets = []
+    for i in range(3):
+        resp = await client.post("/support/", headers=auth_headers, json={"subject": f"Ticket {i}"})
+        assert resp.status_code == 200
+        assert resp.json()["messages"] == []
+        tickets.append(resp.json()["id"])
+
+    for n in range(4):
+        await client.post(f"/support/{tickets[1]}/message", headers=auth_headers, json={"sender": "user", "message": f"m{n}"})
+    await client.post(f"/support/{tickets[1]}/message", headers=auth_headers, json={"sender": "user", "message": "x" * 500})
+
+    with query_counter() as queries:
+        first = await client.get("/support/", headers=auth_headers, params={"limit": 2})
+    assert first.status_code == 200
+    # Пользователь + один агрегирующий запрос, без загрузки переписки
+    assert queries.count <= 2, queries.statements
+
+    page = first.json()
+    assert [t["id"] for t in page["items"]] == [tickets[2], tickets[1]]
+    busy = page["items"][1]
+    assert busy["message_count"] == 5
+    assert busy["last_message_preview"] == "x" * 120
+    assert busy["last_message_sender"] == "user"
+    assert page["items"][0]["message_count"] == 0
+    assert page["items"][0]["last_message_preview"] is None
+
+    second = (await client.get("/support/", headers=auth_headers, params={"limit": 2, "cursor": page["next_cursor"]})).json()
+    assert [t["id"] for t in second["items"]] == [tickets[0]]
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_ticket_messages_cursor(client: AsyncClient, auth_headers, other_auth_headers):
+    ticket_id = (await client.post("/support/", headers=auth_headers, json={"subject": "Brakes"})).json()["id"]
+    for n in range(5):
+        await client.post(f"/support/{ticket_id}/message", headers=auth_headers, json={"sender": "user", "message": f"m{n}"})
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+        page = (await client.get(f"/support/{ticket_id}/messages", headers=auth_headers, params=params)).json()
+        seen += [m["message"] for m in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["m4", "m3", "m2", "m1", "m0"]
+
+    assert (await client.get(f"/support/{ticket_id}/messages", headers=other_auth_headers)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_attachments_are_content_addressed(client: AsyncClient, upload_dirs, monkeypatch, auth_headers, other_auth_headers):
+    ticket_id = (await client.post("/support/", headers=auth_headers, json={"subject": "Photo"})).json()["id"]
+    content = os.urandom(4096)
+
+    first = await client.post(
+        f"/support/{ticket_id}/upload", headers=auth_headers, files={"file": ("a.jpg", content, "image/jpeg")}
+    )
+    assert first.status_code == 200, first.text
+    # То же содержимое под другим именем хранится один раз
+    second = await client.post(
+        f"/support/{ticket_id}/upload", headers=auth_headers, files={"file": ("b.jpg", content, "image/jpeg")}
+    )
+    assert second.json()["attachment_url"] == first.json()["attachment_url"]
+    assert "deduplicated" not in second.json()
+    stored = [f for f in (upload_dirs / "attachments").rglob("*") if f.is_file() and f.suffix != ".json"]
+    assert len(stored) == 1
+
+    url = first.json()["attachment_url"].removeprefix("/api")
+    resp = await client.get(url, headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.content == content
+    assert resp.headers["content-type"] == "image/jpeg"
+    assert resp.headers["content-disposition"].startswith("inline")
+    assert resp.headers["x-content-type-options"] == "nosniff"
+    resp = await client.get(url, headers=auth_headers | {"Range": "bytes=0-3"})
+    assert resp.status_code == 206
+    assert resp.content == content[:4]
+
+    assert (await client.get(url, headers=other_auth_headers)).status_code == 404
+
+    # Активное содержимое не отображается на домене API
+    page = await client.post(
+        f"/support/{ticket_id}/upload", headers=auth_headers, files={"file": ("x.html", b"<script>1</script>", "text/html")}
+    )
+    resp = await client.get(page.json()["attachment_url"].removeprefix("/api"), headers=auth_headers)
+    assert resp.headers["content-disposition"].startswith("attachment")
+    assert resp.headers["x-content-type-options"] == "nosniff"
+
+    monkeypatch.setattr(settings, "ATTACHMENT_MAX_BYTES", 1024)
+    resp = await client.post(
+        f"/support/{ticket_id}/upload", headers=auth_headers, files={"file": ("big.jpg", os.urandom(2048), "image/jpeg")}
+    )
+    assert resp.status_code == 413
+    assert list((upload_dirs / "attachments" / "tmp").iterdir()) == []
@@ -0,0 +1,99 @@
+import hashlib
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from httpx import AsyncClient
+
+from app.services.uploads import DocumentTooLarge, RecognitionCache, recognition_cache, spool_upload
+
+DOCUMENT = b"Zulassungsbescheinigung Teil I\nE: WAUZZZ8V1GA012345\n2.1/2.2: 0588/AUX\n"
+
+
+def test_spool_upload_hashes_while_writing(tmp_path):
+    content = os.urandom(3 * 1024 * 1024 + 17)
+    path = tmp_path / "upload"
+    size, digest = spool_upload(io.BytesIO(content), str(path), limit=10 * 1024 * 1024)
+    assert (size, digest) == (len(content), hashlib.sha256(content).hexdigest())
+    assert path.read_bytes() == content
+
+    assert spool_upload(io.BytesIO(content), None, limit=len(content))[1] == digest
+
+    with pytest.raises(DocumentTooLarge):
+        spool_upload(io.BytesIO(content), str(tmp_path / "big"), limit=1024)
+    assert not (tmp_path / "big").exists()
+
+
+@pytest.mark.asyncio
+async def test_recognition_cache_disk_lru(tmp_path):
+    cache = RecognitionCache(memory_size=10, directory=str(tmp_path), disk_entries=2, evict_interval=0)
+    keys = [cache.key("document", "stub", str(i)) for i in range(3)]
+
+    await cache.set(keys[0], {"n": 0})
+    await cache.set(keys[1], {"n": 1})
+    os.utime(tmp_path / f"{keys[1]}.json", (time.time() - 60, time.time() - 60))
+    await cache.set(keys[2], {"n": 2})  # вытесняет самый давно использованный — keys[1]
+
+    cache.clear_memory()
+    assert await cache.get(keys[0]) == {"n": 0}
+    assert await cache.get(keys[1]) is None
+    assert await cache.get(keys[2]) == {"n": 2}
+    assert cache.key("document", "other", "0") != keys[0]
+
+
+def test_recognition_cache_concurrent_writes_of_one_key(tmp_path):
+    cache = RecognitionCache(memory_size=10, directory=str(tmp_path), disk_entries=100)
+    key = cache.key("document", "stub", "same-photo")
+
+    def write(n: int):
+        for i in range(50):
+            cache._write_disk(key, {"n": n, "i": i})
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(write, range(4)))  # исключение в потоке поднимется здесь
+    assert [p.name for p in tmp_path.iterdir()] == [f"{key}.json"]
+
+
+@pytest.mark.asyncio
+async def test_recognition_cache_set_is_best_effort(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    cache = RecognitionCache(memory_size=10, directory=str(blocker), disk_entries=10)
+    key = cache.key("document", "stub", "x")
+    await cache.set(key, {"vin": "X"})  # каталог создать нельзя — запись на диск пропускается
+    assert await cache.get(key) == {"vin": "X"}
+
+
+@pytest.mark.asyncio
+async def test_repeated_document_upload_is_served_from_cache(client: AsyncClient, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    files = {"document": ("sts.jpg", DOCUMENT, "image/jpeg")}
+
+    first = await client.post("/vehicles/add-from-doc", headers=headers, files=files)
+    assert first.status_code == 202
+    done = await client.get(f"/vehicles/jobs/{first.json()['id']}", headers=headers, params={"wait": 20})
+    assert done.json()["status"] == "done"
+
+    # Та же фотография ещё раз: без очереди и пула процессов, новая машина создаётся сразу
+    recognition_cache.clear_memory()  # результат должен найтись и на диске
+    second = await client.post("/vehicles/add-from-doc", headers=headers, files=files)
+    assert second.status_code == 200
+    job = second.json()
+    assert job["status"] == "done"
+    assert job["vehicle_id"] not in (None, done.json()["vehicle_id"])
+
+
+@pytest.mark.asyncio
+async def test_search_recognition_is_cached(client: AsyncClient):
+    files = {"document": ("sts.jpg", DOCUMENT, "image/jpeg"), "part_photo": ("part.jpg", b"\x89PNG part", "image/png")}
+    first = await client.post("/search/", files=files)
+    assert first.status_code == 200
+    params = first.json()["data"]["search_parameters_used"]
+    assert (params["vin_recognized"], params["kba_recognized"]) == ("WAUZZZ8V1GA012345", "0588/AUX")
+
+    hits = recognition_cache.hits
+    second = await client.post("/search/", files=files)
+    assert second.json()["data"]["search_parameters_used"] == params
+    assert recognition_cache.hits == hits + 2
@@ -82,4 +82,17 @@ async def test_add_vehicle_to_existing_user(client: AsyncClient):
     assert vehicle["brand"] == "Audi"
     assert vehicle["model"] == "A4"
     assert vehicle["engine"] == "2.0"
-    assert vehicle["kba_code"] == "888"
\ No newline at end of file
+    assert vehicle["kba_code"] == "888"
+
+@pytest.mark.asyncio
+async def test_register_duplicate_email(client: AsyncClient):
+    """Повторная регистрация с тем же email отклоняется уникальным индексом"""
+    email = f"dupuser_{uuid.uuid4()}@example.com"
+
+    first = await client.post("/auth/register", data={"email": email, "password": "pass123", "vin": "VINDUP"})
+    assert first.status_code == 200
+    assert first.json()["vehicles"][0]["vin"] == "VINDUP"
+
+    second = await client.post("/auth/register", data={"email": email, "password": "pass123"})
+    assert second.status_code == 400
+    assert second.json()["detail"] == "Email is already registered"
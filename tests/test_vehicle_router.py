@@ -1,5 +1,13 @@
+import uuid
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.models.user import User
+from app.models.vehicle import Vehicle
+
 
 @pytest.mark.asyncio
 async def test_vehicle_workflow(client: AsyncClient, auth_token):
@@ -45,3 +53,62 @@ async def test_vehicle_workflow(client: AsyncClient, auth_token):
     list_after_del = (await client.get("/vehicles/", headers=headers)).json()
     assert all(v["id"] != v1["id"] for v in list_after_del)
     assert any(v["id"] == v2["id"] for v in list_after_del)
+
+
+
+async def add_vehicle(client: AsyncClient, headers: dict, vin: str) -> dict:
+    resp = await client.post(
+        "/vehicles/",
+        headers=headers,
+        json={"vin": vin, "brand": "VW", "model": "Golf", "engine": "1.4", "kba_code": "111"},
+    )
+    return resp.json()
+
+
+@pytest.mark.asyncio
+async def test_select_vehicle_keeps_single_selection(client: AsyncClient, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    assert (await client.get("/vehicles/selected", headers=headers)).status_code == 404
+
+    v1, v2, v3 = [await add_vehicle(client, headers, vin) for vin in ("SEL1", "SEL2", "SEL3")]
+    for vehicle in (v1, v3, v2, v2):
+        resp = await client.patch(f"/vehicles/{vehicle['id']}/select", headers=headers)
+        assert resp.status_code == 200
+        assert resp.json()["id"] == vehicle["id"]
+
+    vehicles = (await client.get("/vehicles/", headers=headers)).json()
+    assert [v["id"] for v in vehicles if v["is_selected"]] == [v2["id"]]
+
+    selected = await client.get("/vehicles/selected", headers=headers)
+    assert selected.status_code == 200
+    assert selected.json()["vin"] == "SEL2"
+
+
+@pytest.mark.asyncio
+async def test_select_foreign_vehicle_is_not_found(client: AsyncClient, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    own = await add_vehicle(client, headers, "OWN1")
+    await client.patch(f"/vehicles/{own['id']}/select", headers=headers)
+
+    email = f"other_{uuid.uuid4()}@example.com"
+    await client.post("/auth/register", data={"email": email, "password": "pass123", "vin": "OTHER"})
+    login = await client.post("/auth/login", data={"username": email, "password": "pass123"})
+    other_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    resp = await client.patch(f"/vehicles/{own['id']}/select", headers=other_headers)
+    assert resp.status_code == 404
+    # Чужая попытка не сбросила выбор владельца
+    assert (await client.get("/vehicles/selected", headers=headers)).json()["id"] == own["id"]
+
+
+@pytest.mark.asyncio
+async def test_unique_index_rejects_second_selected_vehicle(session):
+    user = User(email=f"idx_{uuid.uuid4()}@example.com", password_hash="x")
+    session.add(user)
+    await session.commit()
+
+    await session.execute(insert(Vehicle).values(user_id=user.id, vin="A", is_selected=True))
+    await session.execute(insert(Vehicle).values(user_id=user.id, vin="B", is_selected=False))
+    with pytest.raises(IntegrityError):
+        await session.execute(insert(Vehicle).values(user_id=user.id, vin="C", is_selected=True))
+    await session.rollback()
@@ -0,0 +1,87 @@
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+
+from app.utils.vin import _model_year, check_digit, decode_many, decode_vin
+
+
+@pytest.mark.parametrize(
+    "vin,expected", [("1HGCM82633A004352", "3"), ("11111111111111111", "1"), ("1M8GDM9AXKP042788", "X")]
+)
+def test_check_digit(vin, expected):
+    assert check_digit(vin) == expected
+
+
+def test_decode_north_american_vin():
+    result = decode_vin("1HGCM82633A004352")
+    assert result["valid"] is True
+    assert result["check_digit_valid"] is True
+    assert result["manufacturer"] == "Honda"
+    assert result["country"] == "United States"
+    assert result["model_year"] == 2003
+
+
+def test_decode_european_vin():
+    result = decode_vin(" wvwzzz1kz7w123456 ")
+    assert result["vin"] == "WVWZZZ1KZ7W123456"
+    assert result["valid"] is True
+    # У VW в 9-й позиции "Z" — это не ошибка VIN
+    assert result["check_digit_valid"] is False
+    assert (result["manufacturer"], result["model"], result["model_year"]) == ("Volkswagen", "Golf V", 2007)
+    assert (result["country"], result["plant"]) == ("Germany", "Wolfsburg")
+
+    assert decode_vin("WDD2040081A123456")["model"] == "C-Class W204"
+
+
+def test_model_year_cycles():
+    # Северная Америка: буква в 7-й позиции — второй цикл
+    assert _model_year("1FTEW1EG5AFA00000", "North America") == 2010
+    assert _model_year("1FTEW19G5AFA00000", "North America") == 1980
+    # Остальные регионы: последний цикл, не уходящий в будущее
+    assert _model_year("WVWZZZ5GZEW000000", "Europe", today=date(2026, 1, 1)) == 2014
+    assert _model_year("WVWZZZ1JZYW000000", "Europe", today=date(2026, 1, 1)) == 2000
+
+
+@pytest.mark.parametrize(
+    "vin,error",
+    [
+        ("ABC", "VIN must be 17 characters"),
+        ("", "VIN must be 17 characters"),
+        ("WVWZZZ1KZ7I123456", "VIN contains invalid characters"),
+    ],
+)
+def test_decode_invalid(vin, error):
+    result = decode_vin(vin)
+    assert result["valid"] is False
+    assert result["error"] == error
+
+
+def test_decode_many_keeps_order():
+    results = decode_many(["WVWZZZ1KZ7W123456", "bad", "WVWZZZ1KZ7W123456"])
+    assert [r["valid"] for r in results] == [True, False, True]
+
+
+@pytest.mark.asyncio
+async def test_decode_batch_endpoint(client: AsyncClient, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    vins = ["1HGCM82633A004352", "WVWZZZ1KZ7W123456", "nope"] * 1000
+    resp = await client.post("/vehicles/decode-batch", headers=headers, json={"vins": vins})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert len(body) == 3000
+    assert body[1]["manufacturer"] == "Volkswagen"
+    assert body[2]["valid"] is False
+
+    too_many = await client.post("/vehicles/decode-batch", headers=headers, json={"vins": ["x"] * 10_001})
+    assert too_many.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_add_from_doc_decodes_vin(client: AsyncClient, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    resp = await client.post("/vehicles/add-from-doc", headers=headers, data={"vin": "wauzzz8v1ga012345"})
+    assert resp.status_code == 200
+    vehicle = resp.json()
+    assert vehicle["vin"] == "WAUZZZ8V1GA012345"
+    assert (vehicle["brand"], vehicle["model"]) == ("Audi", "A3")